@@ -1,13 +1,23 @@
 from __future__ import annotations
 import base64
 from collections import Counter
+from collections.abc import Iterable
 from copy import copy
-import random as r
+from functools import cache, wraps
+import inspect
+import random
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
 
 from .constants import *
+from .constants import _get_challenge_setups
 from .classes import *
 from .enums import *
+from .enums import _get_index
 from .jokers import *
+from .trace import ScoringTrace, TraceEffect, TraceSource
 
 __version__ = "1.0.0"
 
@@ -33,24 +43,100 @@ def format_number(number: float) -> str:
     return f"{number:,.1f}" if number >= 10 else f"{number:,.2f}"
 
 
+@cache
+def _get_data_uri(item: Blind | Deck | Pack | Stake | Tag | Voucher) -> str:
+    return (
+        f"data:image/png;base64,{base64.b64encode(item._repr_png_()).decode("utf-8")}"
+    )
+
+
+@cache
+def _get_font_style() -> str:
+    with open("resources/fonts/m6x11plus.ttf", "rb") as f:
+        font_base64 = base64.b64encode(f.read()).decode("utf-8")
+
+    return f"""
+        <style>
+        @font-face {{
+            font-family: 'm6x11plus';
+            src: url(data:font/ttf;base64,{font_base64});
+        }}
+        * {{
+            font-family: 'm6x11plus', monospace;
+        }}
+        </style>
+        """
+
+
+@cache
+def _get_shop_sign_data_uri() -> str:
+    from .sprites import SHOP_SIGN
+
+    return f"data:image/png;base64,{base64.b64encode(SHOP_SIGN).decode("utf-8")}"
+
+
+_ACTION_METHOD_NAMES: set[str] = set()
+
+
+def _logged_action(method):
+    # appends the action to the run's log once it succeeds, with its arguments positional
+    signature = inspect.signature(method)
+    _ACTION_METHOD_NAMES.add(method.__name__)
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        method(self, *args, **kwargs)
+
+        if kwargs:
+            args = signature.bind(self, *args, **kwargs).args[1:]
+        self._action_log.append(
+            (
+                method.__name__,
+                tuple(
+                    list(arg) if isinstance(arg, (list, tuple)) else arg for arg in args
+                ),
+            )
+        )
+
+    return wrapper
+
+
 class Run:
     def __init__(
         self,
         deck: Deck,
         stake: Stake = Stake.WHITE,
         seed: str | None = None,
+        unchecked: bool = False,
     ) -> None:
         if deck is Deck.CHALLENGE and not isinstance(self, ChallengeRun):
             raise ValueError(
                 f"Cannot use {Deck.CHALLENGE} with {Run}, use {ChallengeRun} instead"
             )
 
-        r.seed(seed)
+        if seed is None:
+            seed = "".join(
+                random.SystemRandom().choices(SEED_CHARACTERS, k=SEED_LENGTH)
+            )
+        self._seed: str = seed
+        # actions skip validating the state and their arguments, for callers that only
+        # take actions from legal_actions()
+        self._unchecked: bool = unchecked
+        # the (method name, arguments) of every action taken, enough to replay the run
+        self._action_log: list[tuple[str, tuple]] = []
+
+        self._random: random.Random = random.Random(seed)
+        # tags and boss blinds, shops and packs draw from their own streams, so a seed
+        # decides them however the blinds are played. the shop and pack streams are seeded
+        # on first use, so runs that haven't reached them don't hold their state
+        self._ante_random: random.Random = random.Random(f"{seed}-ante")
+        self._shop_random: random.Random | None = None
+        self._pack_random: random.Random | None = None
 
         self._deck: Deck = deck
         self._stake: Stake = stake
         self._money: int = (
-            CHALLENGE_SETUPS[self._challenge].starting_money
+            _get_challenge_setups()[self._challenge].starting_money
             if isinstance(self, ChallengeRun)
             else (14 if self._deck is Deck.YELLOW else 4)
         )
@@ -61,7 +147,7 @@ class Run:
             poker_hand: [1, 0] for poker_hand in PokerHand
         }
         self._vouchers: set[Voucher] = (
-            copy(CHALLENGE_SETUPS[self._challenge].initial_vouchers)
+            copy(_get_challenge_setups()[self._challenge].initial_vouchers)
             if isinstance(self, ChallengeRun)
             else set()
         )
@@ -70,7 +156,7 @@ class Run:
         self._deck_cards: list[Card] = (
             [
                 copy(deck_card)
-                for deck_card in CHALLENGE_SETUPS[self._challenge].deck_cards
+                for deck_card in _get_challenge_setups()[self._challenge].deck_cards
             ]
             if isinstance(self, ChallengeRun)
             else [
@@ -93,7 +179,7 @@ class Run:
                     is_perishable=joker.is_perishable,
                     is_rental=joker.is_rental,
                 )
-                for joker in CHALLENGE_SETUPS[self._challenge].initial_jokers
+                for joker in _get_challenge_setups()[self._challenge].initial_jokers
             ]
             if isinstance(self, ChallengeRun)
             else []
@@ -101,7 +187,9 @@ class Run:
         self._consumables: list[Consumable] = (
             [
                 copy(consumable)
-                for consumable in CHALLENGE_SETUPS[self._challenge].initial_consumables
+                for consumable in _get_challenge_setups()[
+                    self._challenge
+                ].initial_consumables
             ]
             if isinstance(self, ChallengeRun)
             else []
@@ -148,6 +236,7 @@ class Run:
         self._round_goal: float | None = None
         self._chips: int | None = None
         self._mult: float | None = None
+        self._trace: ScoringTrace | None = None
         self._hands: int | None = None
         self._discards: int | None = None
         self._hand: list[Card] | None = None
@@ -261,9 +350,46 @@ class Run:
     def _calculate_sell_value(self, item: Sellable) -> int:
         return max(1, self._calculate_buy_cost(item) // 2) + item._extra_sell_value
 
+    def _can_use_consumable(self, consumable: Consumable, is_owned: bool) -> bool:
+        # mirrors the checks in _use_consumable apart from the selected cards, an owned
+        # consumable having already been taken out of the consumables when it's used
+        match consumable.card:
+            case Tarot.THE_FOOL:
+                return self._fool_next not in [None, Tarot.THE_FOOL] and len(
+                    self._consumables
+                ) - is_owned < self.consumable_slots - (
+                    is_owned and consumable.is_negative
+                )
+            case Tarot.THE_WHEEL_OF_FORTUNE | Spectral.HEX:
+                return any(joker.edition is Edition.BASE for joker in self._jokers)
+            case Tarot.JUDGEMENT | Spectral.WRAITH | Spectral.THE_SOUL:
+                return len(self._jokers) < self.joker_slots
+            case (
+                Spectral.FAMILIAR
+                | Spectral.GRIM
+                | Spectral.INCANTATION
+                | Spectral.SIGIL
+                | Spectral.IMMOLATE
+            ):
+                return bool(self._hand)
+            case Spectral.OUIJA:
+                return bool(self._hand) and self.hand_size != 1
+            case Spectral.ECTOPLASM:
+                return bool(self._jokers) and self.hand_size != 1
+            case Spectral.ANKH:
+                return (
+                    bool(self._jokers)
+                    and self.joker_slots
+                    - len(self._jokers)
+                    + sum(not joker.is_eternal for joker in self._jokers)
+                    >= 1
+                )
+
+        return True
+
     def _chance(self, hit: int, pool: int) -> bool:
         hit *= 2 ** self._jokers.count(OopsAllSixes)
-        return hit >= pool or (r.randint(1, pool) <= hit)
+        return hit >= pool or (self._random.randint(1, pool) <= hit)
 
     def _close_pack(self) -> None:
         self._hand = None
@@ -325,7 +451,8 @@ class Run:
         )
 
         deal_indices = sorted(
-            r.sample(range(len(self._deck_cards_left)), num_cards), reverse=True
+            self._random.sample(range(len(self._deck_cards_left)), num_cards),
+            reverse=True,
         )
         for i in deal_indices:
             dealt_card = self._deck_cards_left.pop(i)
@@ -350,7 +477,9 @@ class Run:
         self._sort_hand()
 
         if self._boss_blind_disabled is False and self._blind is Blind.CERULEAN_BELL:
-            self._forced_selected_card_index = r.randint(0, len(self._hand) - 1)
+            self._forced_selected_card_index = self._random.randint(
+                0, len(self._hand) - 1
+            )
 
         return True
 
@@ -361,7 +490,7 @@ class Run:
                 if joker.is_debuffed and joker.num_perishable_rounds_left > 0:
                     joker.is_debuffed = False
                     break
-            r.choice(valid_debuff_jokers).is_debuffed = True
+            self._random.choice(valid_debuff_jokers).is_debuffed = True
 
     def _destroy_card(self, card: Card) -> None:
         self._deck_cards.remove(card)
@@ -425,6 +554,11 @@ class Run:
         poker_hands_played: list[PokerHand],
         hand_not_allowed: bool = False,
     ) -> None:
+        if self._trace is not None:
+            if hand_not_allowed:
+                self._trace._refuse()
+            self._trace._stop()
+
         if hand_not_allowed:
             for joker in self._jokers:
                 joker._on_boss_blind_triggered()
@@ -658,11 +792,16 @@ class Run:
 
         return poker_hands
 
-    def _get_random_card(self, ranks: list[Rank] | None = None) -> Card:
+    def _get_random_card(
+        self, ranks: list[Rank] | None = None, rng: random.Random | None = None
+    ) -> Card:
+        if rng is None:
+            rng = self._random
+
         if ranks is None:
             ranks = list(Rank)
 
-        card = Card(r.choice(ranks), r.choice(list(Suit)))
+        card = Card(rng.choice(ranks), rng.choice(list(Suit)))
 
         return card
 
@@ -671,15 +810,19 @@ class Run:
         consumable_type: type[Tarot | Planet | Spectral],
         allow_black_hole: bool = False,
         allow_the_soul: bool = False,
+        rng: random.Random | None = None,
     ) -> Consumable:
+        if rng is None:
+            rng = self._random
+
         if (
             allow_black_hole
             and (
                 not isinstance(self, ChallengeRun)
                 or Spectral.BLACK_HOLE
-                not in CHALLENGE_SETUPS[self._challenge].banned_consumable_cards
+                not in _get_challenge_setups()[self._challenge].banned_consumable_cards
             )
-            and r.random() < 0.003
+            and rng.random() < 0.003
         ):
             return Consumable(Spectral.BLACK_HOLE)
         if (
@@ -687,9 +830,9 @@ class Run:
             and (
                 not isinstance(self, ChallengeRun)
                 or Spectral.THE_SOUL
-                not in CHALLENGE_SETUPS[self._challenge].banned_consumable_cards
+                not in _get_challenge_setups()[self._challenge].banned_consumable_cards
             )
-            and r.random() < 0.003
+            and rng.random() < 0.003
         ):
             return Consumable(Spectral.THE_SOUL)
 
@@ -731,11 +874,11 @@ class Run:
             and (
                 not isinstance(self, ChallengeRun)
                 or consumable_card
-                not in CHALLENGE_SETUPS[self._challenge].banned_consumable_cards
+                not in _get_challenge_setups()[self._challenge].banned_consumable_cards
             )
         ]
         return Consumable(
-            r.choice(valid_consumable_cards)
+            rng.choice(valid_consumable_cards)
             if valid_consumable_cards
             else consumable_type.DEFAULT
         )
@@ -744,9 +887,13 @@ class Run:
         self,
         rarity: Rarity | None = None,
         allow_stickers: bool = False,
+        rng: random.Random | None = None,
     ) -> BalatroJoker:
+        if rng is None:
+            rng = self._random
+
         if rarity is None:
-            rarity = r.choices(
+            rarity = rng.choices(
                 list(JOKER_BASE_RARITY_WEIGHTS),
                 weights=JOKER_BASE_RARITY_WEIGHTS.values(),
                 k=1,
@@ -798,10 +945,10 @@ class Run:
             and (
                 not isinstance(self, ChallengeRun)
                 or joker_type
-                not in CHALLENGE_SETUPS[self._challenge].banned_joker_types
+                not in _get_challenge_setups()[self._challenge].banned_joker_types
             )
         ]
-        joker_type = r.choice(valid_joker_types) if valid_joker_types else Joker
+        joker_type = rng.choice(valid_joker_types) if valid_joker_types else Joker
 
         edition_chances = (
             JOKER_EDITION_CHANCES_GLOW_UP
@@ -812,13 +959,13 @@ class Run:
                 else JOKER_EDITION_CHANCES
             )
         )
-        edition = r.choices(
+        edition = rng.choices(
             list(edition_chances), weights=edition_chances.values(), k=1
         )[0]
 
         is_eternal, is_perishable, is_rental = False, False, False
         if allow_stickers:
-            eternal_perishable_roll = r.random()
+            eternal_perishable_roll = rng.random()
             if (
                 self._stake >= Stake.BLACK
                 and joker_type not in NON_ETERNAL_JOKERS
@@ -832,7 +979,7 @@ class Run:
             ):
                 is_perishable = True
 
-            if self._stake is Stake.GOLD and r.random() < 0.3:
+            if self._stake is Stake.GOLD and rng.random() < 0.3:
                 is_rental = True
 
         return self._create_joker(
@@ -881,21 +1028,22 @@ class Run:
             tuple[Tag, PokerHand | None], tuple[Tag, PokerHand | None]
         ] = [None, None]
         for i in range(2):
-            tag = r.choice(
+            tag = self._ante_random.choice(
                 [
                     tag
                     for tag in Tag
                     if (self._ante > 1 or tag not in PROHIBITED_ANTE_1_TAGS)
                     and (
                         not isinstance(self, ChallengeRun)
-                        or tag not in CHALLENGE_SETUPS[self._challenge].banned_tags
+                        or tag
+                        not in _get_challenge_setups()[self._challenge].banned_tags
                     )
                 ]
             )
 
             orbital_hand = None
             if tag is Tag.ORBITAL:
-                orbital_hand = r.choice(self._unlocked_poker_hands)
+                orbital_hand = self._ante_random.choice(self._unlocked_poker_hands)
 
             self._ante_tags[i] = (tag, orbital_hand)
 
@@ -925,6 +1073,9 @@ class Run:
                 self._new_ante()
 
     def _open_pack(self, pack: Pack) -> None:
+        if self._pack_random is None:
+            self._pack_random = random.Random(f"{self._seed}-pack")
+
         self._state = State.OPENING_PACK
 
         self._opened_pack = pack
@@ -944,7 +1095,11 @@ class Run:
         match pack:
             case Pack.BUFFOON | Pack.JUMBO_BUFFOON | Pack.MEGA_BUFFOON:
                 while len(self._pack_items) < (of_up_to - 1):
-                    self._pack_items.append(self._get_random_joker(allow_stickers=True))
+                    self._pack_items.append(
+                        self._get_random_joker(
+                            allow_stickers=True, rng=self._pack_random
+                        )
+                    )
             case Pack.ARCANA | Pack.JUMBO_ARCANA | Pack.MEGA_ARCANA:
                 while len(self._pack_items) < of_up_to:
                     self._pack_items.append(
@@ -952,10 +1107,11 @@ class Run:
                             (
                                 Spectral
                                 if Voucher.OMEN_GLOBE in self._vouchers
-                                and r.random() < 0.2
+                                and self._pack_random.random() < 0.2
                                 else Tarot
                             ),
                             allow_the_soul=True,
+                            rng=self._pack_random,
                         )
                     )
 
@@ -969,13 +1125,18 @@ class Run:
 
                 while len(self._pack_items) < of_up_to:
                     self._pack_items.append(
-                        self._get_random_consumable(Planet, allow_black_hole=True)
+                        self._get_random_consumable(
+                            Planet, allow_black_hole=True, rng=self._pack_random
+                        )
                     )
             case Pack.SPECTRAL | Pack.JUMBO_SPECTRAL | Pack.MEGA_SPECTRAL:
                 while len(self._pack_items) < (of_up_to - 1):
                     self._pack_items.append(
                         self._get_random_consumable(
-                            Spectral, allow_black_hole=True, allow_the_soul=True
+                            Spectral,
+                            allow_black_hole=True,
+                            allow_the_soul=True,
+                            rng=self._pack_random,
                         )
                     )
 
@@ -995,14 +1156,16 @@ class Run:
                 )
 
                 while len(self._pack_items) < of_up_to:
-                    pack_card = self._get_random_card()
-                    pack_card.edition = r.choices(
+                    pack_card = self._get_random_card(rng=self._pack_random)
+                    pack_card.edition = self._pack_random.choices(
                         list(edition_chances), weights=edition_chances.values(), k=1
                     )[0]
-                    if r.random() < 0.4:
-                        pack_card.enhancement = r.choice(list(Enhancement))
-                    if r.random() < 0.2:
-                        pack_card.seal = r.choice(list(Seal))
+                    if self._pack_random.random() < 0.4:
+                        pack_card.enhancement = self._pack_random.choice(
+                            list(Enhancement)
+                        )
+                    if self._pack_random.random() < 0.2:
+                        pack_card.seal = self._pack_random.choice(list(Seal))
 
                     self._pack_items.append(pack_card)
 
@@ -1015,7 +1178,7 @@ class Run:
         self._reroll_cost = max(
             0,
             (
-                CHALLENGE_SETUPS[self._challenge].base_reroll_cost
+                _get_challenge_setups()[self._challenge].base_reroll_cost
                 if isinstance(self, ChallengeRun)
                 else 5
             )
@@ -1056,14 +1219,14 @@ class Run:
                     possible_voucher in self._shop_vouchers
                     or isinstance(self, ChallengeRun)
                     and possible_voucher
-                    in CHALLENGE_SETUPS[self._challenge].banned_vouchers
+                    in _get_challenge_setups()[self._challenge].banned_vouchers
                 ):
                     continue
 
                 possible_vouchers.append(possible_voucher)
 
             for _ in range(needed_vouchers):
-                voucher = r.choice(possible_vouchers)
+                voucher = self._shop_random.choice(possible_vouchers)
                 buy_cost = self._calculate_buy_cost(voucher) + self._inflation_amount
                 self._shop_vouchers.append((voucher, buy_cost))
                 possible_vouchers.remove(voucher)
@@ -1073,13 +1236,13 @@ class Run:
                 weight
                 if (
                     not isinstance(self, ChallengeRun)
-                    or pack not in CHALLENGE_SETUPS[self._challenge].banned_packs
+                    or pack not in _get_challenge_setups()[self._challenge].banned_packs
                 )
                 else 0
             )
             for pack, weight in SHOP_BASE_PACK_WEIGHTS.items()
         ]
-        self._shop_packs = r.choices(
+        self._shop_packs = self._shop_random.choices(
             list(SHOP_BASE_PACK_WEIGHTS),
             weights=shop_base_pack_weights,
             k=2,
@@ -1087,7 +1250,7 @@ class Run:
 
         if self._round == 1 and (
             not isinstance(self, ChallengeRun)
-            or Pack.BUFFOON not in CHALLENGE_SETUPS[self._challenge].banned_packs
+            or Pack.BUFFOON not in _get_challenge_setups()[self._challenge].banned_packs
         ):
             self._shop_packs[0] = Pack.BUFFOON
 
@@ -1098,6 +1261,9 @@ class Run:
             self._shop_packs[i] = (pack, buy_cost)
 
     def _populate_shop_cards(self, coupon: bool = False) -> None:
+        if self._shop_random is None:
+            self._shop_random = random.Random(f"{self._seed}-shop")
+
         shop_card_weights = SHOP_BASE_CARD_WEIGHTS.copy()
         if Voucher.MAGIC_TRICK in self._vouchers:
             shop_card_weights[Card] = 4
@@ -1124,7 +1290,7 @@ class Run:
         ) - len(self._shop_cards)
 
         self._shop_cards.extend(
-            r.choices(
+            self._shop_random.choices(
                 list(shop_card_weights),
                 weights=shop_card_weights.values(),
                 k=k,
@@ -1156,6 +1322,7 @@ class Run:
                     joker = self._get_random_joker(
                         rarity=rarity,
                         allow_stickers=True,
+                        rng=self._shop_random,
                     )
 
                     if joker.edition is Edition.BASE:
@@ -1175,7 +1342,9 @@ class Run:
                         )
                     self._shop_cards[i] = (joker, buy_cost)
                 case Tarot.__name__ | Planet.__name__ | Spectral.__name__:
-                    consumable = self._get_random_consumable(self._shop_cards[i])
+                    consumable = self._get_random_consumable(
+                        self._shop_cards[i], rng=self._shop_random
+                    )
                     buy_cost = (
                         0
                         if coupon
@@ -1184,18 +1353,20 @@ class Run:
                     )
                     self._shop_cards[i] = (consumable, buy_cost)
                 case Card.__name__:
-                    card = self._get_random_card()
+                    card = self._get_random_card(rng=self._shop_random)
                     if Voucher.ILLUSION in self._vouchers:
-                        card.edition = r.choices(
+                        card.edition = self._shop_random.choices(
                             list(CARD_EDITION_CHANCES_ILLUSION),
                             weights=CARD_EDITION_CHANCES_ILLUSION.values(),
                             k=1,
                         )[0]
-                        if r.random() < 0.4:
-                            card.enhancement = r.choice(list(Enhancement))
+                        if self._shop_random.random() < 0.4:
+                            card.enhancement = self._shop_random.choice(
+                                list(Enhancement)
+                            )
                         # not in the Lua code despite it being in the voucher description (bug?)
-                        # if r.random() < 0.2:
-                        #     card.seal = r.choice(list(Seal))
+                        # if self._shop_random.random() < 0.2:
+                        #     card.seal = self._shop_random.choice(list(Seal))
                     buy_cost = (
                         0
                         if coupon
@@ -1213,10 +1384,11 @@ class Run:
                     for blind in list(Blind)[-5:]
                     if (
                         not isinstance(self, ChallengeRun)
-                        or blind not in CHALLENGE_SETUPS[self._challenge].banned_blinds
+                        or blind
+                        not in _get_challenge_setups()[self._challenge].banned_blinds
                     )
                 ]
-            self._boss_blind = r.choice(self._finisher_blind_pool)
+            self._boss_blind = self._ante_random.choice(self._finisher_blind_pool)
             self._finisher_blind_pool.remove(self._boss_blind)
         else:
             if not self._boss_blind_pool:
@@ -1225,10 +1397,11 @@ class Run:
                     for blind in list(Blind)[2:-5]
                     if (
                         not isinstance(self, ChallengeRun)
-                        or blind not in CHALLENGE_SETUPS[self._challenge].banned_blinds
+                        or blind
+                        not in _get_challenge_setups()[self._challenge].banned_blinds
                     )
                 ]
-            self._boss_blind = r.choice(
+            self._boss_blind = self._ante_random.choice(
                 [
                     blind
                     for blind in self._boss_blind_pool
@@ -1241,22 +1414,11 @@ class Run:
                 self._ox_poker_hand = self._most_played_hand
 
     def _repr_frame(self) -> str:
-        with open("resources/fonts/m6x11plus.ttf", "rb") as f:
-            font_base64 = base64.b64encode(f.read()).decode("utf-8")
-
-        blind_base64 = base64.b64encode(self._blind._repr_png_()).decode("utf-8")
-        stake_base64 = base64.b64encode(self._stake._repr_png_()).decode("utf-8")
+        blind_data_uri = _get_data_uri(self._blind)
+        stake_data_uri = _get_data_uri(self._stake)
 
-        html = f"""
-        <style>
-        @font-face {{
-            font-family: 'm6x11plus';
-            src: url(data:font/ttf;base64,{font_base64});
-        }}
-        * {{
-            font-family: 'm6x11plus', monospace;
-        }}
-        </style>
+        html = _get_font_style()
+        html += f"""
         <div style='height: 546px; width: 1084px; display: flex; flex-direction: row;'>
             <div style='height: 540px; width: 300px; background-color: #333b3d; padding: 6px 6px 0 6px;'>
         """
@@ -1267,10 +1429,10 @@ class Run:
             html += f"""
                 <div style='display: flex; height: 51.6px; width: 100%; background-color: {BLIND_COLORS[self._blind]}; border-radius: 12px; color: white; align-items: center; justify-content: center; font-size: 38.4px; text-shadow: 3.6px 3.6px rgba(0, 0, 0, 0.5)'>{self._blind.value}</div>
                 <div style='display: flex; height: 102px; width: 100%; background-color: {BLIND_COLORS[self._blind]+"55"}; border-radius: 12px; color: white; align-items: center; justify-content: center; font-size: 31.2px; margin-top: 6px'>
-                    <img style='filter: drop-shadow(6px 6px rgba(0, 0, 0, 0.5));' src='data:image/png;base64,{blind_base64}'/>
+                    <img style='filter: drop-shadow(6px 6px rgba(0, 0, 0, 0.5));' src='{blind_data_uri}'/>
                     <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); display: flex; flex-direction: column; height: 60%; width: 50%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; margin-left: 6px; padding: 6px'>
                         <div style='display: flex; align-items: center; justify-content: center; color: #e35646; font-size: {43.2 - max(0, len(round_goal) - 3) * 2.1}px'>
-                            <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='data:image/png;base64,{stake_base64}'/>
+                            <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='{stake_data_uri}'/>
                             {round_goal}
                         </div>
                         <div style='font-size: 19.2px; display: flex; align-items: center; justify-content: center; width: 100%;'>
@@ -1280,10 +1442,8 @@ class Run:
                 </div>
             """
         elif self._shop_cards is not None:
-            from .sprites import SHOP_SIGN
-
             html += f"""
-                <img style='width: 280px; margin-left: 9px; margin-top: 16px' src='data:image/png;base64,{base64.b64encode(SHOP_SIGN).decode("utf-8")}'/>
+                <img style='width: 280px; margin-left: 9px; margin-top: 16px' src='{_get_shop_sign_data_uri()}'/>
             """
         elif self._state is State.SELECTING_BLIND or self._state is State.OPENING_PACK:
             html += f"""
@@ -1300,7 +1460,7 @@ class Run:
                 <div style='display: flex; height: 60px; width: 100%; background-color: #172022; border-radius: 12px; color: white; align-items: center; justify-content: center; font-size: 24px; margin-top: 6px'>
                     Round<br/>score
                     <div style='display: flex; height: 75%; width: 66%; background-color: #3a4b50; border-radius: 12px; color: white; align-items: center; justify-content: center; font-size: {43.2 - (0 if self.round_score < 1_000_000 else (len(format_number(self.round_score)) - 6) * 2.4)}px; margin-left: 18px;'>
-                        <img style='margin-right: 8.4px; height: 32.4px; width: 32.4px' src='data:image/png;base64,{stake_base64}'/>
+                        <img style='margin-right: 8.4px; height: 32.4px; width: 32.4px' src='{stake_data_uri}'/>
                         {format_number(self.round_score)}
                     </div>
                 </div>
@@ -1308,24 +1468,6 @@ class Run:
                     <div style='display: flex; flex-direction: column; align-items: center; height: 100%; width: 47%;'>
         """
 
-        POKER_HAND_SHORTHAND = {
-            PokerHand.FIVE_OF_A_KIND: "5 of a Kind",
-            PokerHand.STRAIGHT_FLUSH: "Str. Flush",
-            PokerHand.FOUR_OF_A_KIND: "4 of a Kind",
-            PokerHand.THREE_OF_A_KIND: "3 of a Kind",
-        }
-
-        POKER_HAND_LEVEL_COLORS = [
-            None,
-            "WhiteSmoke",
-            "CornflowerBlue",
-            "LightGreen",
-            "PaleGoldenRod",
-            "Orange",
-            "Salmon",
-            "Plum",
-        ]
-
         unlocked_poker_hands = self._unlocked_poker_hands
 
         for poker_hand in PokerHand:
@@ -1383,8 +1525,8 @@ class Run:
             if voucher2 in self._vouchers:
                 html += f"""
                         <div style='position: relative; display: flex; justify-content: center; align-items: center; height: 45.6px;'>
-                            <img src='data:image/png;base64,{base64.b64encode(voucher1._repr_png_()).decode("utf-8")}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); position: absolute; height: 45.6px; transform: rotate(-8deg) translate(-3.6px); z-index: 1;'/>
-                            <img src='data:image/png;base64,{base64.b64encode(voucher2._repr_png_()).decode("utf-8")}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); position: absolute; height: 45.6px; transform: rotate(8deg) translate(3.6px); z-index: 2;'/>
+                            <img src='{_get_data_uri(voucher1)}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); position: absolute; height: 45.6px; transform: rotate(-8deg) translate(-3.6px); z-index: 1;'/>
+                            <img src='{_get_data_uri(voucher2)}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); position: absolute; height: 45.6px; transform: rotate(8deg) translate(3.6px); z-index: 2;'/>
                         </div>
                 """
                 slots_left -= 1
@@ -1395,7 +1537,7 @@ class Run:
             if voucher1 in self._vouchers and voucher2 not in self._vouchers:
                 html += f"""
                         <div style='position: relative; display: flex; justify-content: center; align-items: center; height: 45.6px;'>
-                            <img src='data:image/png;base64,{base64.b64encode(voucher1._repr_png_()).decode("utf-8")}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); height: 45.6px;'/>
+                            <img src='{_get_data_uri(voucher1)}' style='filter: drop-shadow(2.4px 2.4px rgba(0, 0, 0, 0.5)); height: 45.6px;'/>
                         </div>
                 """
                 slots_left -= 1
@@ -1408,23 +1550,13 @@ class Run:
             base64.b64encode(consumable._repr_png_()).decode("utf-8")
             for consumable in self._consumables
         ]
-        tag_images = [
-            base64.b64encode(tag._repr_png_()).decode("utf-8") for tag in self._tags
-        ]
-
-        pack_background_colors = {
-            "Arcana Pack": "#654885",
-            "Celestial Pack": "#1c2527",
-            "Spectral Pack": "#3c64c8",
-            "Standard Pack": "#8d342b",
-            "Buffoon Pack": "#a06423",
-        }
+        tag_images = [_get_data_uri(tag) for tag in self._tags]
 
         html += f"""
                     </div>
                 </div>
             </div>
-            <div style='height: 546px; width: 772px; background-color: {pack_background_colors[" ".join(self._opened_pack.value.split(" ")[-2:])] if self._opened_pack is not None else BLIND_COLORS[self._blind] if self._state is State.PLAYING_BLIND and self._is_boss_blind else "#365a46"}'>
+            <div style='height: 546px; width: 772px; background-color: {PACK_BACKGROUND_COLORS[" ".join(self._opened_pack.value.split(" ")[-2:])] if self._opened_pack is not None else BLIND_COLORS[self._blind] if self._state is State.PLAYING_BLIND and self._is_boss_blind else "#365a46"}'>
                 <div style='position: absolute; height: 132px; width: 492px; background-color: rgba(0, 0, 0, 0.1); border-radius: 12px; left: 336px; top: 42px; display: flex; align-items: center; justify-content: space-evenly;'>
                     {' '.join(f"""
                         <img src='data:image/png;base64,{joker_images[i]}' style='width: {68.88 if isinstance(joker, WeeJoker) else 98.4}px; position: relative; z-index: {i+1}; margin-left: {-(98.4 * max(0, len(self._jokers) - 5))/(len(self._jokers) - 1) if i > 0 else 0}px; filter: drop-shadow(0px 8.4px rgba(0, 0, 0, 0.5))'/>
@@ -1438,12 +1570,12 @@ class Run:
                 </div>
                 <span style='color: white; font-size: 14px; position: absolute; left: 1014px; top: 175.2px'>{len(self._consumables)}/{self.consumable_slots}</span>
 
-                <img src='data:image/png;base64,{base64.b64encode(self._deck._repr_png_()).decode("utf-8")}' style='position: absolute; bottom: 42px; left: 938.4px; width: 98.4px; filter: drop-shadow(-6px 6px Gray) drop-shadow(-3.6px 3.6px Gray) drop-shadow(-1.2px 1.2px Gray) drop-shadow(-14.4px 2.4px rgba(0, 0, 0, 0.2));'/>
+                <img src='{_get_data_uri(self._deck)}' style='position: absolute; bottom: 42px; left: 938.4px; width: 98.4px; filter: drop-shadow(-6px 6px Gray) drop-shadow(-3.6px 3.6px Gray) drop-shadow(-1.2px 1.2px Gray) drop-shadow(-14.4px 2.4px rgba(0, 0, 0, 0.2));'/>
                 <span style='color: white; font-size: 14px; position: absolute; left: 996px; bottom: 16px'>{len(self.deck_cards_left)}/{len(self._deck_cards)}</span>
 
                 <div style='display: flex; flex-direction: column; align-items: center; justify-content: flex-end; gap: 5px; position: absolute; height: 500px; width: 37px; bottom: 35px; left: 1048px'>
                     {' '.join(f"""
-                        <img src='data:image/png;base64,{tag_images[i]}' style='width: 37px; position: relative; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))'/>
+                        <img src='{tag_images[i]}' style='width: 37px; position: relative; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))'/>
                     """ for i, tag in enumerate(self._tags))}
                 </div>
             </div>
@@ -1491,9 +1623,7 @@ class Run:
                     <div style='display: flex; flex-wrap: wrap; justify-content: center; transform: translateY(-19.2px)'>
         """
         for voucher, cost in self._shop_vouchers:
-            png_bytes = voucher._repr_png_()
-            png_base64 = base64.b64encode(png_bytes).decode("utf-8")
-            voucher_html = f"<img style='width: 98.4px; filter: drop-shadow(0px 3.6px rgba(0, 0, 0, 0.5))' src='data:image/png;base64,{png_base64}'/>"
+            voucher_html = f"<img style='width: 98.4px; filter: drop-shadow(0px 3.6px rgba(0, 0, 0, 0.5))' src='{_get_data_uri(voucher)}'/>"
 
             html += f"""
                         <div style='display: flex; flex-direction: column; align-items: center;'>
@@ -1508,9 +1638,7 @@ class Run:
                     <div style='display: flex; flex-wrap: wrap; justify-content: center; transform: translateY(-21.6px)'>
         """
         for pack, cost in self._shop_packs:
-            png_bytes = pack._repr_png_()
-            png_base64 = base64.b64encode(png_bytes).decode("utf-8")
-            pack_html = f"<img src='data:image/png;base64,{png_base64}' style='height: 150px; filter: drop-shadow(0px 3.6px rgba(0, 0, 0, 0.5))'/>"
+            pack_html = f"<img src='{_get_data_uri(pack)}' style='height: 150px; filter: drop-shadow(0px 3.6px rgba(0, 0, 0, 0.5))'/>"
 
             html += f"""
                         <div style='display: flex; flex-direction: column; align-items: center;'>
@@ -1580,7 +1708,7 @@ class Run:
         return html + self._repr_frame()
 
     def _repr_selecting_blind(self) -> str:
-        stake_base64 = base64.b64encode(self._stake._repr_png_()).decode("utf-8")
+        stake_data_uri = _get_data_uri(self._stake)
 
         round_goal = format_number(self._get_round_goal(Blind.SMALL_BLIND))
         blind_reward = self._get_blind_reward(Blind.SMALL_BLIND)
@@ -1589,10 +1717,10 @@ class Run:
             <div style='position: absolute; background-color: #333b3d; width: 160px; height: {360 if self._blind is Blind.SMALL_BLIND else 320}px; bottom: 9px; border-radius: 10px 10px 0 0; display: flex; align-items: center; justify-content: center; left: 350px; border-top: 2px solid {BLIND_COLORS[Blind.SMALL_BLIND]}; border-left: 2px solid {BLIND_COLORS[Blind.SMALL_BLIND]}; border-right: 2px solid {BLIND_COLORS[Blind.SMALL_BLIND]}; opacity: {1 if self._blind is Blind.SMALL_BLIND else 0.75}'>
                 <button style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 75%; height: 30px; display: flex; align-items: center; justify-content: center; background-color: {"#dc8c32" if self._blind is Blind.SMALL_BLIND else "#4f4f4f"}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 10px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>Select</button>
                 <div style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 80%; height: 25px; display: flex; align-items: center; justify-content: center; background-color: {BLIND_COLORS[Blind.SMALL_BLIND]}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 46px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>Small Blind</div>
-                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='data:image/png;base64,{base64.b64encode(Blind.SMALL_BLIND._repr_png_()).decode("utf-8")}'/>
+                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='{_get_data_uri(Blind.SMALL_BLIND)}'/>
                 <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); position: absolute; top: 154px; display: flex; flex-direction: column; height: 50px; width: 80%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; padding: 6px'>
                     <div style='display: flex; align-items: center; justify-content: center; color: #e35646; font-size: {36 - max(0, len(round_goal) - 3) * 1.8}px'>
-                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='data:image/png;base64,{stake_base64}'/>
+                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='{stake_data_uri}'/>
                         {round_goal}
                     </div>
                     <div style='font-size: 17px; display: flex; align-items: center; justify-content: center; width: 100%;'>
@@ -1605,7 +1733,7 @@ class Run:
             html += f"""
                 <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); position: absolute; top: 228px; display: flex; flex-direction: column; height: 57px; width: 80%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; padding: 4px 6px'>
                     <div style='display: flex; align-items: center; justify-content: center;'>
-                        <img style='margin-right: 3px; width: 37px; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))' src='data:image/png;base64,{base64.b64encode(self._ante_tags[0][0]._repr_png_()).decode("utf-8")}'/>
+                        <img style='margin-right: 3px; width: 37px; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))' src='{_get_data_uri(self._ante_tags[0][0])}'/>
                         <button style='display: flex; justify-content: center; align-items: center; background-color: {"#4f4f4f" if self._blind is not Blind.SMALL_BLIND else"#e35646"}; border-radius: 12px; text-align: center; height: 48px; width: 100px; color: white; font-size: 17px; text-shadow: 1px 1px rgba(0, 0, 0, 0.5); filter: drop-shadow(3.6px 3.6px rgba(0, 0, 0, 0.5))'>Skip Blind</button>
                     </div>
                 </div>
@@ -1620,10 +1748,10 @@ class Run:
             <div style='position: absolute; background-color: #333b3d; width: 160px; height: {360 if self._blind is Blind.BIG_BLIND else 320}px; bottom: 9px; border-radius: 10px 10px 0 0; display: flex; align-items: center; justify-content: center; left: 540px; border-top: 2px solid {BLIND_COLORS[Blind.BIG_BLIND]}; border-left: 2px solid {BLIND_COLORS[Blind.BIG_BLIND]}; border-right: 2px solid {BLIND_COLORS[Blind.BIG_BLIND]}; opacity: {1 if self._blind is Blind.BIG_BLIND else 0.75}'>
                 <button style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 75%; height: 30px; display: flex; align-items: center; justify-content: center; background-color: {"#dc8c32" if self._blind is Blind.BIG_BLIND else "#4f4f4f"}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 10px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>Select</button>
                 <div style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 80%; height: 25px; display: flex; align-items: center; justify-content: center; background-color: {BLIND_COLORS[Blind.BIG_BLIND]}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 46px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>Big Blind</div>
-                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='data:image/png;base64,{base64.b64encode(Blind.BIG_BLIND._repr_png_()).decode("utf-8")}'/>
+                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='{_get_data_uri(Blind.BIG_BLIND)}'/>
                 <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); position: absolute; top: 154px; display: flex; flex-direction: column; height: 50px; width: 80%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; padding: 6px'>
                     <div style='display: flex; align-items: center; justify-content: center; color: #e35646; font-size: {36 - max(0, len(round_goal) - 3) * 2}px'>
-                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='data:image/png;base64,{stake_base64}'/>
+                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='{stake_data_uri}'/>
                         {round_goal}
                     </div>
                     <div style='font-size: 17px; display: flex; align-items: center; justify-content: center; width: 100%;'>
@@ -1636,7 +1764,7 @@ class Run:
             html += f"""
                 <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); position: absolute; top: 228px; display: flex; flex-direction: column; height: 57px; width: 80%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; padding: 4px 6px'>
                     <div style='display: flex; align-items: center; justify-content: center;'>
-                        <img style='margin-right: 3px; width: 37px; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))' src='data:image/png;base64,{base64.b64encode(self._ante_tags[1][0]._repr_png_()).decode("utf-8")}'/>
+                        <img style='margin-right: 3px; width: 37px; filter: drop-shadow(-3px 3px rgba(0, 0, 0, 0.5))' src='{_get_data_uri(self._ante_tags[1][0])}'/>
                         <button style='display: flex; justify-content: center; align-items: center; background-color: {"#4f4f4f" if self._blind is not Blind.BIG_BLIND else"#e35646"}; border-radius: 12px; text-align: center; height: 48px; width: 100px; color: white; font-size: 17px; text-shadow: 1px 1px rgba(0, 0, 0, 0.5); filter: drop-shadow(3.6px 3.6px rgba(0, 0, 0, 0.5))'>Skip Blind</button>
                     </div>
                 </div>
@@ -1651,10 +1779,10 @@ class Run:
             <div style='position: absolute; background-color: #333b3d; width: 160px; height: {360 if self._is_boss_blind else 320}px; bottom: 9px; border-radius: 10px 10px 0 0; display: flex; align-items: center; justify-content: center; left: 730px; border-top: 2px solid {BLIND_COLORS[self._boss_blind]}; border-left: 2px solid {BLIND_COLORS[self._boss_blind]}; border-right: 2px solid {BLIND_COLORS[self._boss_blind]}; opacity: {1 if self._is_boss_blind else 0.75}'>
                 <button style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 75%; height: 30px; display: flex; align-items: center; justify-content: center; background-color: {"#dc8c32" if self._is_boss_blind else "#4f4f4f"}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 10px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>Select</button>
                 <div style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); width: 80%; height: 25px; display: flex; align-items: center; justify-content: center; background-color: {BLIND_COLORS[self._boss_blind]}; color: white; font-size: 19px; border-radius: 10px; position: absolute; top: 46px; text-shadow: 1.2px 1.2px rgba(0, 0, 0, 0.5)'>{self._boss_blind.value}</div>
-                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='data:image/png;base64,{base64.b64encode(self._boss_blind._repr_png_()).decode("utf-8")}'/>
+                <img style='filter: drop-shadow(0px 2px rgba(0, 0, 0, 0.5)); position: absolute; top: 81px' src='{_get_data_uri(self._boss_blind)}'/>
                 <div style='filter: drop-shadow(0px 3px rgba(0, 0, 0, 0.5)); position: absolute; top: 154px; display: flex; flex-direction: column; height: 50px; width: 80%; background-color: #172022; border-radius: 12px; align-items: center; justify-content: center; font-size: 43.2px; padding: 6px'>
                     <div style='display: flex; align-items: center; justify-content: center; color: #e35646; font-size: {36 - max(0, len(round_goal) - 3) * 2}px'>
-                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='data:image/png;base64,{stake_base64}'/>
+                        <img style='margin-right: 5px; height: 32.4px; width: 32.4px' src='{stake_data_uri}'/>
                         {round_goal}
                     </div>
                     <div style='font-size: 17px; display: flex; align-items: center; justify-content: center; width: 100%;'>
@@ -1670,16 +1798,16 @@ class Run:
             self._hand.sort(
                 key=lambda card: (
                     card.is_stone_card,
-                    list(Suit).index(card.suit),
-                    list(Rank).index(card.rank),
+                    _get_index(card.suit),
+                    _get_index(card.rank),
                 )
             )
         else:
             self._hand.sort(
                 key=lambda card: (
                     card.is_stone_card,
-                    list(Rank).index(card.rank),
-                    list(Suit).index(card.suit),
+                    _get_index(card.rank),
+                    _get_index(card.suit),
                 )
             )
 
@@ -1689,9 +1817,21 @@ class Run:
         played_cards: list[Card],
         scored_card_indices: list[int],
         poker_hands_played: list[PokerHand],
+        retrigger: int = 0,
     ) -> None:
+        trace = self._trace
+        if trace is not None:
+            trace._set_source(
+                TraceSource.PLAYED_CARD, scored_card, TraceEffect.CARD, retrigger
+            )
+
         self._chips += scored_card.chips
 
+        if trace is not None:
+            trace._set_source(
+                TraceSource.PLAYED_CARD, scored_card, TraceEffect.ENHANCEMENT, retrigger
+            )
+
         match scored_card:
             case Enhancement.BONUS:
                 self._chips += 30
@@ -1705,8 +1845,17 @@ class Run:
                         joker._on_lucky_card_triggered()
 
         if scored_card == Seal.GOLD:
+            if trace is not None:
+                trace._set_source(
+                    TraceSource.PLAYED_CARD, scored_card, TraceEffect.SEAL, retrigger
+                )
             self._money += 3
 
+        if trace is not None:
+            trace._set_source(
+                TraceSource.PLAYED_CARD, scored_card, TraceEffect.EDITION, retrigger
+            )
+
         match scored_card:
             case Edition.FOIL:
                 self._chips += 50
@@ -1716,15 +1865,29 @@ class Run:
                 self._mult *= 1.5
 
         for joker in self._jokers:
+            if trace is not None:
+                trace._set_source(
+                    TraceSource.JOKER, joker, TraceEffect.CARD_SCORED, retrigger
+                )
             joker._on_card_scored(
                 scored_card, played_cards, scored_card_indices, poker_hands_played
             )
 
-    def _trigger_held_card(self, held_card: Card) -> None:
+    def _trigger_held_card(self, held_card: Card, retrigger: int = 0) -> None:
+        trace = self._trace
+        if trace is not None:
+            trace._set_source(
+                TraceSource.HELD_CARD, held_card, TraceEffect.ENHANCEMENT, retrigger
+            )
+
         if held_card == Enhancement.STEEL:
             self._mult *= 1.5
 
         for joker in self._jokers:
+            if trace is not None:
+                trace._set_source(
+                    TraceSource.JOKER, joker, TraceEffect.CARD_HELD, retrigger
+                )
             joker._on_card_held(held_card)
 
     def _trigger_held_card_round_end(
@@ -1756,22 +1919,23 @@ class Run:
         self, consumable: Consumable, card_indices: list[int] | None = None
     ) -> None:
         if card_indices is not None:
-            if self._hand is None:
-                raise InvalidArgumentsError(
-                    f"Selected card indices should be None when there is no hand, but got {card_indices}"
-                )
-            if not (1 <= len(card_indices) <= 5):
-                raise InvalidArgumentsError(
-                    f"Selected card indices should have length 1-5, but got {len(card_indices)}"
-                )
-            if any((i not in range(len(self._hand)) for i in card_indices)):
-                raise InvalidArgumentsError(
-                    f"Selected cards indices should all be within the range of the hand, but got {card_indices}"
-                )
-            if len(set(card_indices)) < len(card_indices):
-                raise InvalidArgumentsError(
-                    f"Selected card indices should all be unique, but got {card_indices}"
-                )
+            if not self._unchecked:
+                if self._hand is None:
+                    raise InvalidArgumentsError(
+                        f"Selected card indices should be None when there is no hand, but got {card_indices}"
+                    )
+                if not (1 <= len(card_indices) <= 5):
+                    raise InvalidArgumentsError(
+                        f"Selected card indices should have length 1-5, but got {len(card_indices)}"
+                    )
+                if any((i not in range(len(self._hand)) for i in card_indices)):
+                    raise InvalidArgumentsError(
+                        f"Selected cards indices should all be within the range of the hand, but got {card_indices}"
+                    )
+                if len(set(card_indices)) < len(card_indices):
+                    raise InvalidArgumentsError(
+                        f"Selected card indices should all be unique, but got {card_indices}"
+                    )
 
             selected_cards = [self._hand[i] for i in card_indices]
         else:
@@ -1871,11 +2035,13 @@ class Run:
                             )
 
                         if self._chance(1, 4):
-                            r.choice(valid_jokers).edition = r.choices(
-                                list(UPGRADED_EDITION_WEIGHTS),
-                                weights=UPGRADED_EDITION_WEIGHTS.values(),
-                                k=1,
-                            )[0]
+                            self._random.choice(valid_jokers).edition = (
+                                self._random.choices(
+                                    list(UPGRADED_EDITION_WEIGHTS),
+                                    weights=UPGRADED_EDITION_WEIGHTS.values(),
+                                    k=1,
+                                )[0]
+                            )
                     case Tarot.STRENGTH:
                         if not (1 <= len(selected_cards) <= 2):
                             raise InvalidArgumentsError(
@@ -1983,13 +2149,13 @@ class Run:
                         if not self._hand:
                             raise IllegalActionError("Familiar requires a hand to use")
 
-                        self._destroy_card(r.choice(self._hand))
+                        self._destroy_card(self._random.choice(self._hand))
 
                         for _ in range(3):
                             random_face_card = self._get_random_card(
                                 ranks=[Rank.KING, Rank.QUEEN, Rank.JACK]
                             )
-                            random_face_card.enhancement = r.choice(
+                            random_face_card.enhancement = self._random.choice(
                                 [
                                     enhancement
                                     for enhancement in Enhancement
@@ -2001,11 +2167,11 @@ class Run:
                         if not self._hand:
                             raise IllegalActionError("Grim requires a hand to use")
 
-                        self._destroy_card(r.choice(self._hand))
+                        self._destroy_card(self._random.choice(self._hand))
 
                         for _ in range(2):
                             random_ace = self._get_random_card(ranks=[Rank.ACE])
-                            random_ace.enhancement = r.choice(
+                            random_ace.enhancement = self._random.choice(
                                 [
                                     enhancement
                                     for enhancement in Enhancement
@@ -2019,13 +2185,13 @@ class Run:
                                 "Incantation requires a hand to use"
                             )
 
-                        self._destroy_card(r.choice(self._hand))
+                        self._destroy_card(self._random.choice(self._hand))
 
                         for _ in range(4):
                             random_numbered_card = self._get_random_card(
                                 ranks=list(Rank)[4:]
                             )
-                            random_numbered_card.enhancement = r.choice(
+                            random_numbered_card.enhancement = self._random.choice(
                                 [
                                     enhancement
                                     for enhancement in Enhancement
@@ -2046,7 +2212,7 @@ class Run:
                                 f"Aura requires 1 selected card, but got {len(selected_cards)}"
                             )
 
-                        selected_cards[0].edition = r.choices(
+                        selected_cards[0].edition = self._random.choices(
                             list(UPGRADED_EDITION_WEIGHTS),
                             weights=UPGRADED_EDITION_WEIGHTS.values(),
                             k=1,
@@ -2063,7 +2229,7 @@ class Run:
                         if not self._hand:
                             raise IllegalActionError("Sigil requires a hand to use")
 
-                        random_suit = r.choice(list(Suit))
+                        random_suit = self._random.choice(list(Suit))
                         for card in self._hand:
                             card.suit = random_suit
                     case Spectral.OUIJA:
@@ -2075,7 +2241,7 @@ class Run:
                                 "Ouija requires a hand size greater than 1 to use"
                             )
 
-                        random_rank = r.choice(list(Rank))
+                        random_rank = self._random.choice(list(Rank))
                         for card in self._hand:
                             card.rank = random_rank
                         self._hand_size_penalty += 1
@@ -2090,7 +2256,7 @@ class Run:
                                 "Ectoplasm requires a hand size greater than 1 to use"
                             )
 
-                        r.choice(self._jokers).edition = Edition.NEGATIVE
+                        self._random.choice(self._jokers).edition = Edition.NEGATIVE
                         self._hand_size_penalty += 1 + self._num_ectoplasms_used
                         self._num_ectoplasms_used += 1
                     case Spectral.IMMOLATE:
@@ -2101,7 +2267,7 @@ class Run:
                             if not self._hand:
                                 break
 
-                            self._destroy_card(r.choice(self._hand))
+                            self._destroy_card(self._random.choice(self._hand))
                         self._money += 20
                     case Spectral.ANKH:
                         if not self._jokers:
@@ -2116,7 +2282,7 @@ class Run:
                                 "Ankh cannot make room for a new Joker"
                             )
 
-                        copied_joker = r.choice(self._jokers)
+                        copied_joker = self._random.choice(self._jokers)
                         joker_copy = self._create_joker(
                             type(copied_joker),
                             (
@@ -2153,7 +2319,7 @@ class Run:
                                 "Hex requires at least one base Joker to use"
                             )
 
-                        random_joker = r.choice(valid_jokers)
+                        random_joker = self._random.choice(valid_jokers)
                         random_joker.edition = Edition.POLYCHROME
 
                         for joker in self._jokers[:]:
@@ -2195,6 +2361,7 @@ class Run:
                         for poker_hand in PokerHand:
                             self._poker_hand_info[poker_hand][0] += 1
 
+    @_logged_action
     def buy_shop_card(self, shop_card_index: int, use: bool = False) -> None:
         """
         Buy a shop card
@@ -2204,20 +2371,22 @@ class Run:
             use (bool): Whether to use the card immediately after buying it. Defaults to False.
         """
 
-        if self._state is not State.IN_SHOP:
-            raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
+        if not self._unchecked:
+            if self._state is not State.IN_SHOP:
+                raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
 
-        if shop_card_index not in range(len(self._shop_cards)):
-            raise InvalidArgumentsError(
-                f"Invalid shop card index {shop_card_index}, must be in range({len(self._shop_cards)})"
-            )
+            if shop_card_index not in range(len(self._shop_cards)):
+                raise InvalidArgumentsError(
+                    f"Invalid shop card index {shop_card_index}, must be in range({len(self._shop_cards)})"
+                )
 
         shop_card, cost = self._shop_cards[shop_card_index]
 
-        if self._available_money < cost:
-            raise InsufficientFundsError(
-                f"Insufficient funds to buy {shop_card!r}, cost: {cost}, available: {self._available_money}"
-            )
+        if not self._unchecked:
+            if self._available_money < cost:
+                raise InsufficientFundsError(
+                    f"Insufficient funds to buy {shop_card!r}, cost: {cost}, available: {self._available_money}"
+                )
 
         self._money -= cost
         self._shop_cards.pop(shop_card_index)
@@ -2259,15 +2428,17 @@ class Run:
             self._inflation_amount += 1
             self._update_shop_costs()
 
+    @_logged_action
     def cash_out(self) -> None:
         """
         Collect the money earned from the round and proceed to the shop
         """
 
-        if self._state is not State.CASHING_OUT:
-            raise IllegalActionError(
-                f"Excpected state to be CASHING_OUT, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.CASHING_OUT:
+                raise IllegalActionError(
+                    f"Excpected state to be CASHING_OUT, but got {self._state}"
+                )
 
         self._money += self.cash_out_total
         self._round_score = None
@@ -2290,6 +2461,7 @@ class Run:
         self._populate_shop()
         self._state = State.IN_SHOP
 
+    @_logged_action
     def choose_pack_item(
         self, item_index: int, card_indices: list[int] | None = None
     ) -> None:
@@ -2301,15 +2473,16 @@ class Run:
             card_indices (list[int], optional): The indices of the cards in hand to use the item on (0-indexed), or none
         """
 
-        if self._state is not State.OPENING_PACK:
-            raise IllegalActionError(
-                f"Expected state to be OPENING_PACK, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.OPENING_PACK:
+                raise IllegalActionError(
+                    f"Expected state to be OPENING_PACK, but got {self._state}"
+                )
 
-        if item_index not in range(len(self._pack_items)):
-            raise InvalidArgumentsError(
-                f"Item index should be in range(len(pack_items)), but got {item_index}"
-            )
+            if item_index not in range(len(self._pack_items)):
+                raise InvalidArgumentsError(
+                    f"Item index should be in range(len(pack_items)), but got {item_index}"
+                )
 
         item = self._pack_items[item_index]
 
@@ -2334,6 +2507,7 @@ class Run:
         if self._pack_choices_left == 0:
             self._close_pack()
 
+    @_logged_action
     def discard(self, discard_indices: list[int]) -> None:
         """
         Discard cards from hand and draw new ones
@@ -2342,28 +2516,29 @@ class Run:
             discard_indices (list[int]): The indices of the cards in hand to discard (0-indexed)
         """
 
-        if self._state is not State.PLAYING_BLIND:
-            raise IllegalActionError(
-                f"Expected state to be PLAYING_BLIND, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.PLAYING_BLIND:
+                raise IllegalActionError(
+                    f"Expected state to be PLAYING_BLIND, but got {self._state}"
+                )
 
-        if self._discards == 0:
-            raise NoDiscardsRemainingError("No discards left")
+            if self._discards == 0:
+                raise NoDiscardsRemainingError("No discards left")
 
-        if not (1 <= len(discard_indices) <= 5):
-            raise InvalidArgumentsError(
-                f"Discard indices should have length 1-5, but got {len(discard_indices)}"
-            )
+            if not (1 <= len(discard_indices) <= 5):
+                raise InvalidArgumentsError(
+                    f"Discard indices should have length 1-5, but got {len(discard_indices)}"
+                )
 
-        if any(i not in range(len(self._hand)) for i in discard_indices):
-            raise InvalidArgumentsError(
-                f"Discard indices should all be within the range of the hand, but got {discard_indices}"
-            )
+            if any(i not in range(len(self._hand)) for i in discard_indices):
+                raise InvalidArgumentsError(
+                    f"Discard indices should all be within the range of the hand, but got {discard_indices}"
+                )
 
-        if len(set(discard_indices)) < len(discard_indices):
-            raise InvalidArgumentsError(
-                f"Discard indices should all be unique, but got {discard_indices}"
-            )
+            if len(set(discard_indices)) < len(discard_indices):
+                raise InvalidArgumentsError(
+                    f"Discard indices should all be unique, but got {discard_indices}"
+                )
 
         self._discard(discard_indices)
 
@@ -2376,15 +2551,168 @@ class Run:
         if not self._deal():
             self._game_over()
 
+    def legal_actions(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Gets a boolean mask over balatro.actions.ACTIONS of the actions that can be taken without raising
+
+        Card indices that an action ignores, such as when choosing a Joker from a pack or using
+        a consumable that doesn't select cards, are only legal when empty so every move appears
+        once. Requires NumPy.
+
+        Args:
+            out (np.ndarray, optional): A boolean array of length NUM_ACTIONS to write the mask into, or none for a new one
+        """
+
+        import numpy as np
+
+        from .actions import (
+            ACTION_OFFSETS,
+            JOKER_MOVE_MAX_INDICES,
+            JOKER_MOVE_MIN_INDICES,
+            MAX_CONSUMABLES,
+            MAX_JOKERS,
+            MAX_PACK_ITEMS,
+            MAX_SHOP_CARDS,
+            MAX_SHOP_PACKS,
+            MAX_SHOP_VOUCHERS,
+            NUM_ACTIONS,
+            TARGET_SUBSETS,
+            ActionType,
+            _get_card_mask,
+            _get_target_mask,
+        )
+
+        if out is None:
+            out = np.zeros(NUM_ACTIONS, dtype=bool)
+        else:
+            out[:] = False
+
+        if self._state is State.GAME_OVER:
+            return out
+
+        num_cards = len(self._hand) if self._hand is not None else 0
+        num_targets = len(TARGET_SUBSETS)
+        available_money = self._available_money
+
+        match self._state:
+            case State.SELECTING_BLIND:
+                out[ACTION_OFFSETS[ActionType.SELECT_BLIND]] = True
+                out[ACTION_OFFSETS[ActionType.SKIP_BLIND]] = not self._is_boss_blind
+                out[ACTION_OFFSETS[ActionType.REROLL_BOSS_BLIND]] = (
+                    Voucher.DIRECTORS_CUT in self._vouchers
+                    and (
+                        Voucher.RETCON in self._vouchers
+                        or not self._rerolled_boss_blind
+                    )
+                    and available_money >= 10
+                )
+            case State.PLAYING_BLIND:
+                card_mask = _get_card_mask(num_cards, self._forced_selected_card_index)
+                start = ACTION_OFFSETS[ActionType.PLAY_HAND]
+                out[start : start + len(card_mask)] = card_mask
+
+                if self._discards != 0:
+                    card_mask = _get_card_mask(num_cards)
+                    start = ACTION_OFFSETS[ActionType.DISCARD]
+                    out[start : start + len(card_mask)] = card_mask
+            case State.CASHING_OUT:
+                out[ACTION_OFFSETS[ActionType.CASH_OUT]] = True
+            case State.IN_SHOP:
+                buy_start = ACTION_OFFSETS[ActionType.BUY_SHOP_CARD]
+                use_start = ACTION_OFFSETS[ActionType.BUY_AND_USE_SHOP_CARD]
+                for i, (shop_card, cost) in enumerate(
+                    self._shop_cards[:MAX_SHOP_CARDS]
+                ):
+                    if available_money < cost:
+                        continue
+
+                    match shop_card:
+                        case BalatroJoker():
+                            out[buy_start + i] = len(
+                                self._jokers
+                            ) < self.joker_slots + (
+                                shop_card.edition is Edition.NEGATIVE
+                            )
+                        case Consumable():
+                            out[buy_start + i] = (
+                                len(self._consumables) < self.consumable_slots
+                            )
+                            # buying and using selects no cards
+                            out[use_start + i] = (
+                                shop_card.card not in CONSUMABLE_SELECTION_LIMITS
+                                and self._can_use_consumable(shop_card, False)
+                            )
+                        case Card():
+                            out[buy_start + i] = True
+
+                start = ACTION_OFFSETS[ActionType.OPEN_SHOP_PACK]
+                for i, (_, cost) in enumerate(self._shop_packs[:MAX_SHOP_PACKS]):
+                    out[start + i] = available_money >= cost
+
+                start = ACTION_OFFSETS[ActionType.REDEEM_SHOP_VOUCHER]
+                for i, (_, cost) in enumerate(self._shop_vouchers[:MAX_SHOP_VOUCHERS]):
+                    out[start + i] = available_money >= cost
+
+                out[ACTION_OFFSETS[ActionType.REROLL]] = (
+                    available_money >= self.reroll_cost
+                )
+                out[ACTION_OFFSETS[ActionType.NEXT_ROUND]] = True
+            case State.OPENING_PACK:
+                choose_start = ACTION_OFFSETS[ActionType.CHOOSE_PACK_ITEM]
+                for i, item in enumerate(self._pack_items[:MAX_PACK_ITEMS]):
+                    start = choose_start + i * num_targets
+                    match item:
+                        case BalatroJoker():
+                            out[start] = len(self._jokers) < self.joker_slots + (
+                                item.edition is Edition.NEGATIVE
+                            )
+                        case Consumable():
+                            if self._can_use_consumable(item, False):
+                                out[start : start + num_targets] = _get_target_mask(
+                                    *CONSUMABLE_SELECTION_LIMITS.get(item.card, (0, 0)),
+                                    num_cards,
+                                )
+                        case Card():
+                            out[start] = True
+
+                out[ACTION_OFFSETS[ActionType.SKIP_PACK]] = True
+
+        use_start = ACTION_OFFSETS[ActionType.USE_CONSUMABLE]
+        for i, consumable in enumerate(self._consumables[:MAX_CONSUMABLES]):
+            if self._can_use_consumable(consumable, True):
+                start = use_start + i * num_targets
+                out[start : start + num_targets] = _get_target_mask(
+                    *CONSUMABLE_SELECTION_LIMITS.get(consumable.card, (0, 0)),
+                    num_cards,
+                )
+
+        start = ACTION_OFFSETS[ActionType.SELL_JOKER]
+        for i, joker in enumerate(self._jokers[:MAX_JOKERS]):
+            out[start + i] = not joker.is_eternal
+
+        start = ACTION_OFFSETS[ActionType.SELL_CONSUMABLE]
+        out[start : start + min(len(self._consumables), MAX_CONSUMABLES)] = True
+
+        move_mask = JOKER_MOVE_MAX_INDICES < len(self._jokers)
+        if self.challenge is Challenge.ON_A_KNIFES_EDGE:
+            # the first Joker is pinned
+            move_mask &= JOKER_MOVE_MIN_INDICES > 0
+        start = ACTION_OFFSETS[ActionType.MOVE_JOKER]
+        out[start : start + len(move_mask)] = move_mask
+
+        return out
+
+    @_logged_action
     def next_round(self) -> None:
         """
         Exit the shop and proceed to the next round
         """
 
-        if self._state is not State.IN_SHOP:
-            raise IllegalActionError(
-                f"Expected state to be IN_SHOP, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.IN_SHOP:
+                raise IllegalActionError(
+                    f"Expected state to be IN_SHOP, but got {self._state}"
+                )
 
         self._reroll_cost = None
         self._chaos_used = None
@@ -2393,6 +2721,21 @@ class Run:
 
         self._state = State.SELECTING_BLIND
 
+    def observe(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Encodes the run as a fixed-shape observation, see balatro.observation.OBSERVATION_DTYPE
+
+        Writing into the same buffer every step avoids allocating a new one. Requires NumPy.
+
+        Args:
+            out (np.ndarray, optional): A 0-d array with OBSERVATION_DTYPE to write into, e.g. from balatro.observation.new_observation(), or none for a new one
+        """
+
+        from .observation import observe
+
+        return observe(self, out)
+
+    @_logged_action
     def play_hand(self, card_indices: list[int]) -> None:
         """
         Play a poker hand from cards in hand
@@ -2401,33 +2744,34 @@ class Run:
             card_indices (list[int]): The indices of the cards in hand to play, in order (0-indexed)
         """
 
-        if self._state is not State.PLAYING_BLIND:
-            raise IllegalActionError(
-                f"Expected state to be PLAYING_BLIND, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.PLAYING_BLIND:
+                raise IllegalActionError(
+                    f"Expected state to be PLAYING_BLIND, but got {self._state}"
+                )
 
-        if not (1 <= len(card_indices) <= 5):
-            raise InvalidArgumentsError(
-                f"Card indices should have length 1-5, but got {len(card_indices)}"
-            )
+            if not (1 <= len(card_indices) <= 5):
+                raise InvalidArgumentsError(
+                    f"Card indices should have length 1-5, but got {len(card_indices)}"
+                )
 
-        if any(i not in range(len(self._hand)) for i in card_indices):
-            raise InvalidArgumentsError(
-                f"Card indices should all be within the range of the hand, but got {card_indices}"
-            )
+            if any(i not in range(len(self._hand)) for i in card_indices):
+                raise InvalidArgumentsError(
+                    f"Card indices should all be within the range of the hand, but got {card_indices}"
+                )
 
-        if len(set(card_indices)) < len(card_indices):
-            raise InvalidArgumentsError(
-                f"Card indices should all be unique, but got {card_indices}"
-            )
+            if len(set(card_indices)) < len(card_indices):
+                raise InvalidArgumentsError(
+                    f"Card indices should all be unique, but got {card_indices}"
+                )
 
-        if (
-            self._forced_selected_card_index is not None
-            and self._forced_selected_card_index not in card_indices
-        ):
-            raise MissingForcedSelectedCardError(
-                f"Forced selected card index {self._forced_selected_card_index} not in card indices {card_indices}"
-            )
+            if (
+                self._forced_selected_card_index is not None
+                and self._forced_selected_card_index not in card_indices
+            ):
+                raise MissingForcedSelectedCardError(
+                    f"Forced selected card index {self._forced_selected_card_index} not in card indices {card_indices}"
+                )
 
         self._hands -= 1
         self._num_played_hands += 1
@@ -2469,6 +2813,10 @@ class Run:
         self._chips = poker_hand_chips
         self._mult = poker_hand_mult
 
+        trace = self._trace
+        if trace is not None:
+            trace._start(self, poker_hands_played[0], played_cards)
+
         boss_blind_triggered = False
 
         if self._boss_blind_disabled is False:
@@ -2521,6 +2869,8 @@ class Run:
                     boss_blind_triggered = True
 
         for joker in self._jokers:
+            if trace is not None:
+                trace._set_source(TraceSource.JOKER, joker, TraceEffect.HAND_PLAYED)
             joker._on_hand_played(played_cards, scored_card_indices, poker_hands_played)
 
         self._poker_hand_info[poker_hands_played[0]][1] += 1
@@ -2534,13 +2884,16 @@ class Run:
             self._trigger_scored_card(
                 scored_card, played_cards, scored_card_indices, poker_hands_played
             )
+            retrigger = 0
 
             if scored_card == Seal.RED:
+                retrigger += 1
                 self._trigger_scored_card(
                     scored_card,
                     played_cards,
                     scored_card_indices,
                     poker_hands_played,
+                    retrigger,
                 )
 
             for joker in self._jokers:
@@ -2552,45 +2905,74 @@ class Run:
                         poker_hands_played,
                     )
                 ):
+                    retrigger += 1
                     self._trigger_scored_card(
                         scored_card,
                         played_cards,
                         scored_card_indices,
                         poker_hands_played,
+                        retrigger,
                     )
 
         for held_card in self._hand:
             self._trigger_held_card(held_card)
+            retrigger = 0
 
             if held_card == Seal.RED:
-                self._trigger_held_card(held_card)
+                retrigger += 1
+                self._trigger_held_card(held_card, retrigger)
 
             for joker in self._jokers:
                 for _ in range(joker._on_card_held_retriggers(held_card)):
-                    self._trigger_held_card(held_card)
+                    retrigger += 1
+                    self._trigger_held_card(held_card, retrigger)
 
         for joker in self._jokers:
+            if trace is not None:
+                trace._set_source(TraceSource.JOKER, joker, TraceEffect.EDITION)
             match joker:
                 case Edition.FOIL:
                     self._chips += 50
                 case Edition.HOLOGRAPHIC:
                     self._mult += 10
 
+            if trace is not None:
+                trace._set_source(TraceSource.JOKER, joker, TraceEffect.INDEPENDENT)
             joker._on_independent(played_cards, scored_card_indices, poker_hands_played)
             if boss_blind_triggered:
+                if trace is not None:
+                    trace._set_source(
+                        TraceSource.JOKER, joker, TraceEffect.BOSS_BLIND_TRIGGERED
+                    )
                 joker._on_boss_blind_triggered()
 
             for other_joker in self._jokers:
+                if trace is not None:
+                    trace._set_source(
+                        TraceSource.JOKER, other_joker, TraceEffect.DEPENDENT
+                    )
                 other_joker._on_dependent(joker)
 
             if joker == Edition.POLYCHROME:
+                if trace is not None:
+                    trace._set_source(TraceSource.JOKER, joker, TraceEffect.EDITION)
                 self._mult *= 1.5
 
         if Voucher.OBSERVATORY in self._vouchers:
+            if trace is not None:
+                trace._set_source(
+                    TraceSource.VOUCHER, Voucher.OBSERVATORY, TraceEffect.VOUCHER
+                )
             self._mult *= 1.5 ** self._consumables.count(poker_hands_played[0].planet)
 
         if self.challenge is Challenge.RICH_GET_RICHER:
+            if trace is not None:
+                trace._set_source(
+                    TraceSource.CHALLENGE, self.challenge, TraceEffect.CHALLENGE
+                )
             self._chips = max(0, min(self._money, self._chips))
+        if trace is not None:
+            trace._stop()
         self._mult = round(self._mult, 9)  # floating-point imprecision
         score = round(
             (
@@ -2629,7 +3011,7 @@ class Run:
             match self._blind:
                 case Blind.THE_HOOK:
                     if len(self._hand) >= 2:
-                        self._discard(r.sample(range(len(self._hand)), 2))
+                        self._discard(self._random.sample(range(len(self._hand)), 2))
                     elif len(self._hand) == 1:
                         self._discard([0])
                 case Blind.CRIMSON_HEART:
@@ -2637,6 +3019,7 @@ class Run:
 
         self._end_hand(played_cards, scored_card_indices, poker_hands_played)
 
+    @_logged_action
     def move_joker(self, old_index: int, new_index: int) -> None:
         """
         Move a Joker to a new position in the Joker slots
@@ -2646,36 +3029,38 @@ class Run:
             new_index (int): The index to move the Joker to (0-indexed)
         """
 
-        if self.is_game_over:
-            raise IllegalActionError(f"Expected state to not be GAME_OVER")
+        if not self._unchecked:
+            if self.is_game_over:
+                raise IllegalActionError(f"Expected state to not be GAME_OVER")
 
-        if old_index not in range(len(self._jokers)):
-            raise InvalidArgumentsError(
-                f"Joker index should be in range(len(jokers)), but got {old_index}"
-            )
+            if old_index not in range(len(self._jokers)):
+                raise InvalidArgumentsError(
+                    f"Joker index should be in range(len(jokers)), but got {old_index}"
+                )
 
-        if new_index not in range(len(self._jokers)):
-            raise InvalidArgumentsError(
-                f"New index should be in range(len(jokers)), but got {new_index}"
-            )
+            if new_index not in range(len(self._jokers)):
+                raise InvalidArgumentsError(
+                    f"New index should be in range(len(jokers)), but got {new_index}"
+                )
 
-        if new_index == old_index:
-            raise InvalidArgumentsError(
-                f"New index should not be the same as the Joker index, but got {old_index}, {new_index}"
-            )
+            if new_index == old_index:
+                raise InvalidArgumentsError(
+                    f"New index should not be the same as the Joker index, but got {old_index}, {new_index}"
+                )
 
-        if self.challenge is Challenge.ON_A_KNIFES_EDGE and (
-            old_index == 0 or new_index == 0
-        ):
-            raise PinnedJokerMovedError(
-                f"Cannot move the pinned {self._jokers[0]} during {Challenge.ON_A_KNIFES_EDGE}"
-            )
+            if self.challenge is Challenge.ON_A_KNIFES_EDGE and (
+                old_index == 0 or new_index == 0
+            ):
+                raise PinnedJokerMovedError(
+                    f"Cannot move the pinned {self._jokers[0]} during {Challenge.ON_A_KNIFES_EDGE}"
+                )
 
         self._jokers.insert(new_index, self._jokers.pop(old_index))
 
         for joker in self._jokers:
             joker._on_jokers_moved()
 
+    @_logged_action
     def open_shop_pack(self, shop_pack_index: int) -> None:
         """
         Buy a shop pack and open it
@@ -2684,20 +3069,22 @@ class Run:
             shop_pack_index (int): The index of the shop pack (0-indexed)
         """
 
-        if self._state is not State.IN_SHOP:
-            raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
+        if not self._unchecked:
+            if self._state is not State.IN_SHOP:
+                raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
 
-        if shop_pack_index not in range(len(self._shop_packs)):
-            raise InvalidArgumentsError(
-                f"Invalid shop pack index {shop_pack_index}, must be in range({len(self._shop_packs)})"
-            )
+            if shop_pack_index not in range(len(self._shop_packs)):
+                raise InvalidArgumentsError(
+                    f"Invalid shop pack index {shop_pack_index}, must be in range({len(self._shop_packs)})"
+                )
 
         shop_pack, cost = self._shop_packs[shop_pack_index]
 
-        if self._available_money < cost:
-            raise InsufficientFundsError(
-                f"Insufficient funds to buy {shop_pack!r}, cost: {cost}, available: {self._available_money}"
-            )
+        if not self._unchecked:
+            if self._available_money < cost:
+                raise InsufficientFundsError(
+                    f"Insufficient funds to buy {shop_pack!r}, cost: {cost}, available: {self._available_money}"
+                )
 
         self._money -= cost
         self._shop_packs.pop(shop_pack_index)
@@ -2708,6 +3095,7 @@ class Run:
 
         self._open_pack(shop_pack)
 
+    @_logged_action
     def redeem_shop_voucher(self, shop_voucher_index: int) -> None:
         """
         Reedems a shop voucher
@@ -2716,20 +3104,22 @@ class Run:
             shop_voucher_index (int): The index of the shop voucher (0-indexed)
         """
 
-        if self._state is not State.IN_SHOP:
-            raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
+        if not self._unchecked:
+            if self._state is not State.IN_SHOP:
+                raise IllegalActionError(f"Expected state IN_SHOP, got {self._state}")
 
-        if shop_voucher_index not in range(len(self._shop_vouchers)):
-            raise InvalidArgumentsError(
-                f"Invalid shop voucher index {shop_voucher_index}, must be in range({len(self._shop_vouchers)})"
-            )
+            if shop_voucher_index not in range(len(self._shop_vouchers)):
+                raise InvalidArgumentsError(
+                    f"Invalid shop voucher index {shop_voucher_index}, must be in range({len(self._shop_vouchers)})"
+                )
 
         shop_voucher, cost = self._shop_vouchers[shop_voucher_index]
 
-        if self._available_money < cost:
-            raise InsufficientFundsError(
-                f"Insufficient funds to buy {shop_voucher!r}, cost: {cost}, available: {self._available_money}"
-            )
+        if not self._unchecked:
+            if self._available_money < cost:
+                raise InsufficientFundsError(
+                    f"Insufficient funds to buy {shop_voucher!r}, cost: {cost}, available: {self._available_money}"
+                )
 
         self._money -= cost
         self._shop_vouchers.pop(shop_voucher_index)
@@ -2748,22 +3138,25 @@ class Run:
             case Voucher.REROLL_SURPLUS | Voucher.REROLL_GLUT:
                 self._reroll_cost = max(0, self._reroll_cost - 2)
 
+    @_logged_action
     def reroll(self) -> None:
         """
         Reroll the shop cards
         """
 
-        if self._state is not State.IN_SHOP:
-            raise IllegalActionError(
-                f"Expected state to be IN_SHOP, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.IN_SHOP:
+                raise IllegalActionError(
+                    f"Expected state to be IN_SHOP, but got {self._state}"
+                )
 
         reroll_cost = self.reroll_cost
 
-        if self._available_money < reroll_cost:
-            raise InsufficientFundsError(
-                f"Cannot afford reroll cost {reroll_cost} with available money {self._available_money}"
-            )
+        if not self._unchecked:
+            if self._available_money < reroll_cost:
+                raise InsufficientFundsError(
+                    f"Cannot afford reroll cost {reroll_cost} with available money {self._available_money}"
+                )
 
         self._money -= reroll_cost
 
@@ -2781,30 +3174,32 @@ class Run:
         for joker in self._jokers:
             joker._on_shop_rerolled()
 
+    @_logged_action
     def reroll_boss_blind(self) -> None:
         """
         Reroll the boss blind (requires the Director's Cut voucher)
         """
 
-        if self._state is not State.SELECTING_BLIND:
-            raise IllegalActionError(
-                f"Expected state to be SELECTING_BLIND, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.SELECTING_BLIND:
+                raise IllegalActionError(
+                    f"Expected state to be SELECTING_BLIND, but got {self._state}"
+                )
 
-        if Voucher.DIRECTORS_CUT not in self._vouchers:
-            raise IllegalBossRerollError(
-                f"Cannot reroll boss blind without Director's Cut Voucher"
-            )
+            if Voucher.DIRECTORS_CUT not in self._vouchers:
+                raise IllegalBossRerollError(
+                    f"Cannot reroll boss blind without Director's Cut Voucher"
+                )
 
-        if Voucher.RETCON not in self._vouchers and self._rerolled_boss_blind:
-            raise IllegalBossRerollError(
-                f"Cannot reroll boss blind more than once per ante without Retcon Voucher"
-            )
+            if Voucher.RETCON not in self._vouchers and self._rerolled_boss_blind:
+                raise IllegalBossRerollError(
+                    f"Cannot reroll boss blind more than once per ante without Retcon Voucher"
+                )
 
-        if self._available_money < 10:
-            raise InsufficientFundsError(
-                f"Cannot afford boss blind reroll ($10) with available money {self._available_money}"
-            )
+            if self._available_money < 10:
+                raise InsufficientFundsError(
+                    f"Cannot afford boss blind reroll ($10) with available money {self._available_money}"
+                )
 
         self._money -= 10
 
@@ -2812,15 +3207,50 @@ class Run:
 
         self._rerolled_boss_blind = True
 
+    @staticmethod
+    def replay(
+        seed: str,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        challenge: Challenge | None = None,
+        actions: Iterable[tuple[str, Iterable[Any]]] = (),
+    ) -> Run:
+        """
+        Reconstructs a run from its seed and action log
+
+        Args:
+            seed (str): The seed of the run
+            deck (Deck): The deck of the run, ignored for challenges
+            stake (Stake): The stake of the run, ignored for challenges
+            challenge (Challenge, optional): The challenge of the run, or none
+            actions (Iterable[tuple[str, Iterable]]): The (method name, arguments) of each action, such as action_log
+        """
+
+        # logged actions all succeeded, so they're replayed unchecked
+        run = (
+            ChallengeRun(challenge, seed=seed, unchecked=True)
+            if challenge is not None
+            else Run(deck, stake=stake, seed=seed, unchecked=True)
+        )
+        for method_name, args in actions:
+            if method_name not in _ACTION_METHOD_NAMES:
+                raise ValueError(f"Expected an action method, but got {method_name!r}")
+            getattr(run, method_name)(*args)
+
+        run._unchecked = False
+        return run
+
+    @_logged_action
     def select_blind(self) -> None:
         """
         Play the current blind
         """
 
-        if self._state is not State.SELECTING_BLIND:
-            raise IllegalActionError(
-                f"Expected state to be SELECTING_BLIND, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.SELECTING_BLIND:
+                raise IllegalActionError(
+                    f"Expected state to be SELECTING_BLIND, but got {self._state}"
+                )
 
         self._round += 1
         self._round_score = 0
@@ -2871,7 +3301,7 @@ class Run:
             case Blind.AMBER_ACORN:
                 for joker in self._jokers:
                     joker.is_flipped = True
-                r.shuffle(self._jokers)
+                self._random.shuffle(self._jokers)
             case Blind.VERDANT_LEAF:
                 for card in self._deck_cards:
                     card.is_debuffed = True
@@ -2890,6 +3320,7 @@ class Run:
         else:
             self._state = State.PLAYING_BLIND
 
+    @_logged_action
     def sell_consumable(self, consumable_index: int) -> None:
         """
         Sell an owned Consumable
@@ -2898,13 +3329,14 @@ class Run:
             consumable_index (int): The index of the consumable to sell (0-indexed)
         """
 
-        if self.is_game_over:
-            raise IllegalActionError(f"Expected state to not be GAME_OVER")
+        if not self._unchecked:
+            if self.is_game_over:
+                raise IllegalActionError(f"Expected state to not be GAME_OVER")
 
-        if consumable_index not in range(len(self._consumables)):
-            raise InvalidArgumentsError(
-                f"Consumable index should be in range(len({len(self._consumables)})), but got {consumable_index}"
-            )
+            if consumable_index not in range(len(self._consumables)):
+                raise InvalidArgumentsError(
+                    f"Consumable index should be in range(len({len(self._consumables)})), but got {consumable_index}"
+                )
 
         sold_consumable = self._consumables[consumable_index]
 
@@ -2915,6 +3347,7 @@ class Run:
 
         self._money += self._calculate_sell_value(sold_consumable)
 
+    @_logged_action
     def sell_joker(self, joker_index: int) -> None:
         """
         Sell an owned Joker
@@ -2923,18 +3356,20 @@ class Run:
             joker_index (int): The index of the Joker to sell (0-indexed)
         """
 
-        if self.is_game_over:
-            raise IllegalActionError(f"Expected state to not be GAME_OVER")
+        if not self._unchecked:
+            if self.is_game_over:
+                raise IllegalActionError(f"Expected state to not be GAME_OVER")
 
-        if joker_index not in range(len(self._jokers)):
-            raise InvalidArgumentsError(
-                f"Joker index should be in range(len({len(self._jokers)})), but got {joker_index}"
-            )
+            if joker_index not in range(len(self._jokers)):
+                raise InvalidArgumentsError(
+                    f"Joker index should be in range(len({len(self._jokers)})), but got {joker_index}"
+                )
 
         sold_joker = self._jokers[joker_index]
 
-        if sold_joker.is_eternal:
-            raise EternalJokerSoldError(f"Cannot sell eternal Joker {sold_joker}")
+        if not self._unchecked:
+            if sold_joker.is_eternal:
+                raise EternalJokerSoldError(f"Cannot sell eternal Joker {sold_joker}")
 
         if self._blind is Blind.VERDANT_LEAF:
             self._disable_boss_blind()
@@ -2949,18 +3384,20 @@ class Run:
 
         self._money += self._calculate_sell_value(sold_joker)
 
+    @_logged_action
     def skip_blind(self) -> None:
         """
         Skip the current blind and obtain its skip tag
         """
 
-        if self._state is not State.SELECTING_BLIND:
-            raise IllegalActionError(
-                f"Expected state to be SELECTING_BLIND, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.SELECTING_BLIND:
+                raise IllegalActionError(
+                    f"Expected state to be SELECTING_BLIND, but got {self._state}"
+                )
 
-        if self._is_boss_blind:
-            raise IllegalSkipError(f"Cannot skip boss blind {self._blind}")
+            if self._is_boss_blind:
+                raise IllegalSkipError(f"Cannot skip boss blind {self._blind}")
 
         tag, orbital_hand = self._ante_tags[self._blind is Blind.BIG_BLIND]
 
@@ -2998,21 +3435,24 @@ class Run:
         if self._tags and self._tags[-1] in TAG_PACKS:
             self._open_pack(TAG_PACKS[self._tags.pop()])
 
+    @_logged_action
     def skip_pack(self) -> None:
         """
         Close the opened pack
         """
 
-        if self._state is not State.OPENING_PACK:
-            raise IllegalActionError(
-                f"Expected state to be OPENING_PACK, but got {self._state}"
-            )
+        if not self._unchecked:
+            if self._state is not State.OPENING_PACK:
+                raise IllegalActionError(
+                    f"Expected state to be OPENING_PACK, but got {self._state}"
+                )
 
         for joker in self.jokers:
             joker._on_pack_skipped()
 
         self._close_pack()
 
+    @_logged_action
     def use_consumable(
         self, consumable_index: int, card_indices: list[int] | None = None
     ) -> None:
@@ -3024,13 +3464,14 @@ class Run:
             card_indices (list[int], optional): The indices of the cards in hand to use the consumable on (0-indexed), or none
         """
 
-        if self.is_game_over:
-            raise IllegalActionError(f"Expected state to not be GAME_OVER")
+        if not self._unchecked:
+            if self.is_game_over:
+                raise IllegalActionError(f"Expected state to not be GAME_OVER")
 
-        if consumable_index not in range(len(self._consumables)):
-            raise InvalidArgumentsError(
-                f"Consumable index should be in range(len(consumables)), but got {consumable_index}"
-            )
+            if consumable_index not in range(len(self._consumables)):
+                raise InvalidArgumentsError(
+                    f"Consumable index should be in range(len(consumables)), but got {consumable_index}"
+                )
 
         consumable = self._consumables[consumable_index]
         self._consumables.pop(consumable_index)
@@ -3047,7 +3488,7 @@ class Run:
     @property
     def _discards_per_round(self) -> int:
         discards_per_round = (
-            CHALLENGE_SETUPS[self._challenge].discards_per_round
+            _get_challenge_setups()[self._challenge].discards_per_round
             if isinstance(self, ChallengeRun)
             else 3
         )
@@ -3076,7 +3517,7 @@ class Run:
     @property
     def _hands_per_round(self) -> int:
         hands_per_round = (
-            CHALLENGE_SETUPS[self._challenge].hands_per_round
+            _get_challenge_setups()[self._challenge].hands_per_round
             if isinstance(self, ChallengeRun)
             else 4
         )
@@ -3123,6 +3564,12 @@ class Run:
             if i > 2 or self._poker_hand_info[poker_hand][1] > 0
         ]
 
+    @property
+    def action_log(self) -> list[tuple[str, tuple]]:
+        """The (method name, arguments) of every action taken"""
+
+        return self._action_log
+
     @property
     def ante(self) -> int:
         """The current ante number"""
@@ -3179,7 +3626,7 @@ class Run:
         """The number of consumable slots available"""
 
         consumable_slots = (
-            CHALLENGE_SETUPS[self._challenge].consumable_slots
+            _get_challenge_setups()[self._challenge].consumable_slots
             if isinstance(self, ChallengeRun)
             else 2
         )
@@ -3265,7 +3712,7 @@ class Run:
         """The current hand size"""
 
         hand_size = (
-            CHALLENGE_SETUPS[self._challenge].hand_size
+            _get_challenge_setups()[self._challenge].hand_size
             if isinstance(self, ChallengeRun)
             else 8
         )
@@ -3320,7 +3767,7 @@ class Run:
             0
             if (self.challenge is Challenge.TYPECAST and self.ante > 4)
             else (
-                CHALLENGE_SETUPS[self._challenge].joker_slots
+                _get_challenge_setups()[self._challenge].joker_slots
                 if isinstance(self, ChallengeRun)
                 else 5
             )
@@ -3408,6 +3855,12 @@ class Run:
 
         return self._round_score if self._round_score is not None else 0
 
+    @property
+    def seed(self) -> str:
+        """The seed of the run"""
+
+        return self._seed
+
     @property
     def shop_cards(self) -> list[tuple[BalatroJoker | Consumable | Card, int]] | None:
         """The cards available in the shop"""
@@ -3444,6 +3897,12 @@ class Run:
 
         return self._tags
 
+    @property
+    def unchecked(self) -> bool:
+        """Whether actions skip validating the state and their arguments"""
+
+        return self._unchecked
+
     @property
     def vouchers(self) -> set[Voucher]:
         """The vouchers in possession"""
@@ -3452,7 +3911,9 @@ class Run:
 
 
 class ChallengeRun(Run):
-    def __init__(self, challenge: Challenge) -> None:
+    def __init__(
+        self, challenge: Challenge, seed: str | None = None, unchecked: bool = False
+    ) -> None:
         self._challenge: Challenge = challenge
 
-        super().__init__(Deck.CHALLENGE)
+        super().__init__(Deck.CHALLENGE, seed=seed, unchecked=unchecked)
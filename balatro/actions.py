@@ -0,0 +1,201 @@
+from __future__ import annotations
+from enum import Enum
+from functools import cache
+from itertools import combinations, permutations
+
+import numpy as np
+
+MAX_HAND_SIZE = 10
+MAX_SHOP_CARDS = 4
+MAX_SHOP_VOUCHERS = 3
+MAX_SHOP_PACKS = 2
+MAX_PACK_ITEMS = 5
+MAX_JOKERS = 8
+MAX_CONSUMABLES = 4
+MAX_TARGETS = 3
+
+CARD_SUBSETS = [
+    subset
+    for size in range(1, 6)
+    for subset in combinations(range(MAX_HAND_SIZE), size)
+]
+TARGET_SUBSETS = [
+    subset
+    for size in range(MAX_TARGETS + 1)
+    for subset in combinations(range(MAX_HAND_SIZE), size)
+]
+JOKER_MOVES = list(permutations(range(MAX_JOKERS), 2))
+
+# the highest hand index each subset uses, so subsets can be masked by hand size
+CARD_SUBSET_MAX_INDICES = np.array([max(subset) for subset in CARD_SUBSETS])
+TARGET_SUBSET_MAX_INDICES = np.array(
+    [max(subset, default=-1) for subset in TARGET_SUBSETS]
+)
+TARGET_SUBSET_SIZES = np.array([len(subset) for subset in TARGET_SUBSETS])
+JOKER_MOVE_MAX_INDICES = np.array([max(move) for move in JOKER_MOVES])
+JOKER_MOVE_MIN_INDICES = np.array([min(move) for move in JOKER_MOVES])
+CARD_SUBSET_MEMBERS = np.array(
+    [[i in subset for i in range(MAX_HAND_SIZE)] for subset in CARD_SUBSETS]
+)
+
+
+class ActionType(Enum):
+    SELECT_BLIND = "select_blind"
+    SKIP_BLIND = "skip_blind"
+    REROLL_BOSS_BLIND = "reroll_boss_blind"
+    PLAY_HAND = "play_hand"
+    DISCARD = "discard"
+    CASH_OUT = "cash_out"
+    BUY_SHOP_CARD = "buy_shop_card"
+    BUY_AND_USE_SHOP_CARD = "buy_and_use_shop_card"
+    OPEN_SHOP_PACK = "open_shop_pack"
+    REDEEM_SHOP_VOUCHER = "redeem_shop_voucher"
+    REROLL = "reroll"
+    NEXT_ROUND = "next_round"
+    CHOOSE_PACK_ITEM = "choose_pack_item"
+    SKIP_PACK = "skip_pack"
+    USE_CONSUMABLE = "use_consumable"
+    SELL_JOKER = "sell_joker"
+    SELL_CONSUMABLE = "sell_consumable"
+    MOVE_JOKER = "move_joker"
+
+
+def _get_arguments(action_type: ActionType) -> list[tuple]:
+    match action_type:
+        case (
+            ActionType.SELECT_BLIND
+            | ActionType.SKIP_BLIND
+            | ActionType.REROLL_BOSS_BLIND
+            | ActionType.CASH_OUT
+            | ActionType.REROLL
+            | ActionType.NEXT_ROUND
+            | ActionType.SKIP_PACK
+        ):
+            return [()]
+        case ActionType.PLAY_HAND | ActionType.DISCARD:
+            return [(list(subset),) for subset in CARD_SUBSETS]
+        case ActionType.BUY_SHOP_CARD:
+            return [(i,) for i in range(MAX_SHOP_CARDS)]
+        case ActionType.BUY_AND_USE_SHOP_CARD:
+            return [(i, True) for i in range(MAX_SHOP_CARDS)]
+        case ActionType.OPEN_SHOP_PACK:
+            return [(i,) for i in range(MAX_SHOP_PACKS)]
+        case ActionType.REDEEM_SHOP_VOUCHER:
+            return [(i,) for i in range(MAX_SHOP_VOUCHERS)]
+        case ActionType.CHOOSE_PACK_ITEM:
+            return [
+                (i, list(subset) if subset else None)
+                for i in range(MAX_PACK_ITEMS)
+                for subset in TARGET_SUBSETS
+            ]
+        case ActionType.USE_CONSUMABLE:
+            return [
+                (i, list(subset) if subset else None)
+                for i in range(MAX_CONSUMABLES)
+                for subset in TARGET_SUBSETS
+            ]
+        case ActionType.SELL_JOKER:
+            return [(i,) for i in range(MAX_JOKERS)]
+        case ActionType.SELL_CONSUMABLE:
+            return [(i,) for i in range(MAX_CONSUMABLES)]
+        case ActionType.MOVE_JOKER:
+            return list(JOKER_MOVES)
+
+
+@cache
+def _get_card_mask(hand_size: int, forced_index: int | None = None) -> np.ndarray:
+    # the card subsets that fit in the hand and include the forced selected card
+    mask = CARD_SUBSET_MAX_INDICES < hand_size
+    if forced_index is not None:
+        mask &= (
+            CARD_SUBSET_MEMBERS[:, forced_index]
+            if forced_index < MAX_HAND_SIZE
+            else False
+        )
+    mask.flags.writeable = False
+    return mask
+
+
+@cache
+def _get_target_mask(min_targets: int, max_targets: int, hand_size: int) -> np.ndarray:
+    # the target subsets of an allowed size that fit in the hand
+    mask = (
+        (TARGET_SUBSET_SIZES >= min_targets)
+        & (TARGET_SUBSET_SIZES <= max_targets)
+        & (TARGET_SUBSET_MAX_INDICES < hand_size)
+    )
+    mask.flags.writeable = False
+    return mask
+
+
+def _freeze(args: tuple) -> tuple:
+    return tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+
+
+ACTION_OFFSETS: dict[ActionType, int] = {}
+ACTIONS: list[tuple[str, tuple]] = []
+for _action_type in ActionType:
+    ACTION_OFFSETS[_action_type] = len(ACTIONS)
+    ACTIONS.extend(
+        (
+            (
+                ActionType.BUY_SHOP_CARD.value
+                if _action_type is ActionType.BUY_AND_USE_SHOP_CARD
+                else _action_type.value
+            ),
+            args,
+        )
+        for args in _get_arguments(_action_type)
+    )
+NUM_ACTIONS = len(ACTIONS)
+ACTION_COUNTS = {
+    action_type: end - start
+    for (action_type, start), end in zip(
+        ACTION_OFFSETS.items(), list(ACTION_OFFSETS.values())[1:] + [NUM_ACTIONS]
+    )
+}
+
+_ACTION_INDICES = {
+    (method_name, _freeze(args)): i for i, (method_name, args) in enumerate(ACTIONS)
+}
+
+
+def decode_action(action: int) -> tuple[str, tuple]:
+    """
+    Decodes a flat action into the name and arguments of the Run method it calls
+
+    Args:
+        action (int): The flat action, in range(NUM_ACTIONS)
+    """
+
+    return ACTIONS[action]
+
+
+def encode_action(method_name: str, *args) -> int:
+    """
+    Encodes a call to a Run method as a flat action
+
+    Args:
+        method_name (str): The name of the Run method, e.g. "play_hand"
+        *args: The arguments of the call, e.g. [0, 1, 2]
+    """
+
+    if method_name == ActionType.BUY_SHOP_CARD.value and args[1:] == (False,):
+        args = args[:1]
+    elif method_name in (
+        ActionType.CHOOSE_PACK_ITEM.value,
+        ActionType.USE_CONSUMABLE.value,
+    ):
+        if len(args) == 1 or not args[1]:
+            args = (args[0], None)
+        else:
+            args = (args[0], sorted(args[1]))
+    elif method_name in (ActionType.PLAY_HAND.value, ActionType.DISCARD.value):
+        args = (sorted(args[0]),)
+
+    try:
+        return _ACTION_INDICES[method_name, _freeze(args)]
+    except KeyError:
+        raise ValueError(
+            f"{method_name}{tuple(args)} is outside of the flat action space"
+        ) from None
@@ -619,6 +619,13 @@ class Card:
     is_debuffed: bool = field(default=False, init=False, repr=False)
     is_face_down: bool = field(default=False, init=False, repr=False)
 
+    def __post_init__(self) -> None:
+        # set in the same order for every card, or cards assigned them in different orders
+        # while scoring each need their own attribute dict
+        self.extra_chips = 0
+        self.is_debuffed = False
+        self.is_face_down = False
+
     def __eq__(self, other: Card | Rank | Suit | Enhancement | Seal | Edition) -> bool:
         match other:
             case Card():
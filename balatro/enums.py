@@ -1,6 +1,16 @@
 from __future__ import annotations
 from enum import Enum, auto
-from functools import total_ordering
+from functools import cache, total_ordering
+
+
+@cache
+def _get_member_indices(enum: type[Enum]) -> dict[str, int]:
+    return {member._name_: i for i, member in enumerate(enum)}
+
+
+def _get_index(member: Enum) -> int:
+    # the position of a member in its enum, without building a list of the members
+    return _get_member_indices(type(member))[member._name_]
 
 
 # TODO: remove
@@ -466,7 +476,7 @@ class Planet(Enum):
 
     @property
     def poker_hand(self) -> Planet:
-        return list(PokerHand)[list(Planet).index(self)]
+        return list(PokerHand)[_get_index(self)]
 
 
 class Spectral(Enum):
@@ -658,7 +668,7 @@ class Stake(Enum):
     def __lt__(self, other: Stake) -> bool:
         match other:
             case Stake():
-                return list(Stake).index(self) > list(Stake).index(other)
+                return _get_index(self) > _get_index(other)
 
         return NotImplemented
 
@@ -1156,12 +1166,12 @@ class Rank(Enum):
     TWO = "2"
 
     def __int__(self) -> int:
-        return 14 - list(Rank).index(self)
+        return 14 - _get_index(self)
 
     def __lt__(self, other: Rank) -> bool:
         match other:
             case Rank():
-                return list(Rank).index(self) > list(Rank).index(other)
+                return _get_index(self) > _get_index(other)
 
         return NotImplemented
 
@@ -1233,13 +1243,13 @@ class PokerHand(Enum):
     def __lt__(self, other: PokerHand) -> bool:
         match other:
             case PokerHand():
-                return list(PokerHand).index(self) > list(PokerHand).index(other)
+                return _get_index(self) > _get_index(other)
 
         return NotImplemented
 
     @property
     def planet(self) -> Planet:
-        return list(Planet)[list(PokerHand).index(self)]
+        return list(Planet)[_get_index(self)]
 
 
 class Rarity(Enum):
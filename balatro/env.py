@@ -0,0 +1,269 @@
+from __future__ import annotations
+from typing import Any
+
+import numpy as np
+
+from . import Run
+from .actions import *
+from .classes import *
+from .enums import *
+from .enums import _get_index
+from .observation import new_observation
+
+
+class BalatroEnv:
+    """
+    A Gym-style environment over a Run with a flat discrete action space
+
+    Actions index balatro.actions.ACTIONS. The observation is the run itself, the reward is 1
+    for every blind defeated and an episode terminates on game over. Actions in the action
+    mask never raise, others that raise a BalatroError leave the run unchanged.
+    """
+
+    num_actions = NUM_ACTIONS
+
+    def __init__(
+        self,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        max_steps: int | None = None,
+        illegal_action_reward: float = 0.0,
+    ) -> None:
+        self.deck: Deck = deck
+        self.stake: Stake = stake
+        self.max_steps: int | None = max_steps
+        self.illegal_action_reward: float = illegal_action_reward
+
+        self.run: Run | None = None
+        self._num_steps: int = 0
+
+    def action_mask(self) -> np.ndarray:
+        """
+        Gets a boolean mask over the flat action space of the actions that can be taken
+        """
+
+        return self.run.legal_actions()
+
+    def reset(self, seed: str | None = None) -> tuple[Run, dict[str, Any]]:
+        """
+        Starts a new run
+
+        Args:
+            seed (str, optional): The seed of the run, or none for a random one
+        """
+
+        self.run = Run(self.deck, stake=self.stake, seed=seed)
+        self._num_steps = 0
+
+        return self.run, {"action_mask": self.action_mask()}
+
+    def step(self, action: int) -> tuple[Run, float, bool, bool, dict[str, Any]]:
+        """
+        Takes an action, returning the observation, reward, whether the run terminated,
+        whether it was truncated and an info dict with the action mask
+
+        Args:
+            action (int): The flat action, in range(num_actions)
+        """
+
+        if self.run is None:
+            raise RuntimeError("Cannot step before reset")
+
+        method_name, args = ACTIONS[action]
+        previous_state = self.run._state
+        self._num_steps += 1
+        truncated = self.max_steps is not None and self._num_steps >= self.max_steps
+
+        try:
+            getattr(self.run, method_name)(*args)
+        except BalatroError as e:
+            return (
+                self.run,
+                self.illegal_action_reward,
+                False,
+                truncated,
+                {"action_mask": self.action_mask(), "error": e},
+            )
+
+        reward = float(
+            previous_state is State.PLAYING_BLIND
+            and self.run._state is State.CASHING_OUT
+        )
+
+        return (
+            self.run,
+            reward,
+            self.run.is_game_over,
+            truncated,
+            {"action_mask": self.action_mask()},
+        )
+
+
+class BatchRun:
+    """
+    N independent runs, each with its own RNG, stepped together with one flat action each
+
+    Observations, rewards, terminations, truncations and action masks are stacked into
+    arrays that are preallocated once and overwritten every step, so copy anything that has
+    to outlive the next step. Runs that end are reset within the same step: the returned
+    observation and action mask are then of the new run, and the last observation of the
+    run that ended is kept in final_observations. Actions outside the action mask are
+    skipped without calling into the run, getting illegal_action_reward. A run whose action
+    raises anyway is truncated and reset, with the exception kept in errors, so one broken
+    run doesn't stop the others.
+
+    This is a convenience wrapper rather than a faster path: the runs are still stepped one
+    by one in Python, about as fast as a loop over BalatroEnvs, and only the stacking of
+    the results into arrays is done for you.
+    """
+
+    num_actions = NUM_ACTIONS
+
+    def __init__(
+        self,
+        num_runs: int,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        max_steps: int | None = None,
+        illegal_action_reward: float = 0.0,
+    ) -> None:
+        self.num_runs: int = num_runs
+        self.deck: Deck = deck
+        self.stake: Stake = stake
+        self.max_steps: int | None = max_steps
+        self.illegal_action_reward: float = illegal_action_reward
+
+        self.runs: list[Run | None] = [None] * num_runs
+        self.observations: np.ndarray = new_observation(num_runs)
+        self.final_observations: np.ndarray = new_observation(num_runs)
+        self.action_masks: np.ndarray = np.zeros((num_runs, NUM_ACTIONS), dtype=bool)
+        self.rewards: np.ndarray = np.zeros(num_runs, dtype=np.float32)
+        self.terminated: np.ndarray = np.zeros(num_runs, dtype=bool)
+        self.truncated: np.ndarray = np.zeros(num_runs, dtype=bool)
+        self.is_legal: np.ndarray = np.ones(num_runs, dtype=bool)
+        # the exceptions raised by the actions of the last step, by run
+        self.errors: dict[int, Exception] = {}
+
+        self._seed: str | None = None
+        self._num_steps: np.ndarray = np.zeros(num_runs, dtype=np.int64)
+        self._num_episodes: np.ndarray = np.zeros(num_runs, dtype=np.int64)
+        self._states: np.ndarray = self.observations["state"]
+        self._previous_states: np.ndarray = np.zeros(num_runs, dtype=np.int8)
+        self._defeated_blinds: np.ndarray = np.zeros(num_runs, dtype=bool)
+        self._run_indices: np.ndarray = np.arange(num_runs)
+
+        # the same row objects are passed every step so their field views stay cached
+        self._observation_rows = [self.observations[i, ...] for i in range(num_runs)]
+        self._final_observation_rows = [
+            self.final_observations[i, ...] for i in range(num_runs)
+        ]
+        self._action_mask_rows = list(self.action_masks)
+
+    def reset(self, seed: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Starts a new run in every slot, returning the observations and action masks
+
+        Args:
+            seed (str, optional): The seed every run's seed is derived from, or none for random runs
+        """
+
+        self._seed = seed
+        self._num_episodes[:] = 0
+
+        for i in range(self.num_runs):
+            self._reset_run(i)
+
+        return self.observations, self.action_masks
+
+    def step(
+        self, actions: np.ndarray | list[int]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Takes one action in every run, returning the observations, rewards, whether each run
+        terminated, whether each run was truncated and the action masks
+
+        Args:
+            actions (np.ndarray | list[int]): The (N,) flat actions, in range(num_actions)
+        """
+
+        if self.runs[0] is None:
+            raise RuntimeError("Cannot step before reset")
+
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_runs,):
+            raise ValueError(
+                f"Expected actions of shape ({self.num_runs},), but got {actions.shape}"
+            )
+
+        # the masks are exact, so illegal actions are found without calling into the runs
+        self.is_legal[:] = self.action_masks[self._run_indices, actions]
+        states = self._states
+        self._previous_states[:] = states
+        self._num_steps += 1
+
+        runs, observation_rows, action_mask_rows, errors = (
+            self.runs,
+            self._observation_rows,
+            self._action_mask_rows,
+            self.errors,
+        )
+        errors.clear()
+        for i, action in zip(
+            np.flatnonzero(self.is_legal).tolist(),
+            actions[self.is_legal].tolist(),
+        ):
+            run = runs[i]
+            try:
+                _ACTION_METHODS[action](run, *ACTIONS[action][1])
+            except Exception as e:
+                # the run may be left half updated, so it keeps its last observation
+                errors[i] = e
+                continue
+            run.observe(observation_rows[i])
+            run.legal_actions(action_mask_rows[i])
+
+        np.logical_and(
+            self._previous_states == _PLAYING_BLIND_INDEX,
+            states == _CASHING_OUT_INDEX,
+            out=self._defeated_blinds,
+        )
+        self.rewards[:] = self._defeated_blinds
+        self.rewards[~self.is_legal] = self.illegal_action_reward
+
+        np.equal(states, _GAME_OVER_INDEX, out=self.terminated)
+        if self.max_steps is not None:
+            np.greater_equal(self._num_steps, self.max_steps, out=self.truncated)
+            self.truncated &= ~self.terminated
+        else:
+            self.truncated[:] = False
+        for i in errors:
+            self.truncated[i] = True
+
+        for i in np.flatnonzero(self.terminated | self.truncated).tolist():
+            self.final_observations[i] = self.observations[i]
+            self._num_episodes[i] += 1
+            self._reset_run(i)
+
+        return (
+            self.observations,
+            self.rewards,
+            self.terminated,
+            self.truncated,
+            self.action_masks,
+        )
+
+    def _reset_run(self, i: int) -> None:
+        seed = (
+            None if self._seed is None else f"{self._seed}-{i}-{self._num_episodes[i]}"
+        )
+        run = self.runs[i] = Run(self.deck, stake=self.stake, seed=seed)
+        self._num_steps[i] = 0
+
+        run.observe(self._observation_rows[i])
+        run.legal_actions(self._action_mask_rows[i])
+
+
+_ACTION_METHODS = [getattr(Run, method_name) for method_name, _ in ACTIONS]
+_PLAYING_BLIND_INDEX = _get_index(State.PLAYING_BLIND)
+_CASHING_OUT_INDEX = _get_index(State.CASHING_OUT)
+_GAME_OVER_INDEX = _get_index(State.GAME_OVER)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import struct
+import zlib
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+from . import ChallengeRun, Run
+from .enums import *
+from .render import FrameRenderer
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def replay_frames(
+    run: Run,
+    actions: Iterable[tuple[str, Iterable[Any]]],
+    renderer: FrameRenderer | None = None,
+) -> Iterator[Image.Image]:
+    """
+    Replays an action log on a fresh run, yielding a frame before the first action and after every action
+
+    Args:
+        run (Run): The freshly created run to replay the actions on, with the seed of the original run
+        actions (Iterable[tuple[str, Iterable]]): The (method name, arguments) of each action taken
+        renderer (FrameRenderer, optional): The renderer to use, keeping its cached panels between calls
+    """
+
+    if renderer is None:
+        renderer = FrameRenderer()
+
+    yield renderer.render(run)
+    for method_name, args in actions:
+        getattr(run, method_name)(*args)
+        yield renderer.render(run)
+
+
+def state_frames(
+    runs: Iterable[Run], renderer: FrameRenderer | None = None
+) -> Iterator[Image.Image]:
+    """
+    Yields a frame for every run state, such as snapshots taken with copy.deepcopy
+
+    Args:
+        runs (Iterable[Run]): The run states to render
+        renderer (FrameRenderer, optional): The renderer to use, keeping its cached panels between calls
+    """
+
+    if renderer is None:
+        renderer = FrameRenderer()
+
+    for run in runs:
+        yield renderer.render(run)
+
+
+def export_gif(
+    frames: Iterable[Image.Image], path: str, duration: int = 500, loop: int = 0
+) -> int:
+    """
+    Streams frames into an animated GIF, only encoding the region that changed since the previous frame
+
+    Returns the number of frames written.
+
+    Args:
+        frames (Iterable[Image]): The frames to write, all of the same size
+        path (str): The path of the GIF to write
+        duration (int): How long each frame is shown for in milliseconds
+        loop (int): How many times the animation loops, 0 looping forever
+    """
+
+    num_frames = 0
+
+    with open(path, "wb") as file:
+        for region, offset, num_repeats in _get_changed_regions(frames, "RGB"):
+            region = region.quantize(
+                method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+            )
+            if num_frames == 0:
+                header, _ = GifImagePlugin.getheader(
+                    region, info={"loop": loop, "duration": duration}
+                )
+                file.write(b"".join(header))
+
+            file.write(
+                b"".join(
+                    GifImagePlugin.getdata(
+                        region,
+                        offset,
+                        duration=duration * num_repeats,
+                        disposal=1,
+                        include_color_table=True,
+                    )
+                )
+            )
+            num_frames += 1
+
+        file.write(b";")
+
+    return num_frames
+
+
+def export_apng(
+    frames: Iterable[Image.Image], path: str, duration: int = 500, loop: int = 0
+) -> int:
+    """
+    Streams frames into an animated PNG, only encoding the region that changed since the previous frame
+
+    Returns the number of frames written.
+
+    Args:
+        frames (Iterable[Image]): The frames to write, all of the same size
+        path (str): The path of the APNG to write
+        duration (int): How long each frame is shown for in milliseconds
+        loop (int): How many times the animation loops, 0 looping forever
+    """
+
+    num_frames = 0
+    sequence_number = 0
+
+    with open(path, "wb") as file:
+        for region, offset, num_repeats in _get_changed_regions(frames, "RGBA"):
+            with io.BytesIO() as buffer:
+                region.save(buffer, "png", compress_level=1)
+                chunks = list(_read_png_chunks(buffer.getvalue()))
+
+            if num_frames == 0:
+                file.write(PNG_SIGNATURE)
+                _write_png_chunk(file, b"IHDR", chunks[0][1])
+                # the frame count is patched in once every frame has been written
+                actl_position = file.tell()
+                _write_png_chunk(file, b"acTL", struct.pack(">II", 0, loop))
+
+            _write_png_chunk(
+                file,
+                b"fcTL",
+                struct.pack(
+                    ">IIIIIHHBB",
+                    sequence_number,
+                    region.width,
+                    region.height,
+                    offset[0],
+                    offset[1],
+                    min(duration * num_repeats, 65535),
+                    1000,
+                    0,
+                    0,
+                ),
+            )
+            sequence_number += 1
+
+            for chunk_type, data in chunks:
+                if chunk_type != b"IDAT":
+                    continue
+                if num_frames == 0:
+                    _write_png_chunk(file, b"IDAT", data)
+                else:
+                    _write_png_chunk(
+                        file, b"fdAT", struct.pack(">I", sequence_number) + data
+                    )
+                    sequence_number += 1
+
+            num_frames += 1
+
+        if num_frames > 0:
+            _write_png_chunk(file, b"IEND", b"")
+            file.seek(actl_position)
+            _write_png_chunk(file, b"acTL", struct.pack(">II", num_frames, loop))
+
+    return num_frames
+
+
+def export_raw(frames: Iterable[Image.Image], path: str) -> int:
+    """
+    Streams frames into a headerless file of consecutive RGBA uint8 frames
+
+    The file can be memory-mapped with NumPy or encoded with ffmpeg, e.g.
+    `ffmpeg -f rawvideo -pix_fmt rgba -s 1084x546 -i frames.rgba out.mp4`.
+
+    Returns the number of frames written.
+
+    Args:
+        frames (Iterable[Image]): The frames to write, all of the same size
+        path (str): The path of the file to write
+    """
+
+    num_frames = 0
+
+    with open(path, "wb") as file:
+        for frame in frames:
+            file.write(frame.convert("RGBA").tobytes())
+            num_frames += 1
+
+    return num_frames
+
+
+def export(
+    frames: Iterable[Image.Image], path: str, duration: int = 500, loop: int = 0
+) -> int:
+    """
+    Streams frames into a file, picking the format from its extension (.gif, .png/.apng or .rgba)
+
+    Returns the number of frames written.
+
+    Args:
+        frames (Iterable[Image]): The frames to write, all of the same size
+        path (str): The path of the file to write
+        duration (int): How long each frame is shown for in milliseconds
+        loop (int): How many times the animation loops, 0 looping forever
+    """
+
+    match os.path.splitext(path)[1].lower():
+        case ".gif":
+            return export_gif(frames, path, duration=duration, loop=loop)
+        case ".png" | ".apng":
+            return export_apng(frames, path, duration=duration, loop=loop)
+        case ".rgba" | ".raw":
+            return export_raw(frames, path)
+        case extension:
+            raise ValueError(f"Unsupported export format {extension!r}")
+
+
+def _get_changed_regions(
+    frames: Iterable[Image.Image], mode: str
+) -> Iterator[tuple[Image.Image, tuple[int, int], int]]:
+    # yields the region that changed in each frame, with how many frames it stays on
+    # screen for, holding at most one pending region so memory stays bounded
+    previous, pending, num_repeats = None, None, 0
+
+    for frame in frames:
+        rgb_frame = frame.convert("RGB")
+        if previous is None:
+            bbox = (0, 0) + frame.size
+        else:
+            bbox = ImageChops.difference(previous, rgb_frame).getbbox()
+        previous = rgb_frame
+
+        if bbox is None:
+            num_repeats += 1
+            continue
+
+        if pending is not None:
+            yield pending + (num_repeats,)
+        pending, num_repeats = (frame.convert(mode).crop(bbox), bbox[:2]), 1
+
+    if pending is not None:
+        yield pending + (num_repeats,)
+
+
+def _read_png_chunks(png: bytes) -> Iterator[tuple[bytes, bytes]]:
+    position = len(PNG_SIGNATURE)
+    while position < len(png):
+        (length,) = struct.unpack(">I", png[position : position + 4])
+        chunk_type = png[position + 4 : position + 8]
+        yield chunk_type, png[position + 8 : position + 8 + length]
+        position += length + 12
+
+
+def _write_png_chunk(file: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+    file.write(struct.pack(">I", len(data)))
+    file.write(chunk_type)
+    file.write(data)
+    file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Exports a replay of an action log as a GIF, APNG or raw frame file"
+    )
+    parser.add_argument(
+        "replay",
+        help="a JSON file with the deck, stake, seed and [method, args] actions of a run",
+    )
+    parser.add_argument("output", help="the .gif, .png/.apng or .rgba file to write")
+    parser.add_argument("-d", "--duration", type=int, default=500)
+    parser.add_argument("-l", "--loop", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.replay) as file:
+        replay = json.load(file)
+
+    if replay.get("challenge") is not None:
+        run = ChallengeRun(Challenge[replay["challenge"]], seed=replay.get("seed"))
+    else:
+        run = Run(
+            Deck[replay["deck"]],
+            stake=Stake[replay.get("stake", "WHITE")],
+            seed=replay.get("seed"),
+        )
+
+    num_frames = export(
+        replay_frames(run, replay["actions"]),
+        args.output,
+        duration=args.duration,
+        loop=args.loop,
+    )
+    print(f"Wrote {num_frames} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
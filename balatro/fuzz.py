@@ -0,0 +1,552 @@
+from __future__ import annotations
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from typing import Any
+
+import numpy as np
+
+from . import ChallengeRun, Run
+from .actions import ACTIONS, NUM_ACTIONS, encode_action
+from .enums import *
+from .jokers import CreditCard, MrBones
+from .seeds import random_seeds
+from .simulate import WINNING_ANTE, Policy, load_policy
+
+# creates a run of a reference implementation from its deck, stake, challenge and seed
+RunFactory = Callable[[Deck, Stake, Challenge | None, str], Any]
+
+# the states each action can be taken in, and the states it can leave the run in
+STATE_TRANSITIONS: dict[str, tuple[set[State] | None, set[State] | None]] = {
+    "select_blind": (
+        {State.SELECTING_BLIND},
+        {State.PLAYING_BLIND, State.GAME_OVER},
+    ),
+    "skip_blind": (
+        {State.SELECTING_BLIND},
+        {State.SELECTING_BLIND, State.OPENING_PACK},
+    ),
+    "reroll_boss_blind": ({State.SELECTING_BLIND}, {State.SELECTING_BLIND}),
+    "play_hand": (
+        {State.PLAYING_BLIND},
+        {State.PLAYING_BLIND, State.CASHING_OUT, State.GAME_OVER},
+    ),
+    "discard": ({State.PLAYING_BLIND}, {State.PLAYING_BLIND, State.GAME_OVER}),
+    "cash_out": ({State.CASHING_OUT}, {State.IN_SHOP}),
+    "buy_shop_card": ({State.IN_SHOP}, {State.IN_SHOP}),
+    "open_shop_pack": ({State.IN_SHOP}, {State.OPENING_PACK}),
+    "redeem_shop_voucher": ({State.IN_SHOP}, {State.IN_SHOP}),
+    "reroll": ({State.IN_SHOP}, {State.IN_SHOP}),
+    "next_round": ({State.IN_SHOP}, {State.SELECTING_BLIND}),
+    "choose_pack_item": (
+        {State.OPENING_PACK},
+        {State.OPENING_PACK, State.IN_SHOP, State.SELECTING_BLIND},
+    ),
+    "skip_pack": (
+        {State.OPENING_PACK},
+        {State.OPENING_PACK, State.IN_SHOP, State.SELECTING_BLIND},
+    ),
+    # these can be taken in any state but GAME_OVER, and don't change it
+    "use_consumable": (None, None),
+    "sell_joker": (None, None),
+    "sell_consumable": (None, None),
+    "move_joker": (None, None),
+}
+
+_policy: Policy | None = None
+_reference: RunFactory | None = None
+
+
+def explore_policy(run: Run, action_mask: np.ndarray, rng: random.Random) -> int:
+    """
+    Mostly plays the best poker hand of five cards, discarding the cards it doesn't score while
+    it's worse than a straight, so runs get past the first antes and reach the shops, and
+    otherwise chooses a uniformly random legal action
+
+    Args:
+        run (Run): The run
+        action_mask (np.ndarray): The run's action mask
+        rng (random.Random): The policy's random stream for the run
+    """
+
+    legal_actions = np.flatnonzero(action_mask).tolist()
+    plays = [
+        action
+        for action in legal_actions
+        if ACTIONS[action][0] == "play_hand" and len(ACTIONS[action][1][0]) == 5
+    ]
+    if not plays or rng.random() >= 0.9:
+        return rng.choice(legal_actions)
+
+    # the best poker hand of each play and the indices of the played cards it scores
+    poker_hands = {
+        action: max(
+            run._get_poker_hands([run.hand[i] for i in ACTIONS[action][1][0]]).items()
+        )
+        for action in plays
+    }
+    action = max(plays, key=lambda action: poker_hands[action][0])
+    poker_hand, scored_indices = poker_hands[action]
+    if poker_hand < PokerHand.STRAIGHT:
+        played_indices = ACTIONS[action][1][0]
+        kept_indices = {played_indices[i] for i in scored_indices}
+        discarded_indices = [i for i in range(len(run.hand)) if i not in kept_indices][
+            :5
+        ]
+        if discarded_indices:
+            discard = encode_action("discard", discarded_indices)
+            if action_mask[discard]:
+                return discard
+    return action
+
+
+@dataclass(eq=False)
+class FuzzFailure:
+    """
+    A broken invariant or mismatch with the reference, with the actions reproducing it
+
+    The actions end with the one after which the failure was found. They are flat actions,
+    see log for the (method name, arguments) form of Run.action_log.
+    """
+
+    deck: Deck
+    stake: Stake
+    challenge: Challenge | None
+    seed: str
+    actions: list[int]
+    message: str
+
+    @property
+    def log(self) -> list[tuple[str, tuple]]:
+        return [
+            (
+                ACTIONS[action][0],
+                tuple(
+                    list(arg) if isinstance(arg, (list, tuple)) else arg
+                    for arg in ACTIONS[action][1]
+                ),
+            )
+            for action in self.actions
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Saves the failure as JSON, readable by Replay.load and python -m balatro.export
+
+        Args:
+            path (str): The path of the JSON file
+        """
+
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "deck": self.deck.name,
+                    "stake": self.stake.name,
+                    "challenge": (
+                        None if self.challenge is None else self.challenge.name
+                    ),
+                    "seed": self.seed,
+                    "message": self.message,
+                    "actions": [
+                        [method_name, list(args)] for method_name, args in self.log
+                    ],
+                },
+                file,
+            )
+
+
+@dataclass(eq=False)
+class RunSnapshot:
+    """
+    What the invariants need to know about a run before an action
+    """
+
+    state: State
+    round_score: float
+    money: int
+    has_mr_bones: bool
+
+    @classmethod
+    def from_run(cls, run: Run) -> RunSnapshot:
+        return cls(run.state, run.round_score, run.money, MrBones in run.jokers)
+
+
+def check_invariants(run: Run, method_name: str, before: RunSnapshot) -> str | None:
+    """
+    Checks a run after an action, returning what's wrong with it or none
+
+    Args:
+        run (Run): The run
+        method_name (str): The method name of the action taken
+        before (RunSnapshot): The run before the action
+    """
+
+    state = before.state
+
+    # the state machine
+    states, next_states = STATE_TRANSITIONS[method_name]
+    if states is not None and state not in states:
+        return f"{method_name} was taken in {state.name}"
+    if next_states is None:
+        next_states = {state}
+    if run.state not in next_states:
+        return f"{method_name} went from {state.name} to {run.state.name}"
+
+    # every card is in the deck once, and in hand or left in the deck at most once
+    deck_card_ids = {id(card) for card in run.deck_cards}
+    if len(deck_card_ids) != len(run.deck_cards):
+        return "A card is in the deck more than once"
+    if (run.hand is None) != (run._deck_cards_left is None):
+        return "The hand and the cards left in the deck are dealt separately"
+    if run.hand is not None:
+        hand_card_ids = {id(card) for card in run.hand}
+        card_left_ids = {id(card) for card in run._deck_cards_left}
+        if len(hand_card_ids) != len(run.hand):
+            return "A card is in hand more than once"
+        if len(card_left_ids) != len(run._deck_cards_left):
+            return "A card is left in the deck more than once"
+        if hand_card_ids & card_left_ids:
+            return "A card is both in hand and left in the deck"
+        if not hand_card_ids <= deck_card_ids:
+            return "A card in hand isn't in the deck"
+        if not card_left_ids <= deck_card_ids:
+            return "A card left in the deck isn't in the deck"
+
+    # money and slots, where only rent and blinds charging for hands and discards can go
+    # into debt
+    min_money = -20 * run.jokers.count(CreditCard)
+    if method_name not in {"play_hand", "discard"} and run.money < min(
+        before.money, min_money
+    ):
+        return f"{method_name} spent money down to {run.money}, below {min_money}"
+    if len(run.jokers) > run.joker_slots:
+        return f"{len(run.jokers)} Jokers are held with {run.joker_slots} slots"
+    if len(run.consumables) > run.consumable_slots:
+        return f"{len(run.consumables)} consumables are held with {run.consumable_slots} slots"
+    if run.hands < 0 or run.discards < 0:
+        return f"{run.hands} hands and {run.discards} discards are left"
+    if run.pack_choices_left is not None and run.pack_choices_left < 0:
+        return f"{run.pack_choices_left} pack choices are left"
+
+    # the score only goes up during a blind, and the blind is beaten when it's cashed out,
+    # unless Mr. Bones saved the run with a quarter of the goal and was destroyed
+    if state is State.PLAYING_BLIND and run.state is State.PLAYING_BLIND:
+        if run.round_score < before.round_score:
+            return (
+                f"The round score went from {before.round_score} to {run.round_score}"
+            )
+    if state is State.PLAYING_BLIND and run.state is State.CASHING_OUT:
+        saved = before.has_mr_bones and MrBones not in run.jokers
+        round_goal = run.round_goal / 4 if saved else run.round_goal
+        if run.round_score < round_goal:
+            return f"The blind was beaten with {run.round_score} of {run.round_goal}"
+
+    return None
+
+
+def get_public_state(run: Any) -> tuple:
+    """
+    Gets everything a player can see of a run, for comparing runs of different implementations
+
+    Args:
+        run: The run, of any implementation with the public API of Run
+    """
+
+    return (
+        run.state.name,
+        run.ante,
+        run.round,
+        run.money,
+        run.round_score,
+        run.hands,
+        run.discards,
+        run.blind.name,
+        None if run.hand is None else [repr(card) for card in run.hand],
+        len(run.deck_cards),
+        [repr(joker) for joker in run.jokers],
+        [repr(consumable) for consumable in run.consumables],
+        sorted(voucher.name for voucher in run.vouchers),
+        [tag.name for tag in run.tags],
+        (
+            None
+            if run.shop_cards is None
+            else [(repr(item), cost) for item, cost in run.shop_cards]
+        ),
+        run.legal_actions().tobytes(),
+    )
+
+
+def fuzz_run(
+    policy: Policy,
+    deck: Deck,
+    stake: Stake,
+    challenge: Challenge | None,
+    seed: str,
+    max_steps: int = 1000,
+    reference: RunFactory | None = None,
+) -> tuple[FuzzFailure | None, int]:
+    """
+    Plays a run with a policy, checking the invariants after every action and comparing the run
+    with a reference implementation if one is given, returning the first failure, or none, and
+    the number of steps taken
+
+    Args:
+        policy (Policy): Chooses a flat action from the run's action mask
+        deck (Deck): The deck of the run, ignored for challenges
+        stake (Stake): The stake of the run, ignored for challenges
+        challenge (Challenge, optional): The challenge of the run, or none
+        seed (str): The seed of the run, also seeding the random.Random passed to the policy
+        max_steps (int): The number of steps after which the run is stopped
+        reference (RunFactory, optional): Creates the reference run, or none
+    """
+
+    rng = random.Random(f"{seed}-fuzz")
+    actions = []
+
+    def choose(run: Run, action_mask: np.ndarray) -> int:
+        return policy(run, action_mask, rng)
+
+    failure = _play(deck, stake, challenge, seed, choose, max_steps, reference, actions)
+    return failure, len(actions)
+
+
+def minimize(failure: FuzzFailure, reference: RunFactory | None = None) -> FuzzFailure:
+    """
+    Removes actions from a failure while it still fails the same way, first in large chunks and
+    then one at a time, keeping only actions that are still legal
+
+    Args:
+        failure (FuzzFailure): The failure
+        reference (RunFactory, optional): Creates the reference run the failure was found with, or none
+    """
+
+    actions = failure.actions
+    chunk_size = len(actions) // 2
+    while chunk_size >= 1:
+        i = 0
+        while i < len(actions):
+            candidate = _replay(
+                failure, actions[:i] + actions[i + chunk_size :], reference
+            )
+            if candidate is not None and candidate.message == failure.message:
+                actions = candidate.actions
+            else:
+                i += chunk_size
+        chunk_size //= 2
+
+    return FuzzFailure(
+        failure.deck,
+        failure.stake,
+        failure.challenge,
+        failure.seed,
+        actions,
+        failure.message,
+    )
+
+
+def _create_run(
+    deck: Deck, stake: Stake, challenge: Challenge | None, seed: str
+) -> Run:
+    if challenge is not None:
+        return ChallengeRun(challenge, seed=seed)
+    return Run(deck, stake=stake, seed=seed)
+
+
+def _play(
+    deck: Deck,
+    stake: Stake,
+    challenge: Challenge | None,
+    seed: str,
+    choose: Callable[[Run, np.ndarray], int | None],
+    max_steps: int,
+    reference: RunFactory | None,
+    actions: list[int],
+) -> FuzzFailure | None:
+    # takes the actions chosen until none is, appending them, and returns the first failure
+    run = _create_run(deck, stake, challenge, seed)
+    reference_run = (
+        None if reference is None else reference(deck, stake, challenge, seed)
+    )
+    action_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def fail(message: str) -> FuzzFailure:
+        return FuzzFailure(deck, stake, challenge, seed, actions[:], message)
+
+    if reference_run is not None and (
+        get_public_state(run) != get_public_state(reference_run)
+    ):
+        return fail("The run differs from the reference when created")
+
+    while run.state is not State.GAME_OVER and run.ante < WINNING_ANTE:
+        if len(actions) >= max_steps:
+            break
+
+        action = choose(run, run.legal_actions(out=action_mask))
+        if action is None:
+            break
+        method_name, args = ACTIONS[action]
+        before = RunSnapshot.from_run(run)
+
+        actions.append(action)
+        try:
+            getattr(run, method_name)(*args)
+        except Exception as e:
+            return fail(f"{method_name} raised {type(e).__name__}")
+
+        message = check_invariants(run, method_name, before)
+        if message is not None:
+            return fail(message)
+
+        if reference_run is not None:
+            try:
+                getattr(reference_run, method_name)(*args)
+            except Exception as e:
+                return fail(f"The reference's {method_name} raised {type(e).__name__}")
+            if get_public_state(run) != get_public_state(reference_run):
+                return fail(f"The run differs from the reference after {method_name}")
+
+    return None
+
+
+def _replay(
+    failure: FuzzFailure, actions: list[int], reference: RunFactory | None
+) -> FuzzFailure | None:
+    # replays actions while they're legal, returning the failure they lead to if any
+    remaining = iter(actions)
+
+    def choose(run: Run, action_mask: np.ndarray) -> int | None:
+        action = next(remaining, None)
+        if action is None or not action_mask[action]:
+            return None
+        return action
+
+    return _play(
+        failure.deck,
+        failure.stake,
+        failure.challenge,
+        failure.seed,
+        choose,
+        len(actions),
+        reference,
+        [],
+    )
+
+
+def _init_worker(policy_path: str, reference_path: str | None) -> None:
+    global _policy, _reference
+    _policy = load_policy(policy_path)
+    _reference = None if reference_path is None else load_policy(reference_path)
+
+
+def _fuzz_runs(
+    max_steps: int,
+    runs: list[tuple[Deck, Stake, Challenge | None, str]],
+) -> tuple[list[FuzzFailure], int]:
+    failures, num_steps = [], 0
+    for deck, stake, challenge, seed in runs:
+        failure, steps = fuzz_run(
+            _policy, deck, stake, challenge, seed, max_steps, _reference
+        )
+        num_steps += steps
+        if failure is not None:
+            failures.append(minimize(failure, _reference))
+    return failures, num_steps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plays random legal actions over every deck, stake and challenge across "
+        "processes, checking the engine's invariants after every action, and writes a "
+        "minimized replay of every failure"
+    )
+    parser.add_argument(
+        "policy",
+        nargs="?",
+        default="balatro.fuzz:explore_policy",
+        help="the module:name import path of the policy",
+    )
+    parser.add_argument(
+        "-r",
+        "--reference",
+        default=None,
+        help="the module:name import path of a function taking a deck, stake, challenge "
+        "and seed and returning a run of a reference implementation to compare against",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=10, help="runs per setup")
+    parser.add_argument("-s", "--seed", default="0", help="the seed of the run seeds")
+    parser.add_argument("-m", "--max-steps", type=int, default=1000)
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count())
+    parser.add_argument("-o", "--output", default="fuzz")
+    parser.add_argument("--chunk-size", type=int, default=4)
+    args = parser.parse_args()
+
+    load_policy(args.policy)
+    if args.reference is not None:
+        load_policy(args.reference)
+
+    seeds = list(random_seeds(args.runs, seed=args.seed))
+    setups = [
+        (deck, stake, None)
+        for deck in Deck
+        if deck is not Deck.CHALLENGE
+        for stake in Stake
+    ]
+    setups += [(Deck.CHALLENGE, Stake.WHITE, challenge) for challenge in Challenge]
+    runs = [setup + (seed,) for seed in seeds for setup in setups]
+    chunks = [
+        runs[i : i + args.chunk_size] for i in range(0, len(runs), args.chunk_size)
+    ]
+
+    failures, num_steps = [], 0
+    start = time.perf_counter()
+    with mp.get_context().Pool(
+        args.processes,
+        initializer=_init_worker,
+        initargs=(args.policy, args.reference),
+    ) as pool:
+        for chunk_failures, chunk_steps in pool.imap_unordered(
+            partial(_fuzz_runs, args.max_steps), chunks
+        ):
+            failures += chunk_failures
+            num_steps += chunk_steps
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(runs)} runs, {num_steps} steps in {elapsed:.1f}s "
+        f"({num_steps / elapsed:.0f} steps/s), {len(failures)} failures"
+    )
+    if not failures:
+        return
+
+    # one reproducer per kind of failure, the shortest found
+    shortest = {}
+    for failure in failures:
+        if failure.message not in shortest or len(failure.actions) < len(
+            shortest[failure.message].actions
+        ):
+            shortest[failure.message] = failure
+
+    os.makedirs(args.output, exist_ok=True)
+    for i, (message, failure) in enumerate(sorted(shortest.items())):
+        path = os.path.join(args.output, f"failure-{i}.json")
+        failure.save(path)
+        setup = (
+            f"{failure.challenge.name} challenge"
+            if failure.challenge is not None
+            else f"{failure.deck.name} deck, {failure.stake.name} stake"
+        )
+        count = sum(other.message == message for other in failures)
+        print(
+            f"{message} ({count} runs): {setup}, seed {failure.seed}, "
+            f"{len(failure.actions)} actions, written to {path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
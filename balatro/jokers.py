@@ -1,15 +1,16 @@
 from copy import copy
 from dataclasses import dataclass, field
-import random as r
 
 from .classes import *
 from .enums import *
 
+# only Jokers with fields of their own are dataclasses, the rest inherit the generated
+# methods, as every dataclass decorator adds to the time it takes to import balatro
+
 
 # ---- copiers/ ---- #
 
 
-@dataclass(eq=False)
 class Blueprint(CopyJoker):
     """
     Copies ability of Joker to the right
@@ -22,7 +23,6 @@ class Blueprint(CopyJoker):
         )
 
 
-@dataclass(eq=False)
 class Brainstorm(CopyJoker):
     """
     Copies the ability of leftmost Joker
@@ -48,7 +48,6 @@ class Brainstorm(CopyJoker):
 # ---- on-played/ ---- #
 
 
-@dataclass(eq=False)
 class SpaceJoker(BalatroJoker):
     """
     1 in 4 chance to upgrade level of played poker hand
@@ -64,7 +63,6 @@ class SpaceJoker(BalatroJoker):
             self._run._poker_hand_info[poker_hands_played[0]][0] += 1
 
 
-@dataclass(eq=False)
 class DNA(BalatroJoker):
     """
     If first hand of round has only 1 card, add a permanent copy to deck and draw it to hand
@@ -87,12 +85,13 @@ class ToDoList(DynamicJoker):
     Earn $4 if poker hand is a [poker hand], poker hand changes at end of round
     """
 
-    poker_hand: PokerHand = field(
-        default_factory=lambda: r.choice(list(PokerHand)[3:]), init=False, repr=False
-    )
+    poker_hand: PokerHand = field(default=PokerHand.HIGH_CARD, init=False, repr=False)
 
     def _change_state(self) -> None:
-        self.poker_hand = r.choice(self._run._unlocked_poker_hands)
+        self.poker_hand = self._run._random.choice(self._run._unlocked_poker_hands)
+
+    def _created_action(self) -> None:
+        self.poker_hand = self._run._random.choice(list(PokerHand)[3:])
 
     def _hand_played_ability(
         self,
@@ -104,7 +103,6 @@ class ToDoList(DynamicJoker):
             self._run._money += 4
 
 
-@dataclass(eq=False)
 class MidasMask(BalatroJoker):
     """
     All played face cards become Gold cards when scored
@@ -127,7 +125,6 @@ class MidasMask(BalatroJoker):
 # ---- on-scored/ ---- #
 
 
-@dataclass(eq=False)
 class GreedyJoker(BalatroJoker):
     """
     Played cards with Diamond suit give +3 Mult when scored
@@ -144,7 +141,6 @@ class GreedyJoker(BalatroJoker):
             self._run._mult += 3
 
 
-@dataclass(eq=False)
 class LustyJoker(BalatroJoker):
     """
     Played cards with Heart suit give +3 Mult when scored
@@ -161,7 +157,6 @@ class LustyJoker(BalatroJoker):
             self._run._mult += 3
 
 
-@dataclass(eq=False)
 class WrathfulJoker(BalatroJoker):
     """
     Played cards with Spade suit give +3 Mult when scored
@@ -178,7 +173,6 @@ class WrathfulJoker(BalatroJoker):
             self._run._mult += 3
 
 
-@dataclass(eq=False)
 class GluttonousJoker(BalatroJoker):
     """
     Played cards with Club suit give +3 Mult when scored
@@ -195,7 +189,6 @@ class GluttonousJoker(BalatroJoker):
             self._run._mult += 3
 
 
-@dataclass(eq=False)
 class EightBall(BalatroJoker):
     """
     1 in 4 chance for each played 8 to create a Tarot card when scored
@@ -217,7 +210,6 @@ class EightBall(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Tarot))
 
 
-@dataclass(eq=False)
 class Dusk(BalatroJoker):
     """
     Retrigger all played cards in final hand of the round
@@ -233,7 +225,6 @@ class Dusk(BalatroJoker):
         return int(self._run._hands == 0)
 
 
-@dataclass(eq=False)
 class Fibonacci(BalatroJoker):
     """
     Each played Ace, 2, 3, 5, or 8 gives +8 Mult when scored
@@ -256,7 +247,6 @@ class Fibonacci(BalatroJoker):
             self._run._mult += 8
 
 
-@dataclass(eq=False)
 class ScaryFace(BalatroJoker):
     """
     Played face cards give +30 Chips when scored
@@ -273,7 +263,6 @@ class ScaryFace(BalatroJoker):
             self._run._chips += 30
 
 
-@dataclass(eq=False)
 class Hack(BalatroJoker):
     """
     Retrigger each played 2, 3, 4, or 5
@@ -297,7 +286,6 @@ class Hack(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class EvenSteven(BalatroJoker):
     """
     Played cards with even rank give +4 Mult when scored
@@ -321,7 +309,6 @@ class EvenSteven(BalatroJoker):
             self._run._mult += 4
 
 
-@dataclass(eq=False)
 class OddTodd(BalatroJoker):
     """
     Played cards with odd rank give +31 Chips when scored
@@ -345,7 +332,6 @@ class OddTodd(BalatroJoker):
             self._run._chips += 31
 
 
-@dataclass(eq=False)
 class Scholar(BalatroJoker):
     """
     Played Aces give +20 Chips and +4 Mult when scored
@@ -363,7 +349,6 @@ class Scholar(BalatroJoker):
             self._run._mult += 4
 
 
-@dataclass(eq=False)
 class BusinessCard(BalatroJoker):
     """
     Played face cards have a 1 in 2 chance to give $2 when scored
@@ -380,7 +365,6 @@ class BusinessCard(BalatroJoker):
             self._run._money += 2
 
 
-@dataclass(eq=False)
 class Hiker(BalatroJoker):
     """
     Every played card permanently gains +5 Chips when scored
@@ -396,7 +380,6 @@ class Hiker(BalatroJoker):
         scored_card.extra_chips += 5
 
 
-@dataclass(eq=False)
 class Photograph(BalatroJoker):
     """
     First played face card gives X2 Mult when scored
@@ -440,10 +423,11 @@ class AncientJoker(DynamicJoker):
             self._run._mult *= 1.5
 
     def _change_state(self) -> None:
-        self.suit = r.choice([suit for suit in Suit if suit is not self.suit])
+        self.suit = self._run._random.choice(
+            [suit for suit in Suit if suit is not self.suit]
+        )
 
 
-@dataclass(eq=False)
 class WalkieTalkie(BalatroJoker):
     """
     Each played 10 or 4 gives +10 Chips and +4 Mult when scored
@@ -489,7 +473,6 @@ class Seltzer(BalatroJoker):
             self._run._destroy_joker(self)
 
 
-@dataclass(eq=False)
 class SmileyFace(BalatroJoker):
     """
     Played face cards give +5 Mult when scored
@@ -506,7 +489,6 @@ class SmileyFace(BalatroJoker):
             self._run._mult += 5
 
 
-@dataclass(eq=False)
 class GoldenTicket(BalatroJoker):
     """
     Played Gold cards earn $4 when scored
@@ -523,7 +505,6 @@ class GoldenTicket(BalatroJoker):
             self._run._money += 4
 
 
-@dataclass(eq=False)
 class SockAndBuskin(BalatroJoker):
     """
     Retrigger all played face cards
@@ -539,7 +520,6 @@ class SockAndBuskin(BalatroJoker):
         return int(self._run._is_face_card(scored_card))
 
 
-@dataclass(eq=False)
 class HangingChad(BalatroJoker):
     """
     Retrigger first played card used in scoring 2 additional times
@@ -555,7 +535,6 @@ class HangingChad(BalatroJoker):
         return 2 if (scored_card is played_cards[scored_card_indices[0]]) else 0
 
 
-@dataclass(eq=False)
 class RoughGem(BalatroJoker):
     """
     Played cards with Diamond suit earn $1 when scored
@@ -572,7 +551,6 @@ class RoughGem(BalatroJoker):
             self._run._money += 1
 
 
-@dataclass(eq=False)
 class Bloodstone(BalatroJoker):
     """
     1 in 2 chance for played cards with Heart suit to give X1.5 Mult when scored
@@ -591,7 +569,6 @@ class Bloodstone(BalatroJoker):
             self._run._mult *= 1.5
 
 
-@dataclass(eq=False)
 class Arrowhead(BalatroJoker):
     """
     Played cards with Spade suit give +50 Chips when scored
@@ -608,7 +585,6 @@ class Arrowhead(BalatroJoker):
             self._run._chips += 50
 
 
-@dataclass(eq=False)
 class OnyxAgate(BalatroJoker):
     """
     Played cards with Club suit give +7 Mult when scored
@@ -656,13 +632,12 @@ class TheIdol(DynamicJoker):
             if not deck_card.is_stone_card
         ]
         if valid_deck_cards:
-            random_deck_card = r.choice(valid_deck_cards)
+            random_deck_card = self._run._random.choice(valid_deck_cards)
             self.card = Card(random_deck_card.rank, random_deck_card.suit)
         else:
             self.card = Card(Rank.ACE, Suit.SPADES)
 
 
-@dataclass(eq=False)
 class Triboulet(BalatroJoker):
     """
     Played Kings and Queens each give X2 Mult when scored
@@ -684,7 +659,6 @@ class Triboulet(BalatroJoker):
 # ---- on-held/ ---- #
 
 
-@dataclass(eq=False)
 class Mime(BalatroJoker):
     """
     Retrigger all card held in hand abilities
@@ -694,7 +668,6 @@ class Mime(BalatroJoker):
         return 1
 
 
-@dataclass(eq=False)
 class RaisedFist(BalatroJoker):
     """
     Adds double the rank of lowest ranked card held in hand to Mult
@@ -712,7 +685,6 @@ class RaisedFist(BalatroJoker):
             self._run._mult += held_card.rank.chips * 2
 
 
-@dataclass(eq=False)
 class Baron(BalatroJoker):
     """
     Each King held in hand gives X1.5 Mult
@@ -723,7 +695,6 @@ class Baron(BalatroJoker):
             self._run._mult *= 1.5
 
 
-@dataclass(eq=False)
 class ReservedParking(BalatroJoker):
     """
     Each face card held in hand has a 1 in 2 chance to give $1
@@ -734,7 +705,6 @@ class ReservedParking(BalatroJoker):
             self._run._money += 1
 
 
-@dataclass(eq=False)
 class ShootTheMoon(BalatroJoker):
     """
     Each Queen held in hand gives +13 Mult
@@ -750,7 +720,6 @@ class ShootTheMoon(BalatroJoker):
 # ---- independent/ ---- #
 
 
-@dataclass(eq=False)
 class Joker(BalatroJoker):
     """
     +4 Mult
@@ -765,7 +734,6 @@ class Joker(BalatroJoker):
         self._run._mult += 4
 
 
-@dataclass(eq=False)
 class JollyJoker(BalatroJoker):
     """
     +8 Mult if played hand contains a Pair
@@ -781,7 +749,6 @@ class JollyJoker(BalatroJoker):
             self._run._mult += 8
 
 
-@dataclass(eq=False)
 class ZanyJoker(BalatroJoker):
     """
     +12 Mult if played hand contains a Three of a Kind
@@ -797,7 +764,6 @@ class ZanyJoker(BalatroJoker):
             self._run._mult += 12
 
 
-@dataclass(eq=False)
 class MadJoker(BalatroJoker):
     """
     +10 Mult if played hand contains a Two Pair
@@ -813,7 +779,6 @@ class MadJoker(BalatroJoker):
             self._run._mult += 10
 
 
-@dataclass(eq=False)
 class CrazyJoker(BalatroJoker):
     """
     +12 Mult if played hand contains a Straight
@@ -829,7 +794,6 @@ class CrazyJoker(BalatroJoker):
             self._run._mult += 12
 
 
-@dataclass(eq=False)
 class DrollJoker(BalatroJoker):
     """
     +10 Mult if played hand contains a Flush
@@ -845,7 +809,6 @@ class DrollJoker(BalatroJoker):
             self._run._mult += 10
 
 
-@dataclass(eq=False)
 class SlyJoker(BalatroJoker):
     """
     +50 Chips if played hand contains a Pair
@@ -861,7 +824,6 @@ class SlyJoker(BalatroJoker):
             self._run._chips += 50
 
 
-@dataclass(eq=False)
 class WilyJoker(BalatroJoker):
     """
     +100 Chips if played hand contains a Three of a Kind
@@ -877,7 +839,6 @@ class WilyJoker(BalatroJoker):
             self._run._chips += 100
 
 
-@dataclass(eq=False)
 class CleverJoker(BalatroJoker):
     """
     +80 Chips if played hand contains a Two Pair
@@ -893,7 +854,6 @@ class CleverJoker(BalatroJoker):
             self._run._chips += 80
 
 
-@dataclass(eq=False)
 class DeviousJoker(BalatroJoker):
     """
     +100 Chips if played hand contains a Straight
@@ -909,7 +869,6 @@ class DeviousJoker(BalatroJoker):
             self._run._chips += 100
 
 
-@dataclass(eq=False)
 class CraftyJoker(BalatroJoker):
     """
     +80 Chips if played hand contains a Flush
@@ -925,7 +884,6 @@ class CraftyJoker(BalatroJoker):
             self._run._chips += 80
 
 
-@dataclass(eq=False)
 class HalfJoker(BalatroJoker):
     """
     +20 Mult if played hand contains 3 or fewer cards.
@@ -941,7 +899,6 @@ class HalfJoker(BalatroJoker):
             self._run._mult += 20
 
 
-@dataclass(eq=False)
 class JokerStencil(BalatroJoker):
     """
     X1 Mult for each empty Joker slot
@@ -964,7 +921,6 @@ class JokerStencil(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class CeremonialDagger(MultScalingJoker):
     """
     When Blind is selected, destroy Joker to the right and permanently add double its sell value to this Mult
@@ -978,7 +934,6 @@ class CeremonialDagger(MultScalingJoker):
                 self.mult += self._run._calculate_sell_value(right_joker) * 2
 
 
-@dataclass(eq=False)
 class Banner(BalatroJoker):
     """
     +30 Chips for each remaining discard
@@ -993,7 +948,6 @@ class Banner(BalatroJoker):
         self._run._chips += 30 * self._run._discards
 
 
-@dataclass(eq=False)
 class MysticSummit(BalatroJoker):
     """
     +15 Mult when 0 discards remaining
@@ -1038,7 +992,6 @@ class LoyaltyCard(BalatroJoker):
             self.hands_remaining -= 1
 
 
-@dataclass(eq=False)
 class Misprint(BalatroJoker):
     """
     +0-23 Mult
@@ -1050,10 +1003,9 @@ class Misprint(BalatroJoker):
         scored_card_indices: list[int],
         poker_hands_played: list[PokerHand],
     ) -> None:
-        self._run._mult += r.randint(0, 23)
+        self._run._mult += self._run._random.randint(0, 23)
 
 
-@dataclass(eq=False)
 class SteelJoker(BalatroJoker):
     """
     Gives X0.2 Mult for each Steel Card in your full deck
@@ -1074,7 +1026,6 @@ class SteelJoker(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class AbstractJoker(BalatroJoker):
     """
     +3 Mult for each Joker card
@@ -1089,7 +1040,6 @@ class AbstractJoker(BalatroJoker):
         self._run._mult += 3 * len(self._run._jokers)
 
 
-@dataclass(eq=False)
 class GrosMichel(BalatroJoker):
     """
     +15 Mult
@@ -1110,7 +1060,6 @@ class GrosMichel(BalatroJoker):
             self._run._gros_michel_extinct = True
 
 
-@dataclass(eq=False)
 class Supernova(BalatroJoker):
     """
     Adds the number of times poker hand has been played this run to Mult
@@ -1125,7 +1074,6 @@ class Supernova(BalatroJoker):
         self._run._mult += self._run._poker_hand_info[poker_hands_played[0]][1]
 
 
-@dataclass(eq=False)
 class Blackboard(BalatroJoker):
     """
     X3 Mult if all cards held in hand are Spades or Clubs
@@ -1165,7 +1113,6 @@ class IceCream(ChipsScalingJoker):
             self._run._destroy_joker(self)
 
 
-@dataclass(eq=False)
 class BlueJoker(BalatroJoker):
     """
     +2 Chips for each remaining card in deck
@@ -1180,7 +1127,6 @@ class BlueJoker(BalatroJoker):
         self._run._chips += 2 * len(self._run._deck_cards_left)
 
 
-@dataclass(eq=False)
 class Constellation(XMultScalingJoker):
     """
     This Joker gains X0.1 Mult every time a Planet card is used
@@ -1190,7 +1136,6 @@ class Constellation(XMultScalingJoker):
         self.xmult += 0.1
 
 
-@dataclass(eq=False)
 class Superposition(BalatroJoker):
     """
     Create a Tarot card if poker hand contains an Ace and a Straight
@@ -1211,7 +1156,6 @@ class Superposition(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Tarot))
 
 
-@dataclass(eq=False)
 class Cavendish(BalatroJoker):
     """
     X3 Mult
@@ -1231,7 +1175,6 @@ class Cavendish(BalatroJoker):
             self._run._destroy_joker(self)
 
 
-@dataclass(eq=False)
 class CardSharp(BalatroJoker):
     """
     X3 Mult if played poker hand has already been played this round
@@ -1247,7 +1190,6 @@ class CardSharp(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class RedCard(MultScalingJoker):
     """
     This Joker gains +3 Mult when any Booster Pack is skipped
@@ -1257,7 +1199,6 @@ class RedCard(MultScalingJoker):
         self.mult += 3
 
 
-@dataclass(eq=False)
 class Madness(XMultScalingJoker):
     """
     When Small Blind or Big Blind is selected, gain X0.5 Mult and destroy a random Joker
@@ -1273,10 +1214,9 @@ class Madness(XMultScalingJoker):
                 if joker is not self and not joker.is_eternal
             ]
             if valid_destroys:
-                self._run._destroy_joker(r.choice(valid_destroys))
+                self._run._destroy_joker(self._run._random.choice(valid_destroys))
 
 
-@dataclass(eq=False)
 class Seance(BalatroJoker):
     """
     If poker hand is a Straight Flush, create a random Spectral card
@@ -1296,7 +1236,6 @@ class Seance(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Spectral))
 
 
-@dataclass(eq=False)
 class Hologram(XMultScalingJoker):
     """
     This Joker gains X0.25 Mult every time a playing card is added to your deck
@@ -1334,7 +1273,6 @@ class Vagabond(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Tarot))
 
 
-@dataclass(eq=False)
 class Erosion(BalatroJoker):
     """
     +4 Mult for each card below [the deck's starting size] in your full deck
@@ -1352,7 +1290,6 @@ class Erosion(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class FortuneTeller(BalatroJoker):
     """
     +1 Mult per Tarot card used this run
@@ -1367,7 +1304,6 @@ class FortuneTeller(BalatroJoker):
         self._run._mult += self._run._num_tarot_cards_used
 
 
-@dataclass(eq=False)
 class StoneJoker(BalatroJoker):
     """
     Gives +25 Chips for each Stone Card in your full deck
@@ -1384,7 +1320,6 @@ class StoneJoker(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class Bull(BalatroJoker):
     """
     +2 Chips for each $1 you have
@@ -1399,7 +1334,6 @@ class Bull(BalatroJoker):
         self._run._chips += 2 * max(0, self._run._money)
 
 
-@dataclass(eq=False)
 class FlashCard(MultScalingJoker):
     """
     This Joker gains +2 Mult per reroll in the shop
@@ -1424,7 +1358,6 @@ class Popcorn(MultScalingJoker):
             self._run._destroy_joker(self)
 
 
-@dataclass(eq=False)
 class Campfire(XMultScalingJoker):
     """
     This Joker gains X0.25 Mult for each card sold, resets when Boss Blind is defeated
@@ -1437,7 +1370,6 @@ class Campfire(XMultScalingJoker):
         self.xmult += 0.25
 
 
-@dataclass(eq=False)
 class Acrobat(BalatroJoker):
     """
     X3 Mult on final hand of round
@@ -1453,7 +1385,6 @@ class Acrobat(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class Swashbuckler(BalatroJoker):
     """
     Adds the sell value of all other owned Jokers to Mult
@@ -1472,7 +1403,6 @@ class Swashbuckler(BalatroJoker):
         )
 
 
-@dataclass(eq=False)
 class Throwback(BalatroJoker):
     """
     X0.25 Mult for each Blind skipped this run
@@ -1487,7 +1417,6 @@ class Throwback(BalatroJoker):
         self._run._mult *= 1.0 + (0.25 * self._run._num_blinds_skipped)
 
 
-@dataclass(eq=False)
 class GlassJoker(XMultScalingJoker):
     """
     This Joker gains X0.75 Mult for every Glass Card that is destroyed
@@ -1498,7 +1427,6 @@ class GlassJoker(XMultScalingJoker):
             self.xmult += 0.75
 
 
-@dataclass(eq=False)
 class FlowerPot(BalatroJoker):
     """
     X3 Mult if poker hand contains a Diamond card, Club card, Heart card, and Spade card
@@ -1529,7 +1457,6 @@ class FlowerPot(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class SeeingDouble(BalatroJoker):
     """
     X2 Mult if played hand has a scoring Club card and a scoring card of any other suit
@@ -1562,7 +1489,6 @@ class SeeingDouble(BalatroJoker):
             self._run._mult *= 2
 
 
-@dataclass(eq=False)
 class Matador(BalatroJoker):
     """
     Earn $8 if played hand triggers the Boss Blind ability
@@ -1572,7 +1498,6 @@ class Matador(BalatroJoker):
         self._run._money += 8
 
 
-@dataclass(eq=False)
 class TheDuo(BalatroJoker):
     """
     X2 Mult if played hand contains a Pair
@@ -1588,7 +1513,6 @@ class TheDuo(BalatroJoker):
             self._run._mult *= 2
 
 
-@dataclass(eq=False)
 class TheTrio(BalatroJoker):
     """
     X3 Mult if played hand contains a Three of a Kind
@@ -1604,7 +1528,6 @@ class TheTrio(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class TheFamily(BalatroJoker):
     """
     X4 Mult if played hand contains a Four of a Kind
@@ -1620,7 +1543,6 @@ class TheFamily(BalatroJoker):
             self._run._mult *= 4
 
 
-@dataclass(eq=False)
 class TheOrder(BalatroJoker):
     """
     X3 Mult if played hand contains a Straight
@@ -1636,7 +1558,6 @@ class TheOrder(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class TheTribe(BalatroJoker):
     """
     X2 Mult if played hand contains a Flush
@@ -1652,7 +1573,6 @@ class TheTribe(BalatroJoker):
             self._run._mult *= 2
 
 
-@dataclass(eq=False)
 class Stuntman(BalatroJoker):
     """
     +250 Chips,
@@ -1668,7 +1588,6 @@ class Stuntman(BalatroJoker):
         self._run._chips += 250
 
 
-@dataclass(eq=False)
 class DriversLicense(BalatroJoker):
     """
     X3 Mult if you have at least 16 Enhanced cards in your full deck
@@ -1689,7 +1608,6 @@ class DriversLicense(BalatroJoker):
             self._run._mult *= 3
 
 
-@dataclass(eq=False)
 class Bootstraps(BalatroJoker):
     """
     +2 Mult for every $5 you have
@@ -1704,7 +1622,6 @@ class Bootstraps(BalatroJoker):
         self._run._mult += 2 * max(0, self._run._money // 5)
 
 
-@dataclass(eq=False)
 class Canio(XMultScalingJoker):
     """
     This Joker gains X1 Mult when a face card is destroyed
@@ -1720,7 +1637,6 @@ class Canio(XMultScalingJoker):
 # ---- mixed/ ---- #
 
 
-@dataclass(eq=False)
 class RideTheBus(MultScalingJoker):
     """
     This Joker gains +1 Mult per consecutive hand played without a scoring face card
@@ -1740,7 +1656,6 @@ class RideTheBus(MultScalingJoker):
             self.mult = 0
 
 
-@dataclass(eq=False)
 class Runner(ChipsScalingJoker):
     """
     Gains +15 Chips if played hand contains a Straight
@@ -1756,7 +1671,6 @@ class Runner(ChipsScalingJoker):
             self.chips += 15
 
 
-@dataclass(eq=False)
 class GreenJoker(MultScalingJoker):
     """
     +1 Mult per hand played
@@ -1775,7 +1689,6 @@ class GreenJoker(MultScalingJoker):
         self.mult += 1
 
 
-@dataclass(eq=False)
 class SquareJoker(ChipsScalingJoker):
     """
     This Joker gains +4 Chips if played hand has exactly 4 cards
@@ -1791,7 +1704,6 @@ class SquareJoker(ChipsScalingJoker):
             self.chips += 4
 
 
-@dataclass(eq=False)
 class Vampire(XMultScalingJoker):
     """
     This Joker gains X0.1 Mult per scoring Enhanced card played, removes card Enhancement
@@ -1810,7 +1722,6 @@ class Vampire(XMultScalingJoker):
                 scored_card.enhancement = None
 
 
-@dataclass(eq=False)
 class Obelisk(XMultScalingJoker):
     """
     This Joker gains X0.2 Mult per consecutive hand played without playing your most played poker hand
@@ -1831,7 +1742,6 @@ class Obelisk(XMultScalingJoker):
             self.xmult = 1.0
 
 
-@dataclass(eq=False)
 class LuckyCat(XMultScalingJoker):
     """
     This Joker gains X0.25 Mult every time a Lucky card successfully triggers
@@ -1841,7 +1751,6 @@ class LuckyCat(XMultScalingJoker):
         self.xmult += 0.25
 
 
-@dataclass(eq=False)
 class SpareTrousers(MultScalingJoker):
     """
     This Joker gains +2 Mult if played hand contains a Two Pair
@@ -1885,7 +1794,9 @@ class Castle(ChipsScalingJoker, DynamicJoker):
             for deck_card in self._run._deck_cards
             if not deck_card.is_stone_card
         ]
-        self.suit = r.choice(valid_suits) if valid_suits else Suit.SPADES
+        self.suit = (
+            self._run._random.choice(valid_suits) if valid_suits else Suit.SPADES
+        )
 
     def _discard_action(self, discarded_cards: list[Card]) -> None:
         self.chips += 3 * sum(
@@ -1894,7 +1805,6 @@ class Castle(ChipsScalingJoker, DynamicJoker):
         )
 
 
-@dataclass(eq=False)
 class WeeJoker(ChipsScalingJoker):
     """
     This Joker gains +8 Chips when each played 2 is scored
@@ -1911,7 +1821,6 @@ class WeeJoker(ChipsScalingJoker):
             self.chips += 8
 
 
-@dataclass(eq=False)
 class HitTheRoad(XMultScalingJoker):
     """
     This Joker gains X0.5 Mult for every Jack discarded this round
@@ -1944,7 +1853,6 @@ class Yorick(XMultScalingJoker):
 # ---- on-other-jokers/ ---- #
 
 
-@dataclass(eq=False)
 class BaseballCard(BalatroJoker):
     """
     Uncommon Jokers each give X1.5 Mult
@@ -1962,7 +1870,6 @@ class BaseballCard(BalatroJoker):
 # ---- on-discard/ ---- #
 
 
-@dataclass(eq=False)
 class FacelessJoker(BalatroJoker):
     """
     Earn $5 if 3 or more face cards are discarded at the same time
@@ -1993,13 +1900,12 @@ class MailInRebate(DynamicJoker):
             for deck_card in self._run._deck_cards
             if not deck_card.is_stone_card
         ]
-        self.rank = r.choice(valid_ranks) if valid_ranks else Rank.ACE
+        self.rank = self._run._random.choice(valid_ranks) if valid_ranks else Rank.ACE
 
     def _discard_ability(self, discarded_cards: list[Card]) -> None:
         self._run._money += 5 * discarded_cards.count(self.rank)
 
 
-@dataclass(eq=False)
 class TradingCard(BalatroJoker):
     """
     If first discard of round has only 1 card, destroy it and earn $3
@@ -2012,7 +1918,6 @@ class TradingCard(BalatroJoker):
             discarded_cards.pop()
 
 
-@dataclass(eq=False)
 class BurntJoker(BalatroJoker):
     """
     Upgrade the level of the first discarded poker hand each round
@@ -2030,21 +1935,18 @@ class BurntJoker(BalatroJoker):
 # ---- other/ ---- #
 
 
-@dataclass(eq=False)
 class FourFingers(BalatroJoker):
     """
     All Flushes and Straights can be made with 4 cards
     """
 
 
-@dataclass(eq=False)
 class CreditCard(BalatroJoker):
     """
     Go up to -$20 in debt
     """
 
 
-@dataclass(eq=False)
 class MarbleJoker(BalatroJoker):
     """
     Adds one Stone card to the deck when Blind is selected
@@ -2056,14 +1958,12 @@ class MarbleJoker(BalatroJoker):
         self._run._add_card(added_card)
 
 
-@dataclass(eq=False)
 class ChaosTheClown(BalatroJoker):
     """
     1 free Reroll per shop
     """
 
 
-@dataclass(eq=False)
 class DelayedGratification(BalatroJoker):
     """
     Earn $2 per discard if no discards are used by end of the round
@@ -2073,14 +1973,12 @@ class DelayedGratification(BalatroJoker):
         return 2 * self._run._discards if self._run._first_discard else 0
 
 
-@dataclass(eq=False)
 class Pareidolia(BalatroJoker):
     """
     All cards are considered face cards
     """
 
 
-@dataclass(eq=False)
 class Egg(BalatroJoker):
     """
     Gains $3 of sell value at end of round
@@ -2090,7 +1988,6 @@ class Egg(BalatroJoker):
         self._extra_sell_value += 3
 
 
-@dataclass(eq=False)
 class Burglar(BalatroJoker):
     """
     When Blind is selected, gain +3 Hands and lose all discards
@@ -2101,14 +1998,12 @@ class Burglar(BalatroJoker):
         self._run._discards = 0
 
 
-@dataclass(eq=False)
 class Splash(BalatroJoker):
     """
     Every played card counts in scoring
     """
 
 
-@dataclass(eq=False)
 class SixthSense(BalatroJoker):
     """
     If first hand of round is a single 6, destroy it and create a Spectral card
@@ -2135,7 +2030,6 @@ class SixthSense(BalatroJoker):
             scored_card_indices.pop()
 
 
-@dataclass(eq=False)
 class RiffRaff(BalatroJoker):
     """
     When Blind is selected, create 2 Common Jokers
@@ -2147,7 +2041,6 @@ class RiffRaff(BalatroJoker):
             self._run._add_joker(self._run._get_random_joker(Rarity.COMMON))
 
 
-@dataclass(eq=False)
 class Shortcut(BalatroJoker):
     """
     Allows Straights to be made with gaps of 1 rank
@@ -2155,7 +2048,6 @@ class Shortcut(BalatroJoker):
     """
 
 
-@dataclass(eq=False)
 class CloudNine(BalatroJoker):
     """
     Earn $1 for each 9 in your full deck at end of round
@@ -2180,7 +2072,6 @@ class Rocket(BalatroJoker):
         return self.payout
 
 
-@dataclass(eq=False)
 class Luchador(BalatroJoker):
     """
     Sell this card to disable the current Boss Blind
@@ -2190,7 +2081,6 @@ class Luchador(BalatroJoker):
         self._run._disable_boss_blind()
 
 
-@dataclass(eq=False)
 class GiftCard(BalatroJoker):
     """
     Add $1 of sell value to every Joker and Consumable card at end of round
@@ -2217,14 +2107,12 @@ class TurtleBean(BalatroJoker):
             self._run._destroy_joker(self)
 
 
-@dataclass(eq=False)
 class ToTheMoon(BalatroJoker):
     """
     Earn an extra $1 of interest for every $5 you have at end of round
     """
 
 
-@dataclass(eq=False)
 class Hallucination(BalatroJoker):
     """
     1 in 2 chance to create a Tarot card when any Booster Pack is opened
@@ -2238,21 +2126,18 @@ class Hallucination(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Tarot))
 
 
-@dataclass(eq=False)
 class Juggler(BalatroJoker):
     """
     +1 hand size
     """
 
 
-@dataclass(eq=False)
 class Drunkard(BalatroJoker):
     """
     +1 discard each round
     """
 
 
-@dataclass(eq=False)
 class GoldenJoker(BalatroJoker):
     """
     Earn $4 at end of round
@@ -2262,7 +2147,6 @@ class GoldenJoker(BalatroJoker):
         return 4
 
 
-@dataclass(eq=False)
 class DietCola(BalatroJoker):
     """
     Sell this card to create a free Double Tag
@@ -2272,7 +2156,6 @@ class DietCola(BalatroJoker):
         self._run._tags.append(Tag.DOUBLE)
 
 
-@dataclass(eq=False)
 class MrBones(BalatroJoker):
     """
     Prevents Death if chips scored are at least 25% of required chips
@@ -2280,7 +2163,6 @@ class MrBones(BalatroJoker):
     """
 
 
-@dataclass(eq=False)
 class Troubadour(BalatroJoker):
     """
     +2 hand size,
@@ -2288,7 +2170,6 @@ class Troubadour(BalatroJoker):
     """
 
 
-@dataclass(eq=False)
 class Certificate(BalatroJoker):
     """
     When round begins, add a random playing card with a random seal to your hand
@@ -2296,25 +2177,22 @@ class Certificate(BalatroJoker):
 
     def _blind_selected_ability(self) -> None:
         added_card = self._run._get_random_card()
-        added_card.seal = r.choice(list(Seal))
+        added_card.seal = self._run._random.choice(list(Seal))
         self._run._add_card(added_card, draw_to_hand=True)
 
 
-@dataclass(eq=False)
 class SmearedJoker(BalatroJoker):
     """
     Hearts and Diamonds count as the same suit, Spades and Clubs count as the same suit
     """
 
 
-@dataclass(eq=False)
 class Showman(BalatroJoker):
     """
     Joker, Tarot, Planet, and Spectral cards may appear multiple times
     """
 
 
-@dataclass(eq=False)
 class MerryAndy(BalatroJoker):
     """
     +3 discards each round,
@@ -2322,7 +2200,6 @@ class MerryAndy(BalatroJoker):
     """
 
 
-@dataclass(eq=False)
 class OopsAllSixes(BalatroJoker):
     """
     Doubles all listed probabilities
@@ -2344,7 +2221,7 @@ class InvisibleJoker(BalatroJoker):
 
     def _sold_action(self) -> None:
         if self.rounds_remaining == 0 and len(self._run._jokers) > 1:
-            duplicated_joker = copy(r.choice(self._run._jokers))
+            duplicated_joker = copy(self._run._random.choice(self._run._jokers))
 
             if duplicated_joker.edition is Edition.NEGATIVE:
                 duplicated_joker.edition = Edition.BASE
@@ -2354,7 +2231,6 @@ class InvisibleJoker(BalatroJoker):
             self._run._add_joker(duplicated_joker)
 
 
-@dataclass(eq=False)
 class Satellite(BalatroJoker):
     """
     Earn $1 at end of round per unique Planet card used this run
@@ -2364,7 +2240,6 @@ class Satellite(BalatroJoker):
         return len(self._run._unique_planet_cards_used)
 
 
-@dataclass(eq=False)
 class Cartomancer(BalatroJoker):
     """
     Create a Tarot card when Blind is selected
@@ -2376,14 +2251,12 @@ class Cartomancer(BalatroJoker):
             self._run._consumables.append(self._run._get_random_consumable(Tarot))
 
 
-@dataclass(eq=False)
 class Astronomer(BalatroJoker):
     """
     All Planet cards and Celestial Packs in the shop are free
     """
 
 
-@dataclass(eq=False)
 class Chicot(BalatroJoker):
     """
     Disables effect of every Boss Blind
@@ -2393,14 +2266,13 @@ class Chicot(BalatroJoker):
         self._run._disable_boss_blind()
 
 
-@dataclass(eq=False)
 class Perkeo(BalatroJoker):
     """
     Creates a Negative copy of 1 random consumable card in your possession at the end of the shop
     """
 
     def _shop_exited_ability(self) -> None:
-        copied_consumable = copy(r.choice(self._run._consumables))
+        copied_consumable = copy(self._run._random.choice(self._run._consumables))
         copied_consumable.is_negative = True
         self._run._consumables.append(copied_consumable)
 
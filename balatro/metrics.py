@@ -0,0 +1,424 @@
+from __future__ import annotations
+import argparse
+from bisect import bisect_left
+from collections.abc import Callable
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+import weakref
+
+from . import Run, env
+from .actions import ACTIONS
+from .enums import *
+from .profiling import restore_wrapped
+from .seeds import random_seeds
+from .simulate import WINNING_ANTE, load_policy, play_run
+
+# the Run methods behind the flat actions
+ACTION_NAMES = sorted({method_name for method_name, _ in ACTIONS})
+
+# upper bounds in seconds, from a fast hand to a slow sprite
+LATENCY_BUCKETS = (
+    1e-5,
+    2.5e-5,
+    5e-5,
+    1e-4,
+    2.5e-4,
+    5e-4,
+    1e-3,
+    2.5e-3,
+    5e-3,
+    1e-2,
+    2.5e-2,
+    5e-2,
+    0.1,
+)
+
+_enabled_metrics: Metrics | None = None
+
+
+class Counter:
+    """
+    A Prometheus counter, with a value per combination of label values
+    """
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:
+        """
+        Args:
+            name (str): The metric name
+            help (str): The description of the metric
+            label_names (tuple[str, ...]): The names of its labels
+        """
+
+        self.name: str = name
+        self.help: str = help
+        self.label_names: tuple[str, ...] = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """
+        Adds to the value of the label values
+
+        Args:
+            *label_values (str): The value of each label, in the order of the label names
+            amount (float): The amount to add
+        """
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def get(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0)
+
+    def format(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(
+                f"{self.name}{_format_labels(self.label_names, label_values)} "
+                f"{_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Histogram:
+    """
+    A Prometheus histogram of observed values, such as latencies in seconds
+    """
+
+    def __init__(
+        self, name: str, help: str, buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        """
+        Args:
+            name (str): The metric name
+            help (str): The description of the metric
+            buckets (tuple[float, ...]): The ascending upper bounds of the buckets, besides +Inf
+        """
+
+        self.name: str = name
+        self.help: str = help
+        self.buckets: tuple[float, ...] = buckets
+        # per bucket rather than cumulative, the last one being +Inf
+        self._counts: list[int] = [0] * (len(buckets) + 1)
+        self._sum: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """
+        Counts a value in the first bucket it fits in
+
+        Args:
+            value (float): The value
+        """
+
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def format(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            counts, total = self._counts[:], self._sum
+
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            lines.append(
+                f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}'
+            )
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return "\n".join(lines)
+
+
+class Metrics:
+    """
+    Counts run actions, play_hand and sprite latencies, shop rerolls and finished games while
+    enabled, for exporting in the Prometheus text exposition format
+
+    Like Profiler, enabling wraps the Run actions, Run._game_over and get_sprite in place, and
+    disabling puts the original functions back, so disabled metrics cost nothing. While
+    enabled, every action costs two clock reads and a few dictionary updates. Only one Metrics
+    can be enabled at a time, and metrics are kept per process.
+    """
+
+    def __init__(self) -> None:
+        self.actions: Counter = Counter(
+            "balatro_actions_total", "Run actions taken, by action", ("action",)
+        )
+        self.action_seconds: Counter = Counter(
+            "balatro_action_seconds_total",
+            "Seconds spent in run actions, by action",
+            ("action",),
+        )
+        self.play_hand_seconds: Histogram = Histogram(
+            "balatro_play_hand_seconds", "Latency of Run.play_hand"
+        )
+        self.shop_rerolls: Counter = Counter(
+            "balatro_shop_rerolls_total", "Shops rerolled"
+        )
+        self.games_finished: Counter = Counter(
+            "balatro_games_finished_total",
+            "Runs lost or won, by the ante reached",
+            ("ante", "result"),
+        )
+        self.sprite_seconds: Histogram = Histogram(
+            "balatro_sprite_render_seconds", "Latency of get_sprite"
+        )
+        # the environments play on after a win, so each run's result is only counted once
+        self._finished_runs: weakref.WeakSet[Run] = weakref.WeakSet()
+        # (owner, name, original, wrapper)
+        self._originals: list[tuple[object, str, Callable, Callable]] = []
+        self._local: threading.local = threading.local()
+
+    def __enter__(self) -> Metrics:
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
+
+    def disable(self) -> None:
+        """
+        Puts the original functions back, keeping the metrics
+
+        Raises a RuntimeError if anything wrapped them again after these metrics were
+        enabled, such as a Profiler, as putting them back would undo that too.
+        """
+
+        global _enabled_metrics
+        if _enabled_metrics is not self:
+            return
+
+        restore_wrapped(self._originals)
+        _enabled_metrics = None
+
+    def enable(self) -> None:
+        """
+        Wraps the run actions, Run._game_over and get_sprite, keeping any metrics already counted
+        """
+
+        global _enabled_metrics
+        if _enabled_metrics is self:
+            return
+        if _enabled_metrics is not None:
+            raise RuntimeError("Another Metrics is already enabled")
+
+        for name in ACTION_NAMES:
+            self._wrap_action(name, getattr(Run, name))
+        self._wrap_game_over(Run._game_over)
+        self._wrap_get_sprite()
+        # the environments call the actions through a table of functions
+        env._ACTION_METHODS[:] = [
+            getattr(Run, method_name) for method_name, _ in ACTIONS
+        ]
+
+        _enabled_metrics = self
+
+    def format(self) -> str:
+        """
+        Formats the metrics in the Prometheus text exposition format
+        """
+
+        return (
+            "\n".join(
+                metric.format()
+                for metric in [
+                    self.actions,
+                    self.action_seconds,
+                    self.play_hand_seconds,
+                    self.shop_rerolls,
+                    self.games_finished,
+                    self.sprite_seconds,
+                ]
+            )
+            + "\n"
+        )
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serves the metrics over HTTP on a daemon thread until the returned server is shut down
+
+        Args:
+            port (int): The port, or 0 for any free one
+            host (str): The host to bind to
+        """
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.format().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def write(self, path: str) -> None:
+        """
+        Writes the metrics to a file in the Prometheus text exposition format, replacing it in
+        one step so readers like node_exporter's textfile collector never see half of it
+
+        Args:
+            path (str): The path of the file, usually ending in .prom
+        """
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(self.format())
+        os.replace(temporary_path, path)
+
+    def _wrap_action(self, name: str, func: Callable) -> None:
+        actions, action_seconds = self.actions, self.action_seconds
+        histogram = self.play_hand_seconds if name == "play_hand" else None
+        shop_rerolls = self.shop_rerolls if name == "reroll" else None
+        games_finished, finished_runs = self.games_finished, self._finished_runs
+
+        @functools.wraps(func)
+        def wrapper(run, *args, **kwargs):
+            # the ante after Hieroglyph and Petroglyph, which play_run stops at too
+            ante = run.ante
+            start = time.perf_counter()
+            result = func(run, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+
+            actions.inc(name)
+            action_seconds.inc(name, amount=elapsed)
+            if histogram is not None:
+                histogram.observe(elapsed)
+            if shop_rerolls is not None:
+                shop_rerolls.inc()
+            if ante < WINNING_ANTE <= run.ante and run not in finished_runs:
+                finished_runs.add(run)
+                games_finished.inc(str(run.ante - 1), "won")
+            return result
+
+        self._originals.append((Run, name, func, wrapper))
+        setattr(Run, name, wrapper)
+
+    def _wrap_game_over(self, func: Callable) -> None:
+        games_finished, finished_runs = self.games_finished, self._finished_runs
+
+        @functools.wraps(func)
+        def wrapper(run, *args, **kwargs):
+            if run not in finished_runs:
+                finished_runs.add(run)
+                games_finished.inc(str(run.ante), "lost")
+            return func(run, *args, **kwargs)
+
+        self._originals.append((Run, "_game_over", func, wrapper))
+        Run._game_over = wrapper
+
+    def _wrap_get_sprite(self) -> None:
+        from . import sprites
+
+        func = sprites.get_sprite
+        histogram, local = self.sprite_seconds, self._local
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # card backs are rendered by nested calls, which the outer call already times
+            depth = getattr(local, "depth", 0)
+            local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                local.depth = depth
+                if depth == 0:
+                    histogram.observe(time.perf_counter() - start)
+
+        self._originals.append((sprites, "get_sprite", func, wrapper))
+        sprites.get_sprite = wrapper
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...]) -> str:
+    if not label_names:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(label_names, label_values)
+    )
+    return f"{{{labels}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plays runs of a policy with metrics enabled, writing them in the "
+        "Prometheus text format as it goes and optionally serving them over HTTP"
+    )
+    parser.add_argument(
+        "policy",
+        nargs="?",
+        default="balatro.simulate:random_policy",
+        help="the module:name import path of the policy",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=100)
+    parser.add_argument("-s", "--seed", default="0", help="the seed of the run seeds")
+    parser.add_argument("-d", "--deck", default=Deck.RED.name)
+    parser.add_argument("-k", "--stake", default=Stake.WHITE.name)
+    parser.add_argument("-m", "--max-steps", type=int, default=10000)
+    parser.add_argument("-o", "--output", default="balatro.prom")
+    parser.add_argument(
+        "--port", type=int, default=None, help="a port to also serve the metrics on"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=10.0, help="seconds between writes"
+    )
+    args = parser.parse_args()
+
+    policy = load_policy(args.policy)
+    with Metrics() as metrics:
+        if args.port is not None:
+            metrics.serve(args.port)
+
+        last_write = time.monotonic()
+        for seed in random_seeds(args.runs, seed=args.seed):
+            play_run(
+                policy,
+                Deck[args.deck],
+                Stake[args.stake],
+                None,
+                seed,
+                max_steps=args.max_steps,
+            )
+            if time.monotonic() - last_write >= args.interval:
+                metrics.write(args.output)
+                last_write = time.monotonic()
+
+        metrics.write(args.output)
+
+    print(metrics.format(), end="")
+
+
+if __name__ == "__main__":
+    main()
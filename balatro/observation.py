@@ -0,0 +1,427 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .actions import (
+    MAX_CONSUMABLES,
+    MAX_HAND_SIZE,
+    MAX_JOKERS,
+    MAX_PACK_ITEMS,
+    MAX_SHOP_CARDS,
+    MAX_SHOP_PACKS,
+    MAX_SHOP_VOUCHERS,
+)
+from .classes import *
+from .enums import *
+
+if TYPE_CHECKING:
+    from . import Run
+
+# bumped whenever a field is added, removed or changes meaning
+OBSERVATION_VERSION = 1
+
+# enum fields hold the index of the member in its enum, and -1 for none or an empty slot
+CARD_DTYPE = np.dtype(
+    [
+        ("rank", np.int8),
+        ("suit", np.int8),
+        ("enhancement", np.int8),
+        ("seal", np.int8),
+        ("edition", np.int8),
+        ("extra_chips", np.int16),
+        ("is_debuffed", np.bool_),
+        ("is_face_down", np.bool_),
+    ]
+)
+JOKER_DTYPE = np.dtype(
+    [
+        # index in JokerType
+        ("type", np.int16),
+        ("edition", np.int8),
+        ("is_eternal", np.bool_),
+        ("is_perishable", np.bool_),
+        ("is_rental", np.bool_),
+        ("is_debuffed", np.bool_),
+        ("is_flipped", np.bool_),
+        ("perishable_rounds_left", np.int8),
+        ("sell_value", np.int16),
+        # the scaled values of mult, chips and xmult scaling Jokers, 0, 0 and 1 otherwise
+        ("mult", np.float32),
+        ("chips", np.float32),
+        ("xmult", np.float32),
+    ]
+)
+CONSUMABLE_DTYPE = np.dtype(
+    [
+        # 0 for Tarot, 1 for Planet and 2 for Spectral, card indexing that enum
+        ("kind", np.int8),
+        ("card", np.int8),
+        ("is_negative", np.bool_),
+    ]
+)
+ITEM_DTYPE = np.dtype(
+    [
+        # 0 for a Joker, 1 for a Consumable and 2 for a Card, only that field being set
+        ("kind", np.int8),
+        ("joker", JOKER_DTYPE),
+        ("consumable", CONSUMABLE_DTYPE),
+        ("card", CARD_DTYPE),
+        ("cost", np.int16),
+    ]
+)
+OFFER_DTYPE = np.dtype([("item", np.int8), ("cost", np.int16)])
+
+OBSERVATION_DTYPE = np.dtype(
+    [
+        ("version", np.uint16),
+        ("state", np.int8),
+        ("deck", np.int8),
+        ("stake", np.int8),
+        ("challenge", np.int8),
+        ("ante", np.int16),
+        ("round", np.int16),
+        ("money", np.int32),
+        # -1 outside of a round
+        ("hands", np.int16),
+        ("discards", np.int16),
+        ("hand_size", np.int16),
+        ("joker_slots", np.int8),
+        ("consumable_slots", np.int8),
+        ("blind", np.int8),
+        ("boss_blind", np.int8),
+        ("is_boss_blind", np.bool_),
+        ("blind_reward", np.int16),
+        # 0 outside of a round
+        ("round_score", np.float64),
+        ("round_goal", np.float64),
+        # -1 outside of the shop
+        ("reroll_cost", np.int16),
+        ("forced_selected_card_index", np.int8),
+        # the skip tags of the small and big blinds
+        ("ante_tags", np.int8, (2,)),
+        # the true lengths, which can be longer than the fixed-size slots below
+        ("num_hand_cards", np.int16),
+        ("num_jokers", np.int16),
+        ("num_consumables", np.int16),
+        ("num_deck_cards", np.int16),
+        ("num_deck_cards_left", np.int16),
+        ("hand", CARD_DTYPE, (MAX_HAND_SIZE,)),
+        # the cards left in the deck by [suit, rank] and by enhancement
+        ("deck_counts", np.int16, (len(Suit), len(Rank))),
+        ("deck_enhancement_counts", np.int16, (len(Enhancement),)),
+        ("jokers", JOKER_DTYPE, (MAX_JOKERS,)),
+        ("consumables", CONSUMABLE_DTYPE, (MAX_CONSUMABLES,)),
+        ("vouchers", np.bool_, (len(Voucher),)),
+        ("tags", np.uint8, (len(Tag),)),
+        ("poker_hand_levels", np.int32, (len(PokerHand),)),
+        ("poker_hand_plays", np.int32, (len(PokerHand),)),
+        ("shop_cards", ITEM_DTYPE, (MAX_SHOP_CARDS,)),
+        ("shop_vouchers", OFFER_DTYPE, (MAX_SHOP_VOUCHERS,)),
+        ("shop_packs", OFFER_DTYPE, (MAX_SHOP_PACKS,)),
+        # -1 when no pack is opened
+        ("opened_pack", np.int8),
+        ("pack_choices_left", np.int8),
+        ("pack_items", ITEM_DTYPE, (MAX_PACK_ITEMS,)),
+    ]
+)
+
+_ENUM_INDICES = {
+    member: i
+    for enum in (
+        Rank,
+        Suit,
+        Enhancement,
+        Seal,
+        Edition,
+        Tarot,
+        Planet,
+        Spectral,
+        Voucher,
+        Tag,
+        Blind,
+        Pack,
+        PokerHand,
+        State,
+        Deck,
+        Stake,
+        Challenge,
+    )
+    for i, member in enumerate(enum)
+}
+# enum members hash in Python, so the fields written for every card go by member name
+_RANK_INDICES = {name: i for i, name in enumerate(Rank.__members__)}
+_SUIT_INDICES = {name: i for i, name in enumerate(Suit.__members__)}
+_ENHANCEMENT_INDICES = {name: i for i, name in enumerate(Enhancement.__members__)}
+_SEAL_INDICES = {name: i for i, name in enumerate(Seal.__members__)}
+_EDITION_INDICES = {name: i for i, name in enumerate(Edition.__members__)}
+_CONSUMABLE_KINDS = {Tarot: 0, Planet: 1, Spectral: 2}
+_JOKER_TYPE_INDICES = {name: i for i, name in enumerate(JokerType.__members__)}
+
+
+# the fields set to -1 when empty, by name at any depth
+_NONE_FIELDS = {
+    "challenge",
+    "hands",
+    "discards",
+    "reroll_cost",
+    "forced_selected_card_index",
+    "ante_tags",
+    "opened_pack",
+    "pack_choices_left",
+    "rank",
+    "suit",
+    "enhancement",
+    "seal",
+    "edition",
+    "type",
+    "perishable_rounds_left",
+    "kind",
+    "card",
+    "item",
+}
+
+
+def _fill_empty(array: np.ndarray) -> None:
+    for name in array.dtype.names:
+        if array.dtype[name].names is not None:
+            _fill_empty(array[name])
+        elif name in _NONE_FIELDS:
+            array[name] = -1
+
+
+def _get_empty_observation() -> np.ndarray:
+    observation = np.zeros((), dtype=OBSERVATION_DTYPE)
+    _fill_empty(observation)
+    observation["version"] = OBSERVATION_VERSION
+    observation.flags.writeable = False
+    return observation
+
+
+_EMPTY_OBSERVATION = _get_empty_observation()
+
+# nested dicts of field views of the least to most recently used buffers, keyed by id
+# with the buffer kept alive so its id can't be reused while it's cached
+_views_cache: OrderedDict[int, tuple[np.ndarray, dict]] = OrderedDict()
+_MAX_CACHED_VIEWS = 1024
+
+
+def _get_field_views(array: np.ndarray) -> dict:
+    return {
+        name: (
+            array[name]
+            if array.dtype[name].names is None
+            else _get_field_views(array[name])
+        )
+        for name in array.dtype.names
+    }
+
+
+def _get_views(out: np.ndarray) -> dict:
+    cached = _views_cache.pop(id(out), None)
+    if cached is None or cached[0] is not out:
+        cached = (out, _get_field_views(out))
+
+    _views_cache[id(out)] = cached
+    if len(_views_cache) > _MAX_CACHED_VIEWS:
+        _views_cache.popitem(last=False)
+
+    return cached[1]
+
+
+def new_observation(shape: int | tuple[int, ...] = ()) -> np.ndarray:
+    """
+    Creates an empty observation buffer, or an array of them, to pass to Run.observe
+
+    Args:
+        shape (int | tuple[int, ...]): The shape of the array, a single observation by default
+    """
+
+    observations = np.empty(shape, dtype=OBSERVATION_DTYPE)
+    observations[...] = _EMPTY_OBSERVATION
+    return observations
+
+
+def observe(run: Run, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Encodes the state of a run as a fixed-shape observation with OBSERVATION_DTYPE
+
+    Args:
+        run (Run): The run to observe
+        out (np.ndarray, optional): A 0-d array with OBSERVATION_DTYPE to write into, or none for a new one
+    """
+
+    if out is None:
+        out = np.empty((), dtype=OBSERVATION_DTYPE)
+        views = _get_field_views(out)
+    elif out.dtype != OBSERVATION_DTYPE or out.shape != ():
+        raise ValueError(
+            f"Expected a 0-d array with OBSERVATION_DTYPE, but got shape {out.shape} and dtype {out.dtype}"
+        )
+    else:
+        views = _get_views(out)
+
+    out[...] = _EMPTY_OBSERVATION
+
+    views["state"][...] = _ENUM_INDICES[run._state]
+    views["deck"][...] = _ENUM_INDICES[run._deck]
+    views["stake"][...] = _ENUM_INDICES[run._stake]
+    if run.challenge is not None:
+        views["challenge"][...] = _ENUM_INDICES[run.challenge]
+    views["ante"][...] = run._ante
+    views["round"][...] = run._round
+    views["money"][...] = run._money
+    if run._hands is not None:
+        views["hands"][...] = run._hands
+    if run._discards is not None:
+        views["discards"][...] = run._discards
+    views["hand_size"][...] = run.hand_size
+    views["joker_slots"][...] = run.joker_slots
+    views["consumable_slots"][...] = run.consumable_slots
+    views["blind"][...] = _ENUM_INDICES[run._blind]
+    views["boss_blind"][...] = _ENUM_INDICES[run._boss_blind]
+    views["is_boss_blind"][...] = run._is_boss_blind
+    views["blind_reward"][...] = run.blind_reward
+    if run._round_score is not None:
+        views["round_score"][...] = run._round_score
+    if run._round_goal is not None:
+        views["round_goal"][...] = run._round_goal
+    if run._reroll_cost is not None:
+        views["reroll_cost"][...] = run.reroll_cost
+    if run._forced_selected_card_index is not None:
+        views["forced_selected_card_index"][...] = run._forced_selected_card_index
+    ante_tags = views["ante_tags"]
+    for i, (tag, _) in enumerate(run._ante_tags):
+        ante_tags[i] = _ENUM_INDICES[tag]
+
+    hand = run._hand if run._hand is not None else ()
+    hand_views = views["hand"]
+    views["num_hand_cards"][...] = len(hand)
+    for i, card in enumerate(hand):
+        if i == MAX_HAND_SIZE:
+            break
+        _write_card(hand_views, i, card)
+
+    views["num_jokers"][...] = len(run._jokers)
+    joker_views = views["jokers"]
+    for i, joker in enumerate(run._jokers):
+        if i == MAX_JOKERS:
+            break
+        _write_joker(joker_views, i, joker, run)
+
+    views["num_consumables"][...] = len(run._consumables)
+    consumable_views = views["consumables"]
+    for i, consumable in enumerate(run._consumables):
+        if i == MAX_CONSUMABLES:
+            break
+        _write_consumable(consumable_views, i, consumable)
+
+    deck_cards_left = run.deck_cards_left
+    views["num_deck_cards"][...] = len(run._deck_cards)
+    views["num_deck_cards_left"][...] = len(deck_cards_left)
+    deck_counts = views["deck_counts"]
+    deck_enhancement_counts = views["deck_enhancement_counts"]
+    for card in deck_cards_left:
+        deck_counts[
+            _SUIT_INDICES[card.suit._name_], _RANK_INDICES[card.rank._name_]
+        ] += 1
+        if card.enhancement is not None:
+            deck_enhancement_counts[_ENHANCEMENT_INDICES[card.enhancement._name_]] += 1
+
+    vouchers = views["vouchers"]
+    for voucher in run._vouchers:
+        vouchers[_ENUM_INDICES[voucher]] = True
+
+    tags = views["tags"]
+    for tag in run._tags:
+        tags[_ENUM_INDICES[tag]] += 1
+
+    poker_hand_levels = views["poker_hand_levels"]
+    poker_hand_plays = views["poker_hand_plays"]
+    # poker hand info is kept in PokerHand order
+    for i, (level, num_played) in enumerate(run._poker_hand_info.values()):
+        poker_hand_levels[i] = level
+        poker_hand_plays[i] = num_played
+
+    if run._shop_cards is not None:
+        for i, (item, cost) in enumerate(run._shop_cards):
+            if i == MAX_SHOP_CARDS:
+                break
+            _write_item(views["shop_cards"], i, item, run)
+            views["shop_cards"]["cost"][i] = cost
+    if run._shop_vouchers is not None:
+        for i, (voucher, cost) in enumerate(run._shop_vouchers):
+            if i == MAX_SHOP_VOUCHERS:
+                break
+            views["shop_vouchers"]["item"][i] = _ENUM_INDICES[voucher]
+            views["shop_vouchers"]["cost"][i] = cost
+    if run._shop_packs is not None:
+        for i, (pack, cost) in enumerate(run._shop_packs):
+            if i == MAX_SHOP_PACKS:
+                break
+            views["shop_packs"]["item"][i] = _ENUM_INDICES[pack]
+            views["shop_packs"]["cost"][i] = cost
+
+    if run._opened_pack is not None:
+        views["opened_pack"][...] = _ENUM_INDICES[run._opened_pack]
+    if run._pack_choices_left is not None:
+        views["pack_choices_left"][...] = run._pack_choices_left
+    if run._pack_items is not None:
+        for i, item in enumerate(run._pack_items):
+            if i == MAX_PACK_ITEMS:
+                break
+            _write_item(views["pack_items"], i, item, run)
+
+    return out
+
+
+def _write_card(views: dict, i: int, card: Card) -> None:
+    views["rank"][i] = _RANK_INDICES[card.rank._name_]
+    views["suit"][i] = _SUIT_INDICES[card.suit._name_]
+    if card.enhancement is not None:
+        views["enhancement"][i] = _ENHANCEMENT_INDICES[card.enhancement._name_]
+    if card.seal is not None:
+        views["seal"][i] = _SEAL_INDICES[card.seal._name_]
+    views["edition"][i] = _EDITION_INDICES[card.edition._name_]
+    views["extra_chips"][i] = card.extra_chips
+    views["is_debuffed"][i] = card.is_debuffed
+    views["is_face_down"][i] = card.is_face_down
+
+
+def _write_joker(views: dict, i: int, joker: BalatroJoker, run: Run) -> None:
+    views["type"][i] = _JOKER_TYPE_INDICES[type(joker).__name__]
+    views["edition"][i] = _EDITION_INDICES[joker.edition._name_]
+    views["is_eternal"][i] = joker.is_eternal
+    views["is_perishable"][i] = joker.is_perishable
+    views["is_rental"][i] = joker.is_rental
+    views["is_debuffed"][i] = joker.is_debuffed
+    views["is_flipped"][i] = joker.is_flipped
+    views["perishable_rounds_left"][i] = joker.num_perishable_rounds_left
+    views["sell_value"][i] = run._calculate_sell_value(joker)
+    if isinstance(joker, MultScalingJoker):
+        views["mult"][i] = joker.mult
+    if isinstance(joker, ChipsScalingJoker):
+        views["chips"][i] = joker.chips
+    views["xmult"][i] = joker.xmult if isinstance(joker, XMultScalingJoker) else 1.0
+
+
+def _write_consumable(views: dict, i: int, consumable: Consumable) -> None:
+    views["kind"][i] = _CONSUMABLE_KINDS[type(consumable.card)]
+    views["card"][i] = _ENUM_INDICES[consumable.card]
+    views["is_negative"][i] = consumable.is_negative
+
+
+def _write_item(
+    views: dict, i: int, item: BalatroJoker | Consumable | Card, run: Run
+) -> None:
+    match item:
+        case BalatroJoker():
+            views["kind"][i] = 0
+            _write_joker(views["joker"], i, item, run)
+        case Consumable():
+            views["kind"][i] = 1
+            _write_consumable(views["consumable"], i, item)
+        case Card():
+            views["kind"][i] = 2
+            _write_card(views["card"], i, item)
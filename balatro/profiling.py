@@ -0,0 +1,278 @@
+from __future__ import annotations
+import argparse
+from collections.abc import Callable
+from dataclasses import dataclass
+import functools
+import threading
+import time
+from typing import Any
+
+from . import Run, env
+from .actions import ACTIONS
+from .classes import *
+from .enums import *
+from .seeds import random_seeds
+from .simulate import load_policy, play_run
+
+# the Run methods behind the flat actions
+ACTION_NAMES = sorted({method_name for method_name, _ in ACTIONS})
+
+_enabled_profiler: Profiler | None = None
+
+
+@dataclass(eq=False)
+class HookStats:
+    """
+    The calls and time in seconds of a joker hook or run action
+
+    Cumulative time includes the hooks and actions it called, self time doesn't.
+    """
+
+    calls: int = 0
+    cumulative_time: float = 0.0
+    self_time: float = 0.0
+
+
+class Profiler:
+    """
+    Counts the calls and time of every joker _on_* hook and run action while enabled
+
+    Enabling wraps the hooks of BalatroJoker and its subclasses and the Run actions in place,
+    and disabling puts the original functions back, so a disabled profiler costs nothing.
+    Stats are kept per (joker type, hook) and per (run type, action), and call stacks are
+    kept per thread. Only one profiler can be enabled at a time.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, str], HookStats] = {}
+        self._stacks: dict[tuple[str, ...], int] = {}
+        # (owner, name, original, wrapper)
+        self._originals: list[tuple[type, str, Callable, Callable]] = []
+        self._local: threading.local = threading.local()
+
+    def __enter__(self) -> Profiler:
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
+
+    def disable(self) -> None:
+        """
+        Puts the original hooks and actions back
+
+        Raises a RuntimeError if anything wrapped them again after this profiler was
+        enabled, such as Metrics, as putting them back would undo that too.
+        """
+
+        global _enabled_profiler
+        if _enabled_profiler is not self:
+            return
+
+        restore_wrapped(self._originals)
+        _enabled_profiler = None
+
+    def enable(self) -> None:
+        """
+        Wraps every joker hook and run action, keeping any stats already recorded
+        """
+
+        global _enabled_profiler
+        if _enabled_profiler is self:
+            return
+        if _enabled_profiler is not None:
+            raise RuntimeError("Another Profiler is already enabled")
+
+        for cls in _get_joker_types():
+            for name, func in list(vars(cls).items()):
+                if name.startswith("_on_") and callable(func):
+                    self._wrap(cls, name, func)
+        for name in ACTION_NAMES:
+            self._wrap(Run, name, vars(Run)[name])
+        # the environments call the actions through a table of functions
+        env._ACTION_METHODS[:] = [
+            getattr(Run, method_name) for method_name, _ in ACTIONS
+        ]
+
+        _enabled_profiler = self
+
+    def format_table(
+        self, sort_by: str = "cumulative", limit: int | None = None
+    ) -> str:
+        """
+        Formats the stats as a table, one row per joker hook or run action
+
+        Args:
+            sort_by (str): "cumulative", "self" or "calls", sorting rows in descending order
+            limit (int, optional): The number of rows to keep, or all of them
+        """
+
+        sort_keys = {
+            "cumulative": lambda stats: stats.cumulative_time,
+            "self": lambda stats: stats.self_time,
+            "calls": lambda stats: stats.calls,
+        }
+        if sort_by not in sort_keys:
+            raise ValueError(f"Expected one of {list(sort_keys)}, but got {sort_by!r}")
+
+        rows = sorted(
+            self._stats.items(),
+            key=lambda item: sort_keys[sort_by](item[1]),
+            reverse=True,
+        )[:limit]
+
+        lines = [
+            f"{'calls':>10}  {'cumulative ms':>13}  {'self ms':>10}  {'per call us':>11}  name"
+        ]
+        for (owner, hook), stats in rows:
+            lines.append(
+                f"{stats.calls:>10}  {stats.cumulative_time * 1e3:>13.3f}  "
+                f"{stats.self_time * 1e3:>10.3f}  "
+                f"{stats.cumulative_time / stats.calls * 1e6:>11.2f}  {owner}.{hook}"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Clears the recorded stats
+        """
+
+        self._stats.clear()
+        self._stacks.clear()
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Writes the self time of every call stack in microseconds, in the collapsed stack format
+        read by flamegraph.pl, speedscope and inferno
+
+        Args:
+            path (str): The path of the file
+        """
+
+        with open(path, "w") as file:
+            for stack, self_time in sorted(self._stacks.items()):
+                file.write(f"{';'.join(stack)} {round(self_time / 1e3)}\n")
+
+    @property
+    def stats(self) -> dict[tuple[str, str], HookStats]:
+        return self._stats
+
+    def _call(
+        self, key: tuple[str, str], func: Callable, obj: Any, args: tuple, kwargs: dict
+    ) -> Any:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        parent_path = stack[-1][0] if stack else ()
+        # [path, time spent in calls made by this one]
+        frame = [parent_path + (f"{key[0]}.{key[1]}",), 0]
+        stack.append(frame)
+        start = time.perf_counter_ns()
+        try:
+            return func(obj, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = HookStats()
+            stats.calls += 1
+            stats.self_time += (elapsed - frame[1]) / 1e9
+            # recursive calls are already counted by the outermost one
+            if frame[0].count(frame[0][-1]) == 1:
+                stats.cumulative_time += elapsed / 1e9
+
+            path = frame[0]
+            self._stacks[path] = self._stacks.get(path, 0) + elapsed - frame[1]
+
+    def _wrap(self, cls: type, name: str, func: Callable) -> None:
+        @functools.wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            return self._call((type(obj).__name__, name), func, obj, args, kwargs)
+
+        self._originals.append((cls, name, func, wrapper))
+        setattr(cls, name, wrapper)
+
+
+def restore_wrapped(originals: list[tuple[object, str, Callable, Callable]]) -> None:
+    """
+    Puts back the functions a Profiler or Metrics wrapped in place and clears the list
+
+    Raises a RuntimeError, putting nothing back, if any of them has been wrapped again
+    since, as the wrappers have to be removed in the reverse order they were added in.
+
+    Args:
+        originals (list[tuple[object, str, Callable, Callable]]): The owner, name, original and wrapper of each function, in the order they were wrapped
+    """
+
+    for owner, name, _, wrapper in originals:
+        if vars(owner).get(name) is not wrapper:
+            raise RuntimeError(
+                f"{owner.__name__}.{name} has been wrapped again since, disable "
+                "whatever wrapped it first"
+            )
+
+    for owner, name, func, _ in reversed(originals):
+        setattr(owner, name, func)
+    originals.clear()
+    # the environments call the actions through a table of functions
+    env._ACTION_METHODS[:] = [getattr(Run, method_name) for method_name, _ in ACTIONS]
+
+
+def _get_joker_types() -> list[type]:
+    joker_types, stack = [], [BalatroJoker]
+    while stack:
+        cls = stack.pop()
+        joker_types.append(cls)
+        stack.extend(cls.__subclasses__())
+    return list(dict.fromkeys(joker_types))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plays runs of a policy with profiling enabled, printing the time spent "
+        "in every joker hook and run action"
+    )
+    parser.add_argument(
+        "policy",
+        nargs="?",
+        default="balatro.simulate:random_policy",
+        help="the module:name import path of the policy",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=20)
+    parser.add_argument("-s", "--seed", default="0", help="the seed of the run seeds")
+    parser.add_argument("-d", "--deck", default=Deck.RED.name)
+    parser.add_argument("-k", "--stake", default=Stake.WHITE.name)
+    parser.add_argument("-m", "--max-steps", type=int, default=10000)
+    parser.add_argument(
+        "--sort", choices=["cumulative", "self", "calls"], default="cumulative"
+    )
+    parser.add_argument("--limit", type=int, default=30)
+    parser.add_argument(
+        "-o", "--output", default=None, help="a path to write collapsed stacks to"
+    )
+    args = parser.parse_args()
+
+    policy = load_policy(args.policy)
+    with Profiler() as profiler:
+        for seed in random_seeds(args.runs, seed=args.seed):
+            play_run(
+                policy,
+                Deck[args.deck],
+                Stake[args.stake],
+                None,
+                seed,
+                max_steps=args.max_steps,
+            )
+
+    print(profiler.format_table(args.sort, args.limit))
+    if args.output is not None:
+        profiler.write_collapsed(args.output)
+
+
+if __name__ == "__main__":
+    main()
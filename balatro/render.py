@@ -0,0 +1,730 @@
+from __future__ import annotations
+import io
+import math
+from functools import cache, lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from . import Run, format_number
+from .constants import *
+from .classes import *
+from .enums import *
+from .jokers import *
+from .sprites import _get_sprite_key, get_cached_sprite
+from .textures import get_sheet
+
+FRAME_WIDTH, FRAME_HEIGHT = 1084, 546
+SIDEBAR_WIDTH = 312
+TOP_HEIGHT = 187
+HEADER_SIZE = (SIDEBAR_WIDTH, 236)
+POKER_HANDS_SIZE = (147, FRAME_HEIGHT - 236)
+STATS_SIZE = (SIDEBAR_WIDTH - 147, FRAME_HEIGHT - 236)
+CARD_WIDTH = 98
+WEE_CARD_WIDTH = 69
+
+SHADOW_COLOR = "black"
+HALF_ALPHA = [alpha // 2 for alpha in range(256)]
+
+
+class FrameRenderer:
+    """
+    Renders frames of a run, only re-rendering the panels whose state changed since the
+    previous frame
+    """
+
+    def __init__(self) -> None:
+        self._panels: dict[str, tuple[tuple, Image.Image]] = {}
+
+    def render(self, run: Run, as_image: bool = True) -> Image.Image | bytes:
+        """
+        Renders the current state of a run into a single composited frame
+
+        Args:
+            run (Run): The run to render
+            as_image (bool): Whether to return a PIL image instead of PNG bytes
+        """
+
+        frame = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT))
+        for name, get_key, render_panel, xy in PANELS:
+            key = get_key(run)
+            cached = self._panels.get(name)
+            if cached is None or cached[0] != key:
+                cached = key, render_panel(run)
+                self._panels[name] = cached
+            frame.paste(cached[1], xy)
+
+        if as_image:
+            return frame
+        with io.BytesIO() as buffer:
+            frame.save(buffer, "png", compress_level=1)
+            return buffer.getvalue()
+
+
+def render_frame(run: Run, as_image: bool = True) -> Image.Image | bytes:
+    """
+    Renders the current state of a run into a single composited frame
+
+    Lays out the same frame as the HTML representation directly onto one canvas, reusing
+    cached sprites, so it is cheap enough for thumbnails and video export.
+
+    Args:
+        run (Run): The run to render
+        as_image (bool): Whether to return a PIL image instead of PNG bytes
+    """
+
+    return FrameRenderer().render(run, as_image=as_image)
+
+
+def render_frame_array(run: Run) -> np.ndarray:
+    """
+    Renders the current state of a run into a (height, width, 4) RGBA uint8 array
+
+    Args:
+        run (Run): The run to render
+    """
+
+    return np.asarray(render_frame(run))
+
+
+@cache
+def _get_font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype("resources/fonts/m6x11plus.ttf", size)
+
+
+@cache
+def _get_shop_sign() -> Image.Image:
+    return (
+        get_sheet("ShopSignAnimation")
+        .crop((0, 0, 226, 114))
+        .resize((280, 141), Image.Resampling.LANCZOS)
+    )
+
+
+def _get_background_color(run: Run) -> str:
+    if run._opened_pack is not None:
+        return PACK_BACKGROUND_COLORS[" ".join(run._opened_pack.value.split(" ")[-2:])]
+    if run._state is State.PLAYING_BLIND and run._is_boss_blind:
+        return BLIND_COLORS[run._blind]
+    return "#365a46"
+
+
+def _draw_box(
+    draw: ImageDraw.ImageDraw,
+    box: tuple[float, float, float, float],
+    color: str | tuple[int, ...],
+    radius: int = 12,
+) -> None:
+    draw.rounded_rectangle(box, radius, fill=color)
+
+
+def _draw_text(
+    canvas: Image.Image,
+    xy: tuple[float, float],
+    text: str,
+    size: int,
+    color: str = "white",
+    shadow: int = 0,
+    anchor: str = "mm",
+) -> None:
+    mask, left, top = _get_text_mask(text, size, anchor)
+    x, y = round(xy[0]) + left, round(xy[1]) + top
+    if shadow:
+        canvas.paste(SHADOW_COLOR, (x + shadow, y + shadow), mask.point(HALF_ALPHA))
+    canvas.paste(color, (x, y), mask)
+
+
+@lru_cache(maxsize=4096)
+def _get_text_mask(text: str, size: int, anchor: str) -> tuple[Image.Image, int, int]:
+    # rasterizing glyphs is the slowest part of a frame, most labels repeat every frame
+    font = _get_font(size)
+    left, top, right, bottom = ImageDraw.Draw(
+        Image.new("L", (1, 1))
+    ).multiline_textbbox((0, 0), text, font, anchor, spacing=0, align="center")
+    left, top, right, bottom = (
+        math.floor(left),
+        math.floor(top),
+        math.ceil(right),
+        math.ceil(bottom),
+    )
+    mask = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+    ImageDraw.Draw(mask).multiline_text(
+        (-left, -top), text, 255, font, anchor, spacing=0, align="center"
+    )
+    return mask, left, top
+
+
+def _paste_sprite(
+    canvas: Image.Image,
+    sprite: Image.Image,
+    xy: tuple[float, float],
+    shadow: tuple[int, int] | None = (0, 4),
+) -> None:
+    x, y = round(xy[0]), round(xy[1])
+    if shadow is not None:
+        dx, dy = shadow
+        canvas.paste(
+            SHADOW_COLOR, (x + dx, y + dy), sprite.getchannel("A").point(HALF_ALPHA)
+        )
+    canvas.paste(sprite, (x, y), sprite)
+
+
+def _paste_row(
+    canvas: Image.Image,
+    sprites: list[Image.Image],
+    box: tuple[float, float, float, float],
+    max_unstacked: int,
+    offsets: list[float] | None = None,
+) -> list[float]:
+    # lays sprites out evenly across a box, overlapping them once there are too many
+    x1, y1, x2, y2 = box
+    if not sprites:
+        return []
+
+    total_width = sum(sprite.width for sprite in sprites)
+    if len(sprites) > max_unstacked:
+        gap = ((x2 - x1) - total_width) / (len(sprites) - 1)
+        x = x1
+    else:
+        gap = ((x2 - x1) - total_width) / (len(sprites) + 1)
+        x = x1 + gap
+
+    xs = []
+    for i, sprite in enumerate(sprites):
+        y = (y1 + y2 - sprite.height) / 2 + (offsets[i] if offsets is not None else 0)
+        _paste_sprite(canvas, sprite, (x, y))
+        xs.append(x)
+        x += sprite.width + gap
+    return xs
+
+
+def _get_item_sprite(
+    item: BalatroJoker | Consumable | Card, card_back: Deck = Deck.RED
+) -> Image.Image:
+    return get_cached_sprite(
+        item,
+        card_back=card_back,
+        width=WEE_CARD_WIDTH if isinstance(item, WeeJoker) else CARD_WIDTH,
+    )
+
+
+def _render_blind_goal(
+    canvas: Image.Image,
+    draw: ImageDraw.ImageDraw,
+    run: Run,
+    box: tuple[float, float, float, float],
+    round_goal: str,
+    reward: str,
+    goal_size: int,
+) -> None:
+    x1, y1, x2, y2 = box
+    _draw_box(draw, box, "#172022")
+
+    font = _get_font(goal_size)
+    text_width = draw.textlength(round_goal, font)
+    stake_sprite = get_cached_sprite(run._stake, width=32)
+    x = (x1 + x2 - text_width - stake_sprite.width - 5) / 2
+    y = y1 + (y2 - y1) * (0.38 if reward else 0.5)
+    _paste_sprite(canvas, stake_sprite, (x, y - stake_sprite.height / 2), None)
+    _draw_text(
+        canvas,
+        (x + stake_sprite.width + 5, y),
+        round_goal,
+        goal_size,
+        "#e35646",
+        anchor="lm",
+    )
+
+    if reward:
+        _draw_text(
+            canvas, ((x1 + x2) / 2, y1 + (y2 - y1) * 0.78), reward, 17, "#d7af54"
+        )
+
+
+def _render_header(run: Run) -> Image.Image:
+    header = Image.new("RGB", HEADER_SIZE, "#333b3d")
+    draw = ImageDraw.Draw(header, "RGBA")
+
+    if run._state is State.PLAYING_BLIND:
+        blind_color = BLIND_COLORS[run._blind]
+        _draw_box(draw, (6, 6, 306, 58), blind_color)
+        _draw_text(header, (156, 32), run._blind.value, 38, shadow=3)
+
+        _draw_box(draw, (6, 64, 306, 166), blind_color + "55")
+        blind_sprite = get_cached_sprite(run._blind)
+        _paste_sprite(header, blind_sprite, (28, 115 - blind_sprite.height / 2), (6, 6))
+
+        blind_reward = run.blind_reward
+        round_goal = format_number(run._round_goal)
+        _render_blind_goal(
+            header,
+            draw,
+            run,
+            (112, 80, 296, 150),
+            round_goal,
+            "No Reward" if blind_reward == 0 else f"Reward: {'$' * blind_reward}",
+            max(20, round(43 - max(0, len(round_goal) - 3) * 2.1)),
+        )
+    elif run._shop_cards is not None:
+        _paste_sprite(header, _get_shop_sign(), (15, 22), None)
+    elif run._state in (State.SELECTING_BLIND, State.OPENING_PACK):
+        _draw_text(header, (156, 60), "Choose your\nnext Blind", 31, shadow=2)
+        if Voucher.DIRECTORS_CUT in run._vouchers:
+            can_reroll = run._available_money >= 10 and (
+                Voucher.RETCON in run._vouchers or not run._rerolled_boss_blind
+            )
+            _draw_box(draw, (84, 100, 234, 150), "#e35646" if can_reroll else "#4f4f4f")
+            _draw_text(header, (159, 125), "Reroll Boss\n$10", 19, shadow=1)
+
+    _draw_box(draw, (6, 172, 306, 232), "#172022")
+    _draw_text(header, (50, 202), "Round\nscore", 24)
+    _draw_box(draw, (100, 180, 298, 225), "#3a4b50")
+    round_score = format_number(run.round_score)
+    score_size = 43 - (0 if run.round_score < 1_000_000 else (len(round_score) - 6) * 2)
+    font = _get_font(score_size)
+    stake_sprite = get_cached_sprite(run._stake, width=32)
+    x = (100 + 298 - draw.textlength(round_score, font) - stake_sprite.width - 8) / 2
+    _paste_sprite(header, stake_sprite, (x, 202 - stake_sprite.height / 2), None)
+    _draw_text(
+        header, (x + stake_sprite.width + 8, 202), round_score, score_size, anchor="lm"
+    )
+
+    return header
+
+
+def _render_poker_hands(run: Run) -> Image.Image:
+    poker_hands = Image.new("RGB", POKER_HANDS_SIZE, "#333b3d")
+    draw = ImageDraw.Draw(poker_hands, "RGBA")
+
+    unlocked_poker_hands = run._unlocked_poker_hands
+    for i, poker_hand in enumerate(PokerHand):
+        level, times_played = run._poker_hand_info[poker_hand]
+        x, y = 6, 4 + i * 25
+        background = poker_hands.crop((x, y, x + 141, y + 22))
+        _draw_box(draw, (x, y + 2, x + 140, y + 21), "DimGray", 6)
+        _draw_box(draw, (x, y, x + 140, y + 19), "DarkGray", 6)
+        _draw_box(
+            draw,
+            (x + 1, y + 1, x + 34, y + 18),
+            POKER_HAND_LEVEL_COLORS[min(7, level)],
+            6,
+        )
+        _draw_text(poker_hands, (x + 18, y + 10), f"lvl.{level}", 13, "#172022")
+        _draw_text(
+            poker_hands,
+            (x + 87, y + 10),
+            POKER_HAND_SHORTHAND.get(poker_hand, poker_hand.value),
+            14,
+            shadow=1,
+        )
+        _draw_box(draw, (x + 119, y + 1, x + 139, y + 18), "#333b3d", 6)
+        _draw_text(poker_hands, (x + 129, y + 10), str(times_played), 13, "orange")
+        if poker_hand not in unlocked_poker_hands:
+            row = poker_hands.crop((x, y, x + 141, y + 22))
+            poker_hands.paste(Image.blend(background, row, 1 / 3), (x, y))
+
+    return poker_hands
+
+
+def _render_stats(run: Run) -> Image.Image:
+    stats = Image.new("RGB", STATS_SIZE, "#333b3d")
+    draw = ImageDraw.Draw(stats, "RGBA")
+
+    for i, (label, value, color) in enumerate(
+        [("Hands", run.hands, "#3e8cf1"), ("Discards", run.discards, "#e35646")]
+    ):
+        x1 = 6 + i * 80
+        _draw_box(draw, (x1, 4, x1 + 73, 64), "#172022")
+        _draw_text(stats, (x1 + 36, 16), label, 19)
+        _draw_box(draw, (x1 + 7, 26, x1 + 66, 60), "#3a4b50")
+        _draw_text(stats, (x1 + 36, 43), str(value), 40, color, 2)
+
+    _draw_box(draw, (6, 71, 159, 131), "#172022")
+    _draw_box(draw, (18, 76, 147, 126), "#3a4b50")
+    _draw_text(stats, (82, 101), f"${run._money}", 48, "#d7af54", 3)
+
+    _draw_box(draw, (6, 138, 79, 198), "#172022")
+    _draw_text(stats, (42, 150), "Ante", 19)
+    _draw_box(draw, (13, 160, 72, 194), "#3a4b50")
+    _draw_text(stats, (38, 177), str(run.ante), 40, "orange", 2, "rm")
+    _draw_text(stats, (41, 184), "/8", 19, anchor="lm")
+    _draw_box(draw, (86, 138, 159, 198), "#172022")
+    _draw_text(stats, (122, 150), "Round", 19)
+    _draw_box(draw, (93, 160, 152, 194), "#3a4b50")
+    _draw_text(stats, (122, 177), str(run._round), 40, "orange", 2)
+
+    _draw_box(draw, (0, 202, 161, 304), "#1d2829")
+    vouchers = list(Voucher)
+    voucher_slots = [
+        (voucher1, voucher2)
+        for voucher1, voucher2 in zip(vouchers[:16], vouchers[16:])
+        if voucher2 in run._vouchers
+    ] + [
+        (voucher1, None)
+        for voucher1, voucher2 in zip(vouchers[:16], vouchers[16:])
+        if voucher1 in run._vouchers and voucher2 not in run._vouchers
+    ]
+    for i, (voucher1, voucher2) in enumerate(voucher_slots[:8]):
+        x, y = 3 + (i % 4) * 40, 206 + (i // 4) * 50
+        _paste_sprite(stats, get_cached_sprite(voucher1, width=34), (x, y), (2, 2))
+        if voucher2 is not None:
+            _paste_sprite(
+                stats, get_cached_sprite(voucher2, width=34), (x + 4, y + 3), (2, 2)
+            )
+
+    return stats
+
+
+def _render_top(run: Run) -> Image.Image:
+    top = Image.new(
+        "RGB", (FRAME_WIDTH - SIDEBAR_WIDTH, TOP_HEIGHT), _get_background_color(run)
+    )
+    draw = ImageDraw.Draw(top, "RGBA")
+
+    _draw_box(draw, (24, 30, 516, 162), (0, 0, 0, 25))
+    _paste_row(
+        top,
+        [_get_item_sprite(joker, run._deck) for joker in run._jokers],
+        (24, 30, 516, 162),
+        5,
+    )
+    _draw_text(top, (36, 172), f"{len(run._jokers)}/{run.joker_slots}", 14, anchor="lm")
+
+    _draw_box(draw, (528, 30, 725, 162), (0, 0, 0, 25))
+    _paste_row(
+        top,
+        [_get_item_sprite(consumable) for consumable in run._consumables],
+        (528, 30, 725, 162),
+        2,
+    )
+    _draw_text(
+        top,
+        (713, 172),
+        f"{len(run._consumables)}/{run.consumable_slots}",
+        14,
+        anchor="rm",
+    )
+
+    return top
+
+
+def _render_main(run: Run) -> Image.Image:
+    main = Image.new(
+        "RGB",
+        (FRAME_WIDTH - SIDEBAR_WIDTH, FRAME_HEIGHT - TOP_HEIGHT),
+        _get_background_color(run),
+    )
+    draw = ImageDraw.Draw(main, "RGBA")
+
+    match run._state:
+        case State.SELECTING_BLIND:
+            _render_selecting_blind(main, draw, run)
+        case State.PLAYING_BLIND:
+            _render_playing_blind(main, draw, run)
+        case State.CASHING_OUT:
+            _render_cashing_out(main, draw, run)
+        case State.IN_SHOP:
+            _render_in_shop(main, draw, run)
+        case State.OPENING_PACK:
+            _render_opening_pack(main, draw, run)
+        case State.GAME_OVER:
+            _render_game_over(main, draw, run)
+
+    deck_sprite = get_cached_sprite(run._deck, width=CARD_WIDTH)
+    for offset in (6, 4, 1):
+        main.paste("Gray", (626 - offset, 185 + offset), deck_sprite.getchannel("A"))
+    _paste_sprite(main, deck_sprite, (626, 185), (-14, 2))
+    _draw_text(
+        main,
+        (710, 325),
+        f"{len(run.deck_cards_left)}/{len(run._deck_cards)}",
+        14,
+        anchor="rm",
+    )
+
+    for i, tag in enumerate(reversed(run._tags)):
+        y = main.height - 35 - (i + 1) * 42
+        if y < 0:
+            break
+        _paste_sprite(main, get_cached_sprite(tag, width=37), (734, y), (-3, 3))
+
+    return main
+
+
+def _render_selecting_blind(
+    main: Image.Image, draw: ImageDraw.ImageDraw, run: Run
+) -> None:
+    blinds = [
+        (Blind.SMALL_BLIND, run._blind is Blind.SMALL_BLIND),
+        (Blind.BIG_BLIND, run._blind is Blind.BIG_BLIND),
+        (run._boss_blind, run._is_boss_blind),
+    ]
+
+    for i, (blind, is_current) in enumerate(blinds):
+        x, y = 36 + i * 190, main.height - (352 if is_current else 312)
+        background = main.crop((x, y, x + 164, main.height))
+        column = background.copy()
+        column_draw = ImageDraw.Draw(column, "RGBA")
+        blind_color = BLIND_COLORS[blind]
+        column_draw.rounded_rectangle(
+            (0, 0, 163, column.height + 12), 10, "#333b3d", blind_color, 2
+        )
+
+        _draw_box(
+            column_draw, (21, 10, 143, 40), "#dc8c32" if is_current else "#4f4f4f", 10
+        )
+        _draw_text(column, (82, 25), "Select", 19, shadow=1)
+        _draw_box(column_draw, (16, 46, 148, 71), blind_color, 10)
+        _draw_text(column, (82, 58), blind.value, 19, shadow=1)
+
+        blind_sprite = get_cached_sprite(blind)
+        _paste_sprite(column, blind_sprite, (82 - blind_sprite.width / 2, 81), (0, 2))
+
+        round_goal = format_number(run._get_round_goal(blind))
+        blind_reward = run._get_blind_reward(blind)
+        _render_blind_goal(
+            column,
+            column_draw,
+            run,
+            (16, 154, 148, 216),
+            round_goal,
+            f"Reward: {'$' * blind_reward}+" if blind_reward else "",
+            max(16, round(36 - max(0, len(round_goal) - 3) * 2)),
+        )
+
+        # only the blinds that can still be skipped show their tag
+        if (i == 0 and is_current) or (i == 1 and not run._is_boss_blind):
+            _draw_box(column_draw, (16, 228, 148, 293), "#172022")
+            tag_sprite = get_cached_sprite(run._ante_tags[i][0], width=37)
+            _paste_sprite(column, tag_sprite, (22, 242), (-3, 3))
+            _draw_box(
+                column_draw, (62, 237, 142, 285), "#e35646" if is_current else "#4f4f4f"
+            )
+            _draw_text(column, (102, 261), "Skip Blind", 16, shadow=1)
+
+        if not is_current:
+            column = Image.blend(background, column, 0.75)
+        main.paste(column, (x, y))
+
+
+def _render_playing_blind(
+    main: Image.Image, draw: ImageDraw.ImageDraw, run: Run
+) -> None:
+    _draw_box(draw, (23, 177, 597, 309), (0, 0, 0, 25))
+    hand_size = len(run._hand)
+    _paste_row(
+        main,
+        [_get_item_sprite(card, run._deck) for card in run._hand],
+        (23, 177, 597, 309),
+        5,
+        [
+            abs((hand_size - 1) / 2 - i) * 2
+            - 8
+            - (30 if run._forced_selected_card_index == i else 0)
+            for i in range(hand_size)
+        ],
+    )
+    _draw_text(main, (310, 322), f"{hand_size}/{run.hand_size}", 14)
+
+
+def _render_cashing_out(main: Image.Image, draw: ImageDraw.ImageDraw, run: Run) -> None:
+    _draw_box(draw, (30, 10, 590, 350), "#1d2829")
+    _draw_box(draw, (60, 30, 560, 90), "#dc8c32")
+    _draw_text(main, (310, 60), f"Cash Out: ${run.cash_out_total}", 38, shadow=2)
+
+
+def _render_in_shop(main: Image.Image, draw: ImageDraw.ImageDraw, run: Run) -> None:
+    draw.rounded_rectangle((30, 2, 594, 362), 12, "#1d2829", "#e35646", 1)
+
+    _draw_box(draw, (36, 8, 166, 88), "#e35646")
+    _draw_text(main, (101, 48), "Next\nRound", 19, shadow=1)
+    reroll_cost = run.reroll_cost
+    can_reroll = run._available_money >= reroll_cost
+    reroll_color = "white" if can_reroll else "#646464"
+    _draw_box(draw, (36, 92, 166, 172), "#5cb284" if can_reroll else "#4f4f4f")
+    _draw_text(main, (101, 112), "Reroll", 19, reroll_color, 1)
+    _draw_text(main, (101, 142), f"${reroll_cost}", 33, reroll_color, 1)
+
+    _draw_box(draw, (172, 8, 588, 172), "#3a4b50")
+    _render_shop_items(main, draw, run._shop_cards, (172, 8, 588, 172))
+
+    draw.rounded_rectangle((42, 180, 306, 344), 12, None, "#3a4b50", 6)
+    label_font = _get_font(18)
+    label = f"ANTE {run.ante} VOUCHER"
+    label_image = Image.new("RGBA", (round(draw.textlength(label, label_font)), 20))
+    ImageDraw.Draw(label_image).text((0, 10), label, "#3a4b50", label_font, "lm")
+    label_image = label_image.rotate(90, expand=True)
+    main.paste(label_image, (31, round(262 - label_image.height / 2)), label_image)
+    _render_shop_items(main, draw, run._shop_vouchers, (42, 180, 306, 344))
+
+    _draw_box(draw, (318, 180, 588, 344), "#3a4b50")
+    _render_shop_items(main, draw, run._shop_packs, (318, 180, 588, 344), 130)
+
+
+def _render_shop_items(
+    main: Image.Image,
+    draw: ImageDraw.ImageDraw,
+    items: list[tuple[BalatroJoker | Consumable | Card | Voucher | Pack, int]],
+    box: tuple[float, float, float, float],
+    height: int | None = None,
+) -> None:
+    x1, y1, x2, y2 = box
+    sprites = []
+    for item, _ in items:
+        if height is None:
+            sprites.append(_get_item_sprite(item))
+        else:
+            sprite = get_cached_sprite(item)
+            sprites.append(
+                get_cached_sprite(
+                    item, width=round(sprite.width * height / sprite.height)
+                )
+            )
+
+    xs = _paste_row(main, sprites, (x1, y1 + 10, x2, y2 + 10), len(sprites))
+    for x, sprite, (_, cost) in zip(xs, sprites, items):
+        tag_x = x + sprite.width / 2
+        tag_y = (y1 + y2 + 10 - sprite.height) / 2
+        draw.rounded_rectangle(
+            (tag_x - 20, tag_y - 22, tag_x + 20, tag_y), 6, "#333b3d", "#172022", 2
+        )
+        _draw_text(main, (tag_x, tag_y - 11), f"${cost}", 19, "#d7af54")
+
+
+def _render_opening_pack(
+    main: Image.Image, draw: ImageDraw.ImageDraw, run: Run
+) -> None:
+    _paste_row(
+        main,
+        [_get_item_sprite(item, run._deck) for item in run._pack_items],
+        (23, 145, 597, 277),
+        len(run._pack_items),
+    )
+
+    if run._hand is not None:
+        hand_size = len(run._hand)
+        _paste_row(
+            main,
+            [_get_item_sprite(card, run._deck) for card in run._hand],
+            (23, 5, 597, 137),
+            5,
+            [abs((hand_size - 1) / 2 - i) * 3 for i in range(hand_size)],
+        )
+
+    draw.rounded_rectangle((226, 289, 396, 370), 10, "#333b3d", "white", 1)
+    _draw_text(main, (311, 310), " ".join(run._opened_pack.value.split(" ")[-2:]), 26)
+    _draw_text(main, (311, 336), f"Choose {run._pack_choices_left}", 20)
+    _draw_box(draw, (412, 294, 483, 342), "#3f5357", 10)
+    _draw_text(main, (447, 310), "Skip", 20)
+
+
+def _render_game_over(main: Image.Image, draw: ImageDraw.ImageDraw, run: Run) -> None:
+    _draw_box(draw, (30, 10, 590, 350), "#1d2829")
+    _draw_text(main, (310, 120), "Game Over", 60, "#e35646", 3)
+    _draw_text(main, (310, 200), f"Ante {run.ante}  Round {run._round}", 30)
+
+
+def _get_header_key(run: Run) -> tuple:
+    return (
+        run._state,
+        run._blind,
+        run._stake,
+        run._shop_cards is not None,
+        run._round_goal if run._state is State.PLAYING_BLIND else None,
+        run.blind_reward,
+        Voucher.DIRECTORS_CUT in run._vouchers,
+        Voucher.RETCON in run._vouchers,
+        run._available_money,
+        run._rerolled_boss_blind,
+        run.round_score,
+    )
+
+
+def _get_poker_hands_key(run: Run) -> tuple:
+    return tuple(tuple(info) for info in run._poker_hand_info.values())
+
+
+def _get_stats_key(run: Run) -> tuple:
+    return (
+        run.hands,
+        run.discards,
+        run._money,
+        run.ante,
+        run._round,
+        frozenset(run._vouchers),
+    )
+
+
+def _get_top_key(run: Run) -> tuple:
+    return (
+        _get_background_color(run),
+        tuple(_get_sprite_key(joker, run._deck) for joker in run._jokers),
+        run.joker_slots,
+        tuple(_get_sprite_key(consumable) for consumable in run._consumables),
+        run.consumable_slots,
+    )
+
+
+def _get_main_key(run: Run) -> tuple:
+    key = (
+        run._state,
+        _get_background_color(run),
+        run._deck,
+        len(run.deck_cards_left),
+        len(run._deck_cards),
+        tuple(run._tags),
+    )
+
+    match run._state:
+        case State.SELECTING_BLIND:
+            key += (
+                run._stake,
+                run._blind,
+                run._boss_blind,
+                tuple(
+                    (run._get_round_goal(blind), run._get_blind_reward(blind))
+                    for blind in (Blind.SMALL_BLIND, Blind.BIG_BLIND, run._boss_blind)
+                ),
+                tuple(tags[0] for tags in run._ante_tags),
+            )
+        case State.PLAYING_BLIND:
+            key += (
+                tuple(_get_sprite_key(card, run._deck) for card in run._hand),
+                run._forced_selected_card_index,
+                run.hand_size,
+            )
+        case State.CASHING_OUT:
+            key += (run.cash_out_total,)
+        case State.IN_SHOP:
+            key += (
+                tuple((_get_sprite_key(item), cost) for item, cost in run._shop_cards),
+                tuple(run._shop_vouchers),
+                tuple(run._shop_packs),
+                run.reroll_cost,
+                run._available_money,
+                run.ante,
+            )
+        case State.OPENING_PACK:
+            key += (
+                tuple(_get_sprite_key(item, run._deck) for item in run._pack_items),
+                (
+                    tuple(_get_sprite_key(card, run._deck) for card in run._hand)
+                    if run._hand is not None
+                    else None
+                ),
+                run._opened_pack,
+                run._pack_choices_left,
+            )
+        case State.GAME_OVER:
+            key += (run.ante, run._round)
+
+    return key
+
+
+PANELS = [
+    ("header", _get_header_key, _render_header, (0, 0)),
+    ("poker_hands", _get_poker_hands_key, _render_poker_hands, (0, HEADER_SIZE[1])),
+    ("stats", _get_stats_key, _render_stats, (POKER_HANDS_SIZE[0], HEADER_SIZE[1])),
+    ("top", _get_top_key, _render_top, (SIDEBAR_WIDTH, 0)),
+    ("main", _get_main_key, _render_main, (SIDEBAR_WIDTH, TOP_HEIGHT)),
+]
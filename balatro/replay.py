@@ -0,0 +1,204 @@
+from __future__ import annotations
+from collections.abc import Iterable
+import copy
+from enum import Enum
+import hashlib
+import json
+import random
+from typing import Any
+
+from . import Run
+from .enums import *
+
+# back-references to the run, and state that doesn't affect play
+_IGNORED_ATTRIBUTES = {"_run", "_trace", "_unchecked"}
+
+
+class Replay:
+    """
+    Seeks to any step of a run from its seed and action log, keeping snapshots of the run every
+    snapshot_interval actions so seeking only replays the actions after the nearest one
+
+    Snapshots are taken as steps are first reached, so seeking backwards is as fast as seeking
+    to a step already passed. Runs returned by seek are copies the replay doesn't keep.
+    """
+
+    def __init__(
+        self,
+        seed: str,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        challenge: Challenge | None = None,
+        actions: Iterable[tuple[str, Iterable[Any]]] = (),
+        snapshot_interval: int = 64,
+    ) -> None:
+        """
+        Args:
+            seed (str): The seed of the run
+            deck (Deck): The deck of the run, ignored for challenges
+            stake (Stake): The stake of the run, ignored for challenges
+            challenge (Challenge, optional): The challenge of the run, or none
+            actions (Iterable[tuple[str, Iterable]]): The (method name, arguments) of each action, such as Run.action_log
+            snapshot_interval (int): The number of actions between snapshots
+        """
+
+        self.seed: str = seed
+        self.deck: Deck = deck
+        self.stake: Stake = stake
+        self.challenge: Challenge | None = challenge
+        self.actions: list[tuple[str, tuple]] = [
+            (method_name, tuple(args)) for method_name, args in actions
+        ]
+        self.snapshot_interval: int = snapshot_interval
+
+        self._snapshots: dict[int, Run] = {0: Run.replay(seed, deck, stake, challenge)}
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    @classmethod
+    def from_run(cls, run: Run, snapshot_interval: int = 64) -> Replay:
+        """
+        Creates a replay of a run's action log
+
+        Args:
+            run (Run): The run
+            snapshot_interval (int): The number of actions between snapshots
+        """
+
+        return cls(
+            run.seed,
+            run.deck,
+            run.stake,
+            run.challenge,
+            run.action_log,
+            snapshot_interval=snapshot_interval,
+        )
+
+    @classmethod
+    def load(cls, path: str, snapshot_interval: int = 64) -> Replay:
+        """
+        Loads a replay saved with save, or any JSON file with the deck, stake, seed and actions of a run
+
+        Args:
+            path (str): The path of the JSON file
+            snapshot_interval (int): The number of actions between snapshots
+        """
+
+        with open(path) as file:
+            replay = json.load(file)
+
+        challenge = replay.get("challenge")
+        return cls(
+            replay["seed"],
+            Deck[replay.get("deck", Deck.RED.name)],
+            Stake[replay.get("stake", Stake.WHITE.name)],
+            None if challenge is None else Challenge[challenge],
+            replay["actions"],
+            snapshot_interval=snapshot_interval,
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Saves the replay as JSON, readable by load and python -m balatro.export
+
+        Args:
+            path (str): The path of the JSON file
+        """
+
+        with open(path, "w") as file:
+            json.dump(
+                {
+                    "deck": self.deck.name,
+                    "stake": self.stake.name,
+                    "challenge": (
+                        None if self.challenge is None else self.challenge.name
+                    ),
+                    "seed": self.seed,
+                    "actions": [list(action) for action in self.actions],
+                },
+                file,
+            )
+
+    def seek(self, step: int) -> Run:
+        """
+        Gets the run after its first step actions
+
+        Args:
+            step (int): The number of actions taken, from 0 to len(replay)
+        """
+
+        if step not in range(len(self.actions) + 1):
+            raise ValueError(
+                f"Step should be in range({len(self.actions) + 1}), but got {step}"
+            )
+
+        start = max(i for i in self._snapshots if i <= step)
+        run = copy.deepcopy(self._snapshots[start])
+        # logged actions all succeeded, so they're replayed unchecked
+        unchecked, run._unchecked = run._unchecked, True
+        for i in range(start, step):
+            method_name, args = self.actions[i]
+            getattr(run, method_name)(*args)
+            if (i + 1) % self.snapshot_interval == 0 and i + 1 not in self._snapshots:
+                snapshot = copy.deepcopy(run)
+                snapshot._unchecked = unchecked
+                self._snapshots[i + 1] = snapshot
+
+        run._unchecked = unchecked
+        return run
+
+    def verify(self, run: Run) -> bool:
+        """
+        Checks that replaying every action reconstructs a run exactly, including its random
+        streams
+
+        Args:
+            run (Run): The run, usually the one the actions were logged from
+        """
+
+        return get_state_digest(self.seek(len(self.actions))) == get_state_digest(run)
+
+
+def get_state_digest(run: Run) -> str:
+    """
+    Hashes everything about a run that decides how it plays on, including its random streams,
+    so two runs with the same digest are in the same state
+
+    Args:
+        run (Run): The run
+    """
+
+    return hashlib.blake2b(repr(_encode(run, {})).encode()).hexdigest()
+
+
+def _encode(value: Any, memo: dict[int, int]) -> Any:
+    # a canonical form of the object graph, shared objects being encoded once
+    match value:
+        case None | bool() | int() | float() | str():
+            return value
+        case Enum():
+            return type(value).__name__, value.name
+        case type():
+            return value.__name__
+        case random.Random():
+            return value.getstate()
+        case list() | tuple():
+            return type(value).__name__, [_encode(item, memo) for item in value]
+        case dict():
+            return "dict", [
+                (_encode(key, memo), _encode(item, memo)) for key, item in value.items()
+            ]
+        case set() | frozenset():
+            # sets of cards are ordered by id, so their members are compared by value
+            return "set", sorted(repr(_encode(item, {})) for item in value)
+
+    if id(value) in memo:
+        return "ref", memo[id(value)]
+    memo[id(value)] = len(memo)
+
+    return type(value).__name__, [
+        (name, _encode(attribute, memo))
+        for name, attribute in vars(value).items()
+        if name not in _IGNORED_ATTRIBUTES
+    ]
@@ -0,0 +1,327 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+import random
+
+import numpy as np
+
+from . import Run
+from .actions import ACTIONS, NUM_ACTIONS
+from .enums import *
+from .env import _ACTION_METHODS, BatchRun
+from .observation import OBSERVATION_DTYPE
+from .simulate import WINNING_ANTE
+
+# the arrays shared between the pool and its workers, each row belonging to one run
+_BUFFERS = [
+    ("observations", OBSERVATION_DTYPE, ()),
+    ("final_observations", OBSERVATION_DTYPE, ()),
+    ("action_masks", np.dtype(np.bool_), (NUM_ACTIONS,)),
+    ("rewards", np.dtype(np.float32), ()),
+    ("terminated", np.dtype(np.bool_), ()),
+    ("truncated", np.dtype(np.bool_), ()),
+    ("actions", np.dtype(np.int64), ()),
+]
+_ALIGNMENT = 64
+
+
+def _get_layout(num_runs: int) -> tuple[dict[str, tuple[np.dtype, tuple, int]], int]:
+    layout, size = {}, 0
+    for name, dtype, shape in _BUFFERS:
+        size = -(-size // _ALIGNMENT) * _ALIGNMENT
+        layout[name] = (dtype, (num_runs,) + shape, size)
+        size += dtype.itemsize * num_runs * int(np.prod(shape, dtype=int))
+    return layout, size
+
+
+def _get_buffers(buffer: memoryview, num_runs: int) -> dict[str, np.ndarray]:
+    layout, _ = _get_layout(num_runs)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        for name, (dtype, shape, offset) in layout.items()
+    }
+
+
+class RolloutPool:
+    """
+    Steps runs spread over worker processes, each stepping a BatchRun over its slice of shared memory
+
+    Observations, action masks, rewards, terminations, truncations and actions live in one
+    shared memory block, so only short commands go through the pipes to the workers and
+    waiting on every reply doubles as a barrier. Worker w seeds its runs from "{seed}-{w}",
+    so a pool seed gives the same runs regardless of scheduling. Like BatchRun, the
+    returned arrays are overwritten every step and runs that end are reset in place.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        runs_per_worker: int = 1,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        seed: str | None = None,
+        max_steps: int | None = None,
+        illegal_action_reward: float = 0.0,
+        context: BaseContext | None = None,
+    ) -> None:
+        """
+        Args:
+            num_workers (int): The number of worker processes
+            runs_per_worker (int): The number of runs each worker steps
+            deck (Deck): The deck of every run
+            stake (Stake): The stake of every run
+            seed (str, optional): The seed every run's seed is derived from, or none for random runs
+            max_steps (int, optional): The number of steps after which a run is truncated, or none
+            illegal_action_reward (float): The reward for an action outside the action mask
+            context (BaseContext, optional): The multiprocessing context to start workers with, or the default one
+        """
+
+        if context is None:
+            context = mp.get_context()
+
+        self.num_workers: int = num_workers
+        self.runs_per_worker: int = runs_per_worker
+        self.num_runs: int = num_workers * runs_per_worker
+        self.seed: str | None = seed
+
+        _, size = _get_layout(self.num_runs)
+        self._shared_memory: SharedMemory = SharedMemory(create=True, size=size)
+        self._buffers: dict[str, np.ndarray] = _get_buffers(
+            self._shared_memory.buf, self.num_runs
+        )
+
+        self._connections: list[Connection] = []
+        self._workers: list[mp.process.BaseProcess] = []
+        for worker_index in range(num_workers):
+            connection, worker_connection = context.Pipe()
+            worker = context.Process(
+                target=_run_worker,
+                args=(
+                    worker_connection,
+                    self._shared_memory.name,
+                    self.num_runs,
+                    worker_index * runs_per_worker,
+                    (worker_index + 1) * runs_per_worker,
+                    deck,
+                    stake,
+                    max_steps,
+                    illegal_action_reward,
+                ),
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def __enter__(self) -> RolloutPool:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def observations(self) -> np.ndarray:
+        """The (N,) observations of every run"""
+
+        return self._buffers["observations"]
+
+    @property
+    def final_observations(self) -> np.ndarray:
+        """The last observations of the runs that ended on the last step"""
+
+        return self._buffers["final_observations"]
+
+    @property
+    def action_masks(self) -> np.ndarray:
+        """The (N, NUM_ACTIONS) action masks of every run"""
+
+        return self._buffers["action_masks"]
+
+    def reset(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Starts a new run in every slot, returning the observations and action masks
+        """
+
+        self._send_to_workers(
+            [
+                ("reset", None if self.seed is None else f"{self.seed}-{worker_index}")
+                for worker_index in range(self.num_workers)
+            ]
+        )
+
+        return self._buffers["observations"], self._buffers["action_masks"]
+
+    def step(
+        self, actions: np.ndarray | list[int]
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Takes one action in every run, returning the observations, rewards, whether each run
+        terminated, whether each run was truncated and the action masks
+
+        Args:
+            actions (np.ndarray | list[int]): The (N,) flat actions, in range(NUM_ACTIONS)
+        """
+
+        self._buffers["actions"][:] = actions
+        self._send_to_workers([("step", None)] * self.num_workers)
+
+        return (
+            self._buffers["observations"],
+            self._buffers["rewards"],
+            self._buffers["terminated"],
+            self._buffers["truncated"],
+            self._buffers["action_masks"],
+        )
+
+    def close(self) -> None:
+        """
+        Stops the workers and frees the shared memory
+        """
+
+        if self._shared_memory is None:
+            return
+
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for connection in self._connections:
+            connection.close()
+
+        # the arrays export the shared memory's buffer, which has to be released first
+        self._buffers = {}
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+        self._shared_memory = None
+
+    def _send_to_workers(self, commands: list[tuple[str, str | None]]) -> None:
+        for connection, command in zip(self._connections, commands):
+            connection.send(command)
+
+        errors = [connection.recv() for connection in self._connections]
+        for error in errors:
+            if error is not None:
+                raise error
+
+
+def _run_worker(
+    connection: Connection,
+    shared_memory_name: str,
+    num_runs: int,
+    start: int,
+    stop: int,
+    deck: Deck,
+    stake: Stake,
+    max_steps: int | None,
+    illegal_action_reward: float,
+) -> None:
+    shared_memory = SharedMemory(shared_memory_name, track=False)
+    buffers = {
+        name: buffer[start:stop]
+        for name, buffer in _get_buffers(shared_memory.buf, num_runs).items()
+    }
+    batch = BatchRun(
+        stop - start,
+        deck=deck,
+        stake=stake,
+        max_steps=max_steps,
+        illegal_action_reward=illegal_action_reward,
+    )
+
+    try:
+        while True:
+            command, seed = connection.recv()
+
+            if command == "close":
+                break
+
+            try:
+                if command == "reset":
+                    batch.reset(seed=seed)
+                    buffers["rewards"][:] = 0
+                    buffers["terminated"][:] = False
+                    buffers["truncated"][:] = False
+                else:
+                    batch.step(buffers["actions"])
+                    buffers["rewards"][:] = batch.rewards
+                    buffers["terminated"][:] = batch.terminated
+                    buffers["truncated"][:] = batch.truncated
+                    buffers["final_observations"][:] = batch.final_observations
+
+                buffers["observations"][:] = batch.observations
+                buffers["action_masks"][:] = batch.action_masks
+            except Exception as e:
+                connection.send(e)
+            else:
+                connection.send(None)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buffers = None
+        shared_memory.close()
+
+
+def simulate(
+    policy: Callable[[Run, np.ndarray, random.Random], int],
+    seeds: Iterable[str | None],
+    deck: Deck = Deck.RED,
+    stake: Stake = Stake.WHITE,
+    max_steps: int | None = None,
+    max_workers: int | None = None,
+) -> list[Run]:
+    """
+    Plays each seed's run on a thread pool until it's won or lost, returning the runs in order
+
+    Runs share no mutable state, so they can be played from several threads at once. The
+    policy is called from every thread with the run, its action mask and a random.Random
+    seeded from the run's seed, so a policy that only uses those gives the same runs
+    whatever the number of threads.
+
+    Args:
+        policy (Callable[[Run, np.ndarray, random.Random], int]): Chooses a flat action from the run's action mask
+        seeds (Iterable[str | None]): The seed of each run, or none for a random one
+        deck (Deck): The deck of every run
+        stake (Stake): The stake of every run
+        max_steps (int, optional): The number of steps after which a run is stopped, or none
+        max_workers (int, optional): The number of threads, or the ThreadPoolExecutor default
+    """
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        return list(
+            executor.map(partial(_play_run, policy, deck, stake, max_steps), seeds)
+        )
+
+
+def _play_run(
+    policy: Callable[[Run, np.ndarray, random.Random], int],
+    deck: Deck,
+    stake: Stake,
+    max_steps: int | None,
+    seed: str | None,
+) -> Run:
+    run = Run(deck, stake=stake, seed=seed)
+    rng = random.Random(None if seed is None else f"{seed}-policy")
+    action_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    num_steps = 0
+    while (
+        run.state is not State.GAME_OVER
+        and run.ante < WINNING_ANTE
+        and (max_steps is None or num_steps < max_steps)
+    ):
+        action = policy(run, run.legal_actions(out=action_mask), rng)
+        _ACTION_METHODS[action](run, *ACTIONS[action][1])
+        num_steps += 1
+
+    return run
@@ -0,0 +1,542 @@
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache, partial
+import itertools
+import multiprocessing as mp
+from multiprocessing.context import BaseContext
+import random
+
+from . import Run
+from .classes import *
+from .constants import (
+    BLIND_INFO,
+    CARD_EDITION_CHANCES,
+    CARD_EDITION_CHANCES_GLOW_UP,
+    CARD_EDITION_CHANCES_HONE,
+    CARD_EDITION_CHANCES_ILLUSION,
+    EDITION_COSTS,
+    JOKER_BASE_COSTS,
+    JOKER_BASE_RARITY_WEIGHTS,
+    JOKER_EDITION_CHANCES,
+    JOKER_EDITION_CHANCES_GLOW_UP,
+    JOKER_EDITION_CHANCES_HONE,
+    JOKER_RARITIES,
+    NON_ETERNAL_JOKERS,
+    NON_PERISHABLE_JOKERS,
+    PROHIBITED_ANTE_1_TAGS,
+    SEED_CHARACTERS,
+    SEED_LENGTH,
+    SHOP_BASE_CARD_WEIGHTS,
+    SHOP_BASE_PACK_WEIGHTS,
+)
+from .enums import *
+from .jokers import (
+    Cavendish,
+    GlassJoker,
+    GoldenTicket,
+    Joker,
+    LuckyCat,
+    SteelJoker,
+    StoneJoker,
+)
+
+# the Jokers that only appear once a card in the deck has their enhancement
+_ENHANCEMENT_JOKERS = {
+    Enhancement.GOLD: GoldenTicket,
+    Enhancement.STEEL: SteelJoker,
+    Enhancement.STONE: StoneJoker,
+    Enhancement.LUCKY: LuckyCat,
+    Enhancement.GLASS: GlassJoker,
+}
+# the enum members drawn from, listed once rather than on every draw
+_BLINDS = list(Blind)
+_ENHANCEMENTS = list(Enhancement)
+_RANKS = list(Rank)
+_SEALS = list(Seal)
+_SUITS = list(Suit)
+_TAROTS = list(Tarot)
+_SPECTRALS = list(Spectral)[:-2]
+
+
+@dataclass(eq=False)
+class SeedPreview:
+    """
+    What a seed decides regardless of how the blinds are played
+
+    The first shop is the one reached by playing the small blind of ante 1 without buying,
+    selling, using or skipping anything, and pack_items holds the contents of its packs
+    opened in order. Packs share one random stream, so a pack only has these contents if
+    the packs before it in the shop were opened first. The Jokers aren't attached to a run,
+    so hidden state a Joker draws from the gameplay stream when it's created, like To Do
+    List's poker hand, isn't previewed.
+    """
+
+    seed: str
+    ante_tags: list[list[tuple[Tag, PokerHand | None]]]
+    boss_blinds: list[Blind]
+    shop_cards: list[tuple[BalatroJoker | Consumable | Card, int]]
+    shop_vouchers: list[tuple[Voucher, int]]
+    shop_packs: list[tuple[Pack, int]]
+    pack_items: list[list[BalatroJoker | Consumable | Card]]
+
+
+@dataclass(eq=False)
+class _DeckState:
+    # what a new run of a deck starts with that the ante, shop and pack draws depend on
+    vouchers: set[Voucher]
+    consumable_cards: set[Tarot | Planet | Spectral]
+    prohibited_joker_types: set[type[BalatroJoker]]
+    unlocked_poker_hands: list[PokerHand]
+    planets: list[Planet]
+    most_played_hand: PokerHand
+    shop_card_weights: dict[type, float]
+    num_shop_cards: int
+    possible_vouchers: list[Voucher]
+    joker_edition_chances: dict[Edition, float]
+    card_edition_chances: dict[Edition, float]
+
+
+def preview_seed(
+    seed: str,
+    deck: Deck = Deck.RED,
+    stake: Stake = Stake.WHITE,
+    num_antes: int = 1,
+) -> SeedPreview:
+    """
+    Fast-forwards a seed to its first shop without playing, giving the same tags, boss blinds,
+    shop and pack contents as a Run with that seed, provided its packs are opened in order
+
+    No Run is created per seed: only the draws from its ante, shop and pack streams are
+    replayed, in the order a run makes them, into the same pool tables. What the draws
+    depend on, like the vouchers a deck starts with, is taken from one new run per deck.
+    python -m benchmarks.seed_scan checks the previews against a Run's.
+
+    Args:
+        seed (str): The seed
+        deck (Deck): The deck of the run
+        stake (Stake): The stake of the run
+        num_antes (int): The number of antes to get the tags and boss blinds of
+    """
+
+    deck_state = _get_deck_state(deck)
+    ante_random = random.Random(f"{seed}-ante")
+    shop_random = random.Random(f"{seed}-shop")
+    pack_random = random.Random(f"{seed}-pack")
+
+    ante_tags, boss_blinds = [], []
+    boss_blind_pool, finisher_blind_pool = [], []
+    for ante in range(1, num_antes + 1):
+        ante_tags.append(
+            [_draw_ante_tag(ante_random, ante, deck_state) for _ in range(2)]
+        )
+        if ante % 8 == 0:
+            if not finisher_blind_pool:
+                finisher_blind_pool = _BLINDS[-5:]
+            boss_blind = ante_random.choice(finisher_blind_pool)
+            finisher_blind_pool.remove(boss_blind)
+        else:
+            if not boss_blind_pool:
+                boss_blind_pool = _BLINDS[2:-5]
+            boss_blind = ante_random.choice(
+                [blind for blind in boss_blind_pool if ante >= BLIND_INFO[blind][0]]
+            )
+            boss_blind_pool.remove(boss_blind)
+        boss_blinds.append(boss_blind)
+
+    # items already in the shop or the opened pack aren't drawn again
+    joker_types = set(deck_state.prohibited_joker_types)
+    consumable_cards = set(deck_state.consumable_cards)
+
+    shop_cards = []
+    for card_type in shop_random.choices(
+        list(deck_state.shop_card_weights),
+        weights=deck_state.shop_card_weights.values(),
+        k=deck_state.num_shop_cards,
+    ):
+        if card_type is BalatroJoker:
+            item = _draw_joker(shop_random, stake, joker_types, deck_state)
+        elif card_type is Card:
+            item = _draw_card(shop_random)
+            if Voucher.ILLUSION in deck_state.vouchers:
+                item.edition = shop_random.choices(
+                    list(CARD_EDITION_CHANCES_ILLUSION),
+                    weights=CARD_EDITION_CHANCES_ILLUSION.values(),
+                    k=1,
+                )[0]
+                if shop_random.random() < 0.4:
+                    item.enhancement = shop_random.choice(_ENHANCEMENTS)
+        else:
+            item = _draw_consumable(
+                shop_random, card_type, consumable_cards, deck_state
+            )
+        shop_cards.append((item, _get_buy_cost(item)))
+
+    voucher = shop_random.choice(deck_state.possible_vouchers)
+    shop_vouchers = [(voucher, _get_buy_cost(voucher))]
+
+    # playing the small blind makes the first shop that of round 1, with a Buffoon Pack
+    shop_packs = shop_random.choices(
+        list(SHOP_BASE_PACK_WEIGHTS), weights=SHOP_BASE_PACK_WEIGHTS.values(), k=2
+    )
+    shop_packs[0] = Pack.BUFFOON
+    shop_packs = [(pack, _get_buy_cost(pack)) for pack in shop_packs]
+
+    pack_items = [
+        _draw_pack_items(
+            pack_random, pack, stake, joker_types, consumable_cards, deck_state
+        )
+        for pack, _ in shop_packs
+    ]
+
+    return SeedPreview(
+        seed, ante_tags, boss_blinds, shop_cards, shop_vouchers, shop_packs, pack_items
+    )
+
+
+def random_seeds(count: int | None = None, seed: str | None = None) -> Iterator[str]:
+    """
+    Generates seeds in the game's format, 8 uppercase letters and digits
+
+    Args:
+        count (int, optional): The number of seeds, or none for endless seeds
+        seed (str, optional): The seed of the generator, or none for a random one
+    """
+
+    rng = random.Random(seed)
+    for _ in itertools.repeat(None) if count is None else range(count):
+        yield "".join(rng.choices(SEED_CHARACTERS, k=SEED_LENGTH))
+
+
+def scan_seeds(
+    predicate: Callable[[SeedPreview], bool],
+    seeds: Iterable[str],
+    deck: Deck = Deck.RED,
+    stake: Stake = Stake.WHITE,
+    num_antes: int = 1,
+    processes: int | None = None,
+    chunk_size: int = 1024,
+    context: BaseContext | None = None,
+) -> Iterator[SeedPreview]:
+    """
+    Previews seeds across processes, yielding the previews the predicate accepts in seed order
+
+    With more than one process the predicate is pickled, so it has to be a module-level
+    function. Only the matching seeds are sent back, to be previewed again in this process.
+
+    Args:
+        predicate (Callable[[SeedPreview], bool]): Whether a seed is wanted
+        seeds (Iterable[str]): The seeds to scan, such as random_seeds()
+        deck (Deck): The deck of the runs
+        stake (Stake): The stake of the runs
+        num_antes (int): The number of antes to get the tags and boss blinds of
+        processes (int, optional): The number of processes, 1 to scan in this process, or none for one per core
+        chunk_size (int): The number of seeds sent to a process at a time
+        context (BaseContext, optional): The multiprocessing context to start processes with, or the default one
+    """
+
+    if processes == 1:
+        for seed in seeds:
+            preview = preview_seed(seed, deck, stake=stake, num_antes=num_antes)
+            if predicate(preview):
+                yield preview
+        return
+
+    if context is None:
+        context = mp.get_context()
+
+    scan_chunk = partial(_scan_chunk, predicate, deck, stake, num_antes)
+    with context.Pool(processes) as pool:
+        for matching_seeds in pool.imap(
+            scan_chunk, itertools.batched(seeds, chunk_size)
+        ):
+            for seed in matching_seeds:
+                yield preview_seed(seed, deck, stake=stake, num_antes=num_antes)
+
+
+def _scan_chunk(
+    predicate: Callable[[SeedPreview], bool],
+    deck: Deck,
+    stake: Stake,
+    num_antes: int,
+    seeds: tuple[str, ...],
+) -> list[str]:
+    return [
+        seed
+        for seed in seeds
+        if predicate(preview_seed(seed, deck, stake=stake, num_antes=num_antes))
+    ]
+
+
+@cache
+def _get_deck_state(deck: Deck) -> _DeckState:
+    # mirrors what Run.__init__, _populate_shop and _get_random_joker read from a new run
+    run = Run(deck)
+    vouchers = run._vouchers
+
+    shop_card_weights = SHOP_BASE_CARD_WEIGHTS.copy()
+    if Voucher.MAGIC_TRICK in vouchers:
+        shop_card_weights[Card] = 4
+    if Voucher.TAROT_TYCOON in vouchers:
+        shop_card_weights[Tarot] = 32
+    elif Voucher.TAROT_MERCHANT in vouchers:
+        shop_card_weights[Tarot] = 9.6
+    if Voucher.PLANET_TYCOON in vouchers:
+        shop_card_weights[Planet] = 32
+    elif Voucher.PLANET_MERCHANT in vouchers:
+        shop_card_weights[Planet] = 9.6
+    if deck is Deck.GHOST:
+        shop_card_weights[Spectral] = 2
+
+    voucher_list = list(Voucher)
+    possible_vouchers = [
+        upgraded_voucher if base_voucher in vouchers else base_voucher
+        for base_voucher, upgraded_voucher in zip(voucher_list[:16], voucher_list[16:])
+        if upgraded_voucher not in vouchers
+    ]
+
+    enhancements = {card.enhancement for card in run._deck_cards}
+    prohibited_joker_types = {type(joker) for joker in run._jokers} | {Cavendish}
+    prohibited_joker_types.update(
+        joker_type
+        for enhancement, joker_type in _ENHANCEMENT_JOKERS.items()
+        if enhancement not in enhancements
+    )
+
+    return _DeckState(
+        vouchers=vouchers,
+        consumable_cards={consumable.card for consumable in run._consumables},
+        prohibited_joker_types=prohibited_joker_types,
+        unlocked_poker_hands=run._unlocked_poker_hands,
+        planets=[poker_hand.planet for poker_hand in run._unlocked_poker_hands],
+        most_played_hand=run._most_played_hand,
+        shop_card_weights=shop_card_weights,
+        num_shop_cards=(
+            4
+            if Voucher.OVERSTOCK_PLUS in vouchers
+            else 3 if Voucher.OVERSTOCK in vouchers else 2
+        ),
+        possible_vouchers=possible_vouchers,
+        joker_edition_chances=(
+            JOKER_EDITION_CHANCES_GLOW_UP
+            if Voucher.GLOW_UP in vouchers
+            else (
+                JOKER_EDITION_CHANCES_HONE
+                if Voucher.HONE in vouchers
+                else JOKER_EDITION_CHANCES
+            )
+        ),
+        card_edition_chances=(
+            CARD_EDITION_CHANCES_GLOW_UP
+            if Voucher.GLOW_UP in vouchers
+            else (
+                CARD_EDITION_CHANCES_HONE
+                if Voucher.HONE in vouchers
+                else CARD_EDITION_CHANCES
+            )
+        ),
+    )
+
+
+@cache
+def _get_tag_pool(ante: int) -> list[Tag]:
+    return [tag for tag in Tag if ante > 1 or tag not in PROHIBITED_ANTE_1_TAGS]
+
+
+def _draw_ante_tag(
+    rng: random.Random, ante: int, deck_state: _DeckState
+) -> tuple[Tag, PokerHand | None]:
+    tag = rng.choice(_get_tag_pool(min(ante, 2)))
+    if tag is Tag.ORBITAL:
+        return tag, rng.choice(deck_state.unlocked_poker_hands)
+    return tag, None
+
+
+def _draw_joker(
+    rng: random.Random,
+    stake: Stake,
+    joker_types: set[type[BalatroJoker]],
+    deck_state: _DeckState,
+) -> BalatroJoker:
+    # mirrors Run._get_random_joker, adding the Joker's type to those not drawn again
+    rarity = rng.choices(
+        list(JOKER_BASE_RARITY_WEIGHTS),
+        weights=JOKER_BASE_RARITY_WEIGHTS.values(),
+        k=1,
+    )[0]
+    valid_joker_types = [
+        joker_type
+        for joker_type in JOKER_RARITIES[rarity]
+        if joker_type not in joker_types
+    ]
+    joker_type = rng.choice(valid_joker_types) if valid_joker_types else Joker
+    joker_types.add(joker_type)
+
+    edition = rng.choices(
+        list(deck_state.joker_edition_chances),
+        weights=deck_state.joker_edition_chances.values(),
+        k=1,
+    )[0]
+
+    is_eternal, is_perishable, is_rental = False, False, False
+    eternal_perishable_roll = rng.random()
+    if (
+        stake >= Stake.BLACK
+        and joker_type not in NON_ETERNAL_JOKERS
+        and eternal_perishable_roll < 0.3
+    ):
+        is_eternal = True
+    elif (
+        stake >= Stake.ORANGE
+        and joker_type not in NON_PERISHABLE_JOKERS
+        and eternal_perishable_roll < 0.6
+    ):
+        is_perishable = True
+    if stake is Stake.GOLD and rng.random() < 0.3:
+        is_rental = True
+
+    return joker_type(
+        edition=edition,
+        is_eternal=is_eternal,
+        is_perishable=is_perishable,
+        is_rental=is_rental,
+    )
+
+
+def _draw_consumable(
+    rng: random.Random,
+    consumable_type: type[Tarot | Planet | Spectral],
+    consumable_cards: set[Tarot | Planet | Spectral],
+    deck_state: _DeckState,
+    allow_black_hole: bool = False,
+    allow_the_soul: bool = False,
+) -> Consumable:
+    # mirrors Run._get_random_consumable, adding the card to those not drawn again
+    if allow_black_hole and rng.random() < 0.003:
+        return Consumable(Spectral.BLACK_HOLE)
+    if allow_the_soul and rng.random() < 0.003:
+        return Consumable(Spectral.THE_SOUL)
+
+    if consumable_type is Tarot:
+        consumable_card_pool = _TAROTS
+    elif consumable_type is Planet:
+        consumable_card_pool = deck_state.planets
+    else:
+        consumable_card_pool = _SPECTRALS
+
+    valid_consumable_cards = [
+        consumable_card
+        for consumable_card in consumable_card_pool
+        if consumable_card not in consumable_cards
+    ]
+    consumable_card = (
+        rng.choice(valid_consumable_cards)
+        if valid_consumable_cards
+        else consumable_type.DEFAULT
+    )
+    consumable_cards.add(consumable_card)
+    return Consumable(consumable_card)
+
+
+def _draw_card(rng: random.Random) -> Card:
+    return Card(rng.choice(_RANKS), rng.choice(_SUITS))
+
+
+def _draw_pack_items(
+    rng: random.Random,
+    pack: Pack,
+    stake: Stake,
+    joker_types: set[type[BalatroJoker]],
+    consumable_cards: set[Tarot | Planet | Spectral],
+    deck_state: _DeckState,
+) -> list[BalatroJoker | Consumable | Card]:
+    # mirrors Run._open_pack, the items of a pack only being excluded from that pack
+    joker_types, consumable_cards = set(joker_types), set(consumable_cards)
+
+    if pack.name.startswith("MEGA") or pack.name.startswith("JUMBO"):
+        of_up_to = 5
+    else:
+        of_up_to = 3
+
+    pack_items = []
+    match pack:
+        case Pack.BUFFOON | Pack.JUMBO_BUFFOON | Pack.MEGA_BUFFOON:
+            while len(pack_items) < of_up_to - 1:
+                pack_items.append(_draw_joker(rng, stake, joker_types, deck_state))
+        case Pack.ARCANA | Pack.JUMBO_ARCANA | Pack.MEGA_ARCANA:
+            while len(pack_items) < of_up_to:
+                pack_items.append(
+                    _draw_consumable(
+                        rng,
+                        (
+                            Spectral
+                            if Voucher.OMEN_GLOBE in deck_state.vouchers
+                            and rng.random() < 0.2
+                            else Tarot
+                        ),
+                        consumable_cards,
+                        deck_state,
+                        allow_the_soul=True,
+                    )
+                )
+        case Pack.CELESTIAL | Pack.JUMBO_CELESTIAL | Pack.MEGA_CELESTIAL:
+            if Voucher.TELESCOPE in deck_state.vouchers:
+                planet = deck_state.most_played_hand.planet
+                consumable_cards.add(planet)
+                pack_items.append(Consumable(planet))
+
+            while len(pack_items) < of_up_to:
+                pack_items.append(
+                    _draw_consumable(
+                        rng, Planet, consumable_cards, deck_state, allow_black_hole=True
+                    )
+                )
+        case Pack.SPECTRAL | Pack.JUMBO_SPECTRAL | Pack.MEGA_SPECTRAL:
+            while len(pack_items) < of_up_to - 1:
+                pack_items.append(
+                    _draw_consumable(
+                        rng,
+                        Spectral,
+                        consumable_cards,
+                        deck_state,
+                        allow_black_hole=True,
+                        allow_the_soul=True,
+                    )
+                )
+        case Pack.STANDARD | Pack.JUMBO_STANDARD | Pack.MEGA_STANDARD:
+            while len(pack_items) < of_up_to:
+                pack_card = _draw_card(rng)
+                pack_card.edition = rng.choices(
+                    list(deck_state.card_edition_chances),
+                    weights=deck_state.card_edition_chances.values(),
+                    k=1,
+                )[0]
+                if rng.random() < 0.4:
+                    pack_card.enhancement = rng.choice(_ENHANCEMENTS)
+                if rng.random() < 0.2:
+                    pack_card.seal = rng.choice(_SEALS)
+
+                pack_items.append(pack_card)
+
+    return pack_items
+
+
+def _get_buy_cost(item: BalatroJoker | Consumable | Card | Voucher | Pack) -> int:
+    # mirrors Run._calculate_buy_cost, as no deck starts with a discount or Astronomer
+    match item:
+        case BalatroJoker():
+            if item.is_rental:
+                return 1
+            return JOKER_BASE_COSTS[type(item)] + EDITION_COSTS[item.edition]
+        case Consumable():
+            return 4 if isinstance(item.card, Spectral) else 3
+        case Card():
+            return 1 + EDITION_COSTS[item.edition]
+        case Voucher():
+            return 10
+        case Pack():
+            if item.name.startswith("MEGA"):
+                return 8
+            if item.name.startswith("JUMBO"):
+                return 6
+            return 4
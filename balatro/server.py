@@ -0,0 +1,473 @@
+from __future__ import annotations
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from enum import IntEnum
+import itertools
+import struct
+
+import numpy as np
+
+from .actions import NUM_ACTIONS
+from .enums import *
+from .env import BalatroEnv
+from .observation import OBSERVATION_DTYPE, new_observation
+
+# every message is a frame: a little-endian u32 length followed by that many bytes
+FRAME_HEADER = struct.Struct("<I")
+# opcode, request id, session id
+REQUEST_HEADER = struct.Struct("<BII")
+# request id, status
+RESPONSE_HEADER = struct.Struct("<IB")
+# deck index, stake index, max steps (-1 for none), illegal action reward
+OPEN_BODY = struct.Struct("<BBif")
+SESSION_BODY = struct.Struct("<I")
+ACTION_BODY = struct.Struct("<I")
+# reward, terminated, truncated, followed by the observation and packed action mask
+STEP_BODY = struct.Struct("<f??")
+
+OBSERVATION_SIZE = OBSERVATION_DTYPE.itemsize
+PACKED_ACTION_MASK_SIZE = -(-NUM_ACTIONS // 8)
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# the longest request body a client may send, far more than any request needs
+MAX_REQUEST_SIZE = 1 << 16
+
+_READ_SIZE = 1 << 16
+
+
+class Opcode(IntEnum):
+    OPEN = 0
+    """
+    Body: OPEN_BODY, then the seed as UTF-8 (empty for a random one). Reply: SESSION_BODY
+    """
+    RESET = 1
+    """
+    Body: the seed as UTF-8 (empty for a random one). Reply: the observation and packed action mask
+    """
+    STEP = 2
+    """
+    Body: ACTION_BODY. Reply: STEP_BODY, then the observation and packed action mask
+    """
+    OBSERVE = 3
+    """
+    Body: empty. Reply: the observation
+    """
+    LEGAL_ACTIONS = 4
+    """
+    Body: empty. Reply: the packed action mask
+    """
+    CLOSE = 5
+    """
+    Body: empty. Reply: empty
+    """
+
+
+@dataclass(eq=False)
+class _Session:
+    env: BalatroEnv
+    observation: np.ndarray = field(default_factory=new_observation)
+    action_mask: np.ndarray = field(
+        default_factory=lambda: np.zeros(NUM_ACTIONS, dtype=bool)
+    )
+
+
+class EnvServer:
+    """
+    Hosts BalatroEnv sessions for agents in other processes over a length-prefixed binary protocol
+
+    Clients may pipeline any number of requests without waiting for replies, and any
+    connection may use any session. Requests that arrive in the same event loop iteration,
+    from every connection, are handled together in arrival order and their replies are
+    written with one call per connection. Sessions are closed with the connection that
+    opened them. Connections that send a request longer than MAX_REQUEST_SIZE or shorter
+    than its header are closed.
+    """
+
+    def __init__(self) -> None:
+        self._sessions: dict[int, _Session] = {}
+        self._session_ids: itertools.count = itertools.count(1)
+        self._opened_session_ids: dict[asyncio.StreamWriter, set[int]] = {}
+        self._pending: list[tuple[asyncio.StreamWriter, bytes]] = []
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serves one client connection until it closes, to pass to asyncio.start_server
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader
+            writer (asyncio.StreamWriter): The connection's writer
+        """
+
+        self._opened_session_ids[writer] = set()
+        buffer = bytearray()
+
+        try:
+            while chunk := await reader.read(_READ_SIZE):
+                buffer += chunk
+
+                start = 0
+                while len(buffer) - start >= FRAME_HEADER.size:
+                    (length,) = FRAME_HEADER.unpack_from(buffer, start)
+                    if length > MAX_REQUEST_SIZE:
+                        # rather than buffering however much a bogus length asks for
+                        return
+                    end = start + FRAME_HEADER.size + length
+                    if len(buffer) < end:
+                        break
+                    if not self._pending:
+                        asyncio.get_running_loop().call_soon(self._handle_pending)
+                    self._pending.append(
+                        (writer, bytes(buffer[start + FRAME_HEADER.size : end]))
+                    )
+                    start = end
+                del buffer[:start]
+
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in self._opened_session_ids.pop(writer):
+                self._sessions.pop(session_id, None)
+            writer.close()
+
+    def _handle_pending(self) -> None:
+        pending, self._pending = self._pending, []
+
+        replies: dict[asyncio.StreamWriter, bytearray] = {}
+        for writer, request in pending:
+            try:
+                opcode, request_id, session_id = REQUEST_HEADER.unpack_from(request)
+            except struct.error:
+                # replies are matched by request id, so the client is cut off instead
+                writer.close()
+                continue
+
+            try:
+                body = self._handle_request(
+                    writer, opcode, session_id, request[REQUEST_HEADER.size :]
+                )
+                status = STATUS_OK
+            except Exception as e:
+                body = f"{type(e).__name__}: {e}".encode()
+                status = STATUS_ERROR
+
+            reply = replies.setdefault(writer, bytearray())
+            reply += FRAME_HEADER.pack(RESPONSE_HEADER.size + len(body))
+            reply += RESPONSE_HEADER.pack(request_id, status)
+            reply += body
+
+        for writer, reply in replies.items():
+            if not writer.is_closing():
+                writer.write(reply)
+
+    def _handle_request(
+        self, writer: asyncio.StreamWriter, opcode: int, session_id: int, body: bytes
+    ) -> bytes:
+        match opcode:
+            case Opcode.OPEN:
+                deck_index, stake_index, max_steps, illegal_action_reward = (
+                    OPEN_BODY.unpack_from(body)
+                )
+                session = _Session(
+                    BalatroEnv(
+                        list(Deck)[deck_index],
+                        stake=list(Stake)[stake_index],
+                        max_steps=None if max_steps < 0 else max_steps,
+                        illegal_action_reward=illegal_action_reward,
+                    )
+                )
+                session.env.reset(seed=body[OPEN_BODY.size :].decode() or None)
+
+                session_id = next(self._session_ids)
+                self._sessions[session_id] = session
+                self._opened_session_ids[writer].add(session_id)
+                return SESSION_BODY.pack(session_id)
+            case Opcode.RESET:
+                session = self._sessions[session_id]
+                _, info = session.env.reset(seed=body.decode() or None)
+                return self._observe(session) + _pack_action_mask(info["action_mask"])
+            case Opcode.STEP:
+                session = self._sessions[session_id]
+                (action,) = ACTION_BODY.unpack_from(body)
+                _, reward, terminated, truncated, info = session.env.step(action)
+                return (
+                    STEP_BODY.pack(reward, terminated, truncated)
+                    + self._observe(session)
+                    + _pack_action_mask(info["action_mask"])
+                )
+            case Opcode.OBSERVE:
+                return self._observe(self._sessions[session_id])
+            case Opcode.LEGAL_ACTIONS:
+                session = self._sessions[session_id]
+                return _pack_action_mask(
+                    session.env.run.legal_actions(out=session.action_mask)
+                )
+            case Opcode.CLOSE:
+                del self._sessions[session_id]
+                self._opened_session_ids[writer].discard(session_id)
+                return b""
+
+        raise ValueError(f"Unknown opcode {opcode}")
+
+    def _observe(self, session: _Session) -> bytes:
+        return session.env.run.observe(session.observation).tobytes()
+
+
+class EnvClient:
+    """
+    An asyncio client of an EnvServer
+
+    Every call sends its request straight away and awaits its own reply, so calls awaited
+    together with asyncio.gather are pipelined over the one connection.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._reader: asyncio.StreamReader = reader
+        self._writer: asyncio.StreamWriter = writer
+        self._request_ids: itertools.count = itertools.count()
+        self._replies: dict[int, asyncio.Future] = {}
+        self._read_task: asyncio.Task = asyncio.create_task(self._read_replies())
+
+    @classmethod
+    async def connect(
+        cls, path: str | None = None, host: str = "127.0.0.1", port: int = 8765
+    ) -> EnvClient:
+        """
+        Connects to a server
+
+        Args:
+            path (str, optional): The path of the server's Unix domain socket, or none to use TCP
+            host (str): The server's host, if no path is given
+            port (int): The server's port, if no path is given
+        """
+
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def __aenter__(self) -> EnvClient:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def open(
+        self,
+        deck: Deck = Deck.RED,
+        stake: Stake = Stake.WHITE,
+        seed: str | None = None,
+        max_steps: int | None = None,
+        illegal_action_reward: float = 0.0,
+    ) -> int:
+        """
+        Opens a session with a new run, returning its id
+
+        Args:
+            deck (Deck): The deck of the run
+            stake (Stake): The stake of the run
+            seed (str, optional): The seed of the run, or none for a random one
+            max_steps (int, optional): The number of steps after which an episode is truncated, or none
+            illegal_action_reward (float): The reward for an action that raises
+        """
+
+        body = await self._request(
+            Opcode.OPEN,
+            0,
+            OPEN_BODY.pack(
+                list(Deck).index(deck),
+                list(Stake).index(stake),
+                -1 if max_steps is None else max_steps,
+                illegal_action_reward,
+            )
+            + (seed or "").encode(),
+        )
+        return SESSION_BODY.unpack(body)[0]
+
+    async def reset(
+        self, session_id: int, seed: str | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Starts a new run in a session, returning the observation and action mask
+
+        Args:
+            session_id (int): The session
+            seed (str, optional): The seed of the run, or none for a random one
+        """
+
+        body = await self._request(Opcode.RESET, session_id, (seed or "").encode())
+        return _unpack_observation(body), _unpack_action_mask(body[OBSERVATION_SIZE:])
+
+    async def step(
+        self, session_id: int, action: int
+    ) -> tuple[np.ndarray, float, bool, bool, np.ndarray]:
+        """
+        Takes an action in a session, returning the observation, reward, whether the run
+        terminated, whether it was truncated and the action mask
+
+        Args:
+            session_id (int): The session
+            action (int): The flat action, in range(NUM_ACTIONS)
+        """
+
+        body = await self._request(Opcode.STEP, session_id, ACTION_BODY.pack(action))
+        reward, terminated, truncated = STEP_BODY.unpack_from(body)
+        body = body[STEP_BODY.size :]
+        return (
+            _unpack_observation(body),
+            reward,
+            terminated,
+            truncated,
+            _unpack_action_mask(body[OBSERVATION_SIZE:]),
+        )
+
+    async def observe(self, session_id: int) -> np.ndarray:
+        """
+        Gets the observation of a session
+
+        Args:
+            session_id (int): The session
+        """
+
+        return _unpack_observation(await self._request(Opcode.OBSERVE, session_id))
+
+    async def legal_actions(self, session_id: int) -> np.ndarray:
+        """
+        Gets the action mask of a session
+
+        Args:
+            session_id (int): The session
+        """
+
+        return _unpack_action_mask(
+            await self._request(Opcode.LEGAL_ACTIONS, session_id)
+        )
+
+    async def close_session(self, session_id: int) -> None:
+        """
+        Closes a session
+
+        Args:
+            session_id (int): The session
+        """
+
+        await self._request(Opcode.CLOSE, session_id)
+
+    async def close(self) -> None:
+        """
+        Closes the connection, closing the sessions it opened on the server
+        """
+
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._read_task
+
+    async def _request(
+        self, opcode: Opcode, session_id: int, body: bytes = b""
+    ) -> bytes:
+        request_id = next(self._request_ids) & 0xFFFFFFFF
+        reply = self._replies[request_id] = asyncio.get_running_loop().create_future()
+
+        self._writer.write(
+            FRAME_HEADER.pack(REQUEST_HEADER.size + len(body))
+            + REQUEST_HEADER.pack(opcode, request_id, session_id)
+            + body
+        )
+
+        return await reply
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                (length,) = FRAME_HEADER.unpack(
+                    await self._reader.readexactly(FRAME_HEADER.size)
+                )
+                frame = await self._reader.readexactly(length)
+                request_id, status = RESPONSE_HEADER.unpack_from(frame)
+                reply = self._replies.pop(request_id)
+                if status == STATUS_OK:
+                    reply.set_result(frame[RESPONSE_HEADER.size :])
+                else:
+                    reply.set_exception(
+                        RuntimeError(frame[RESPONSE_HEADER.size :].decode())
+                    )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            for reply in self._replies.values():
+                if not reply.done():
+                    reply.set_exception(ConnectionError("Connection closed"))
+            self._replies.clear()
+
+
+def _pack_action_mask(action_mask: np.ndarray) -> bytes:
+    return np.packbits(action_mask).tobytes()
+
+
+def _unpack_observation(body: bytes) -> np.ndarray:
+    return np.frombuffer(body, dtype=OBSERVATION_DTYPE, count=1).reshape(())
+
+
+def _unpack_action_mask(body: bytes) -> np.ndarray:
+    return np.unpackbits(
+        np.frombuffer(body, dtype=np.uint8, count=PACKED_ACTION_MASK_SIZE),
+        count=NUM_ACTIONS,
+    ).view(bool)
+
+
+async def serve(
+    path: str | None = None, host: str = "127.0.0.1", port: int = 8765
+) -> None:
+    """
+    Runs an EnvServer until cancelled
+
+    Args:
+        path (str, optional): The path of a Unix domain socket to listen on, or none to use TCP
+        host (str): The host to listen on, if no path is given
+        port (int): The port to listen on, if no path is given
+    """
+
+    server = EnvServer()
+    if path is not None:
+        listener = await asyncio.start_unix_server(server.handle_connection, path)
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+
+    async with listener:
+        await listener.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hosts Balatro runs for remote agents")
+    parser.add_argument("--unix", default=None, help="the path of a Unix domain socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="a port to serve Prometheus metrics on, or none to not collect them",
+    )
+    args = parser.parse_args()
+
+    if args.metrics_port is not None:
+        from .metrics import Metrics
+
+        metrics = Metrics()
+        metrics.enable()
+        metrics.serve(args.metrics_port, args.host)
+
+    try:
+        asyncio.run(serve(args.unix, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
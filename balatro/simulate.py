@@ -0,0 +1,298 @@
+from __future__ import annotations
+import argparse
+from collections.abc import Callable
+from functools import partial
+import importlib
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+from typing import Any
+
+import numpy as np
+
+from . import ChallengeRun, Run
+from .actions import ACTIONS, NUM_ACTIONS
+from .enums import *
+from .env import _ACTION_METHODS
+from .seeds import random_seeds
+
+# a run is won once the boss blind of ante 8 is defeated
+WINNING_ANTE = 9
+
+Policy = Callable[[Run, np.ndarray, random.Random], int]
+
+_policy: Policy | None = None
+
+
+def random_policy(run: Run, action_mask: np.ndarray, rng: random.Random) -> int:
+    """
+    Chooses a uniformly random legal action
+
+    Args:
+        run (Run): The run
+        action_mask (np.ndarray): The run's action mask
+        rng (random.Random): The policy's random stream for the run
+    """
+
+    return rng.choice(np.flatnonzero(action_mask).tolist())
+
+
+def load_policy(path: str) -> Policy:
+    """
+    Imports a policy from a "module:name" path, such as "balatro.simulate:random_policy"
+
+    Args:
+        path (str): The import path of a function taking a run, its action mask and a random.Random, returning a flat action
+    """
+
+    module_name, _, name = path.partition(":")
+    if not name:
+        raise ValueError(f"Expected a policy path like module:name, but got {path!r}")
+
+    return getattr(importlib.import_module(module_name), name)
+
+
+def play_run(
+    policy: Policy,
+    deck: Deck,
+    stake: Stake,
+    challenge: Challenge | None,
+    seed: str,
+    max_steps: int | None = None,
+) -> dict[str, Any]:
+    """
+    Plays a run until it's won or lost, returning a JSON-serializable result
+
+    The cause is the blind the run was lost on, "max steps" if it was stopped or the error
+    the policy or run raised, and none if it was won.
+
+    Args:
+        policy (Policy): Chooses a flat action from the run's action mask
+        deck (Deck): The deck of the run, ignored for challenges
+        stake (Stake): The stake of the run, ignored for challenges
+        challenge (Challenge, optional): The challenge of the run, or none
+        seed (str): The seed of the run, also seeding the random.Random passed to the policy
+        max_steps (int, optional): The number of steps after which the run is stopped, or none
+    """
+
+    if challenge is not None:
+        run = ChallengeRun(challenge, seed=seed)
+    else:
+        run = Run(deck, stake=stake, seed=seed)
+    rng = random.Random(f"{seed}-policy")
+    action_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    num_steps, cause = 0, None
+    try:
+        while run.state is not State.GAME_OVER and run.ante < WINNING_ANTE:
+            if max_steps is not None and num_steps >= max_steps:
+                cause = "max steps"
+                break
+
+            action = policy(run, run.legal_actions(out=action_mask), rng)
+            _ACTION_METHODS[action](run, *ACTIONS[action][1])
+            num_steps += 1
+    except Exception as e:
+        cause = f"{type(e).__name__}: {e}"
+
+    if run.state is State.GAME_OVER:
+        cause = run.blind.value
+
+    return {
+        "deck": run.deck.name,
+        "stake": run.stake.name,
+        "challenge": None if challenge is None else challenge.name,
+        "seed": seed,
+        "won": cause is None,
+        "ante": run.ante,
+        "round": run.round,
+        "money": run.money,
+        "jokers": [type(joker).__name__ for joker in run.jokers],
+        "cause": cause,
+        "steps": num_steps,
+    }
+
+
+def wilson_interval(wins: int, runs: int, z: float = 1.96) -> tuple[float, float]:
+    """
+    Gets the Wilson score confidence interval of a win rate, 95% by default
+
+    Args:
+        wins (int): The number of runs won
+        runs (int): The number of runs played
+        z (float): The standard normal quantile of the confidence level
+    """
+
+    if runs == 0:
+        return 0.0, 1.0
+
+    rate = wins / runs
+    center = (rate + z**2 / (2 * runs)) / (1 + z**2 / runs)
+    margin = (
+        z
+        * math.sqrt(rate * (1 - rate) / runs + z**2 / (4 * runs**2))
+        / (1 + z**2 / runs)
+    )
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _get_key(
+    deck: Deck, stake: Stake, challenge: Challenge | None, seed: str
+) -> tuple[str, str, str | None, str]:
+    return deck.name, stake.name, None if challenge is None else challenge.name, seed
+
+
+def _get_result_key(result: dict[str, Any]) -> tuple[str, str, str | None, str]:
+    return result["deck"], result["stake"], result["challenge"], result["seed"]
+
+
+def _init_worker(policy_path: str) -> None:
+    global _policy
+    _policy = load_policy(policy_path)
+
+
+def _play_runs(
+    max_steps: int | None,
+    runs: list[tuple[Deck, Stake, Challenge | None, str]],
+) -> list[dict[str, Any]]:
+    return [
+        play_run(_policy, deck, stake, challenge, seed, max_steps=max_steps)
+        for deck, stake, challenge, seed in runs
+    ]
+
+
+def _print_summary(results: list[dict[str, Any]]) -> None:
+    groups = {}
+    for result in results:
+        name = (
+            f"{result['challenge']} challenge"
+            if result["challenge"] is not None
+            else f"{result['deck']} deck, {result['stake']} stake"
+        )
+        groups.setdefault(name, []).append(result)
+    groups = dict(sorted(groups.items()))
+    groups["total"] = results
+
+    width = max(map(len, groups))
+    for name, group in groups.items():
+        wins = sum(result["won"] for result in group)
+        low, high = wilson_interval(wins, len(group))
+        mean_ante = sum(result["ante"] for result in group) / len(group)
+        print(
+            f"{name:<{width}}  {wins}/{len(group)} won  {wins / len(group):.1%} "
+            f"(95% CI {low:.1%}-{high:.1%})  mean ante {mean_ante:.2f}"
+        )
+
+
+def _read_results(path: str) -> list[dict[str, Any]]:
+    # a killed run can leave its last line half written, which is cut off so the next
+    # result starts on a line of its own
+    with open(path, "rb+") as file:
+        lines = file.read().split(b"\n")
+
+        results, size = [], 0
+        for i, line in enumerate(lines):
+            try:
+                if line.strip():
+                    results.append(json.loads(line))
+            except ValueError:
+                if any(rest.strip() for rest in lines[i + 1 :]):
+                    raise
+                print("Dropping the partial last line of the results")
+                file.truncate(size)
+                break
+            size += len(line) + 1
+        else:
+            if lines[-1].strip():
+                # the last result is whole but its newline was never written
+                file.write(b"\n")
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Plays runs of a policy over decks, stakes and challenges across "
+        "processes, appending a JSON line per run and resuming from an existing file"
+    )
+    parser.add_argument(
+        "policy",
+        nargs="?",
+        default="balatro.simulate:random_policy",
+        help="the module:name import path of the policy",
+    )
+    parser.add_argument("-o", "--output", default="simulate.jsonl")
+    parser.add_argument("-n", "--runs", type=int, default=100, help="runs per setup")
+    parser.add_argument("-s", "--seed", default="0", help="the seed of the run seeds")
+    parser.add_argument(
+        "-d",
+        "--decks",
+        nargs="+",
+        default=[deck.name for deck in Deck if deck is not Deck.CHALLENGE],
+    )
+    parser.add_argument(
+        "-k", "--stakes", nargs="+", default=[stake.name for stake in Stake]
+    )
+    parser.add_argument(
+        "-c",
+        "--challenges",
+        nargs="*",
+        default=[],
+        help="challenges to also play, or ALL",
+    )
+    parser.add_argument("-p", "--processes", type=int, default=os.cpu_count())
+    parser.add_argument("-m", "--max-steps", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    args = parser.parse_args()
+
+    load_policy(args.policy)
+
+    seeds = list(random_seeds(args.runs, seed=args.seed))
+    setups = [
+        (Deck[deck], Stake[stake], None) for deck in args.decks for stake in args.stakes
+    ]
+    challenges = args.challenges
+    if challenges == ["ALL"]:
+        challenges = [challenge.name for challenge in Challenge]
+    setups += [
+        (Deck.CHALLENGE, Stake.WHITE, Challenge[challenge]) for challenge in challenges
+    ]
+    runs = [setup + (seed,) for setup in setups for seed in seeds]
+
+    results = _read_results(args.output) if os.path.exists(args.output) else []
+    # resumed results only count towards the summary if they were asked for again
+    wanted_keys = {_get_key(*run) for run in runs}
+    results = [result for result in results if _get_result_key(result) in wanted_keys]
+    done_keys = set(map(_get_result_key, results))
+    runs = [run for run in runs if _get_key(*run) not in done_keys]
+    if done_keys:
+        print(f"Resuming with {len(done_keys)} runs already played")
+
+    chunks = [
+        runs[i : i + args.chunk_size] for i in range(0, len(runs), args.chunk_size)
+    ]
+    try:
+        with (
+            open(args.output, "a") as file,
+            mp.get_context().Pool(
+                args.processes, initializer=_init_worker, initargs=(args.policy,)
+            ) as pool,
+        ):
+            for chunk_results in pool.imap_unordered(
+                partial(_play_runs, args.max_steps), chunks
+            ):
+                for result in chunk_results:
+                    file.write(json.dumps(result) + "\n")
+                file.flush()
+                results += chunk_results
+    except KeyboardInterrupt:
+        print(f"Interrupted after {len(results)} runs, rerun to resume")
+
+    if results:
+        _print_summary(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,12 @@ import io
 import math
 from PIL import Image, ImageFilter, ImageEnhance, ImageDraw
 import numpy as np
-import base64
 import random as r
 
 from .classes import *
 from .enums import *
 from .jokers import *
+from .textures import get_sheet
 
 DEFAULT_CARD_WIDTH, DEFAULT_CARD_HEIGHT = 142, 190
 DEFAULT_CHIP_WIDTH, DEFAULT_CHIP_HEIGHT = 58, 58
@@ -374,13 +374,18 @@ VOUCHER_COORDINATES = {
     Voucher.PALETTE: [3, 7],
 }
 
-with io.BytesIO() as buffer:
-    with open("resources/textures/ShopSignAnimation.txt") as file:
-        sprite = Image.open(io.BytesIO(base64.b64decode(file.read()))).crop(
-            (0, 0, 226, 114)
-        )
-        sprite.save(buffer, "png")
-        SHOP_SIGN = buffer.getvalue()
+
+def __getattr__(name: str) -> bytes:
+    # module-level assets are built on first access instead of at import time
+    if name == "SHOP_SIGN":
+        global SHOP_SIGN
+        with io.BytesIO() as buffer:
+            sprite = get_sheet("ShopSignAnimation").crop((0, 0, 226, 114))
+            sprite.save(buffer, "png")
+            SHOP_SIGN = buffer.getvalue()
+        return SHOP_SIGN
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _apply_debuff(image: Image.Image) -> Image.Image:
@@ -914,12 +919,8 @@ def get_sprite(
                 sprite = get_sprite(card_back)
                 sprite = sprite.resize((WIDTH, HEIGHT))
             else:
-                with open("resources/textures/Jokers.txt") as file:
-                    joker_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
-                with open("resources/textures/stickers.txt") as file:
-                    stickers_sheet = Image.open(
-                        io.BytesIO(base64.b64decode(file.read()))
-                    )
+                joker_sheet = get_sheet("jokers")
+                stickers_sheet = get_sheet("stickers")
 
                 i, j = JOKER_COORDINATES[type(item)]
                 x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
@@ -973,8 +974,7 @@ def get_sprite(
                 if item.is_debuffed:
                     sprite = _apply_debuff(sprite)
         case Consumable():
-            with open("resources/textures/Tarots.txt") as file:
-                consumable_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            consumable_sheet = get_sheet("Tarots")
 
             i, j = CONSUMABLE_COORDINATES[item.card]
             x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
@@ -986,10 +986,7 @@ def get_sprite(
             )
 
             if item.card is Spectral.THE_SOUL:
-                with open("resources/textures/Enhancers.txt") as file:
-                    enhancers_sheet = Image.open(
-                        io.BytesIO(base64.b64decode(file.read()))
-                    )
+                enhancers_sheet = get_sheet("Enhancers")
                 i, j = 1, 0
                 x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
                 x2, y2 = x1 + DEFAULT_CARD_WIDTH, y1 + DEFAULT_CARD_HEIGHT
@@ -1002,12 +999,8 @@ def get_sprite(
             if item.is_face_down:
                 sprite = get_sprite(card_back)
             else:
-                with open("resources/textures/8BitDeck.txt") as file:
-                    deck_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
-                with open("resources/textures/Enhancers.txt") as file:
-                    enhancers_sheet = Image.open(
-                        io.BytesIO(base64.b64decode(file.read()))
-                    )
+                deck_sheet = get_sheet("8BitDeck")
+                enhancers_sheet = get_sheet("Enhancers")
 
                 i, j = ENHANCER_COORDINATES.get(item.enhancement, (0, 1))
                 x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
@@ -1035,50 +1028,42 @@ def get_sprite(
                 if item.is_debuffed:
                     sprite = _apply_debuff(sprite)
         case Voucher():
-            with open("resources/textures/Vouchers.txt") as file:
-                voucher_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            voucher_sheet = get_sheet("Vouchers")
 
             i, j = VOUCHER_COORDINATES[item]
             x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
             x2, y2 = x1 + DEFAULT_CARD_WIDTH, y1 + DEFAULT_CARD_HEIGHT
             sprite = voucher_sheet.crop((x1, y1, x2, y2))
         case Stake():
-            with open("resources/textures/chips.txt") as file:
-                chips_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            chips_sheet = get_sheet("chips")
 
             i, j = CHIPS_COORDINATES[item]
             x1, y1 = DEFAULT_CHIP_WIDTH * j, DEFAULT_CHIP_HEIGHT * i
             x2, y2 = x1 + DEFAULT_CHIP_WIDTH, y1 + DEFAULT_CHIP_HEIGHT
             sprite = chips_sheet.crop((x1, y1, x2, y2))
         case Tag():
-            with open("resources/textures/tags.txt") as file:
-                tags_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            tags_sheet = get_sheet("tags")
 
             i, j = TAG_COORDINATES[item]
             x1, y1 = DEFAULT_TAG_WIDTH * j, DEFAULT_TAG_HEIGHT * i
             x2, y2 = x1 + DEFAULT_TAG_WIDTH, y1 + DEFAULT_TAG_HEIGHT
             sprite = tags_sheet.crop((x1, y1, x2, y2))
         case Blind():
-            with open("resources/textures/BlindChips.txt") as file:
-                blind_chips_sheet = Image.open(
-                    io.BytesIO(base64.b64decode(file.read()))
-                )
+            blind_chips_sheet = get_sheet("BlindChips")
 
             i, j = BLIND_ROWS[item], 0
             x1, y1 = DEFAULT_BLIND_WIDTH * j, DEFAULT_BLIND_HEIGHT * i
             x2, y2 = x1 + DEFAULT_BLIND_WIDTH, y1 + DEFAULT_BLIND_HEIGHT
             sprite = blind_chips_sheet.crop((x1, y1, x2, y2))
         case Deck():
-            with open("resources/textures/Enhancers.txt") as file:
-                enhancers_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            enhancers_sheet = get_sheet("Enhancers")
 
             i, j = ENHANCER_COORDINATES[item]
             x1, y1 = DEFAULT_CARD_WIDTH * j, DEFAULT_CARD_HEIGHT * i
             x2, y2 = x1 + DEFAULT_CARD_WIDTH, y1 + DEFAULT_CARD_HEIGHT
             sprite = enhancers_sheet.crop((x1, y1, x2, y2))
         case Pack():
-            with open("resources/textures/boosters.txt") as file:
-                pack_sheet = Image.open(io.BytesIO(base64.b64decode(file.read())))
+            pack_sheet = get_sheet("boosters")
 
             # i, j = r.choice(PACK_COORDINATES[item])
             i, j = PACK_COORDINATES[item][0]
@@ -1091,3 +1076,77 @@ def get_sprite(
     with io.BytesIO() as buffer:
         sprite.save(buffer, "png")
         return buffer.getvalue()
+
+
+_cached_sprites: dict[tuple, Image.Image] = {}
+
+
+def get_cached_sprite(
+    item: (
+        BalatroJoker | Consumable | Card | Voucher | Stake | Tag | Blind | Deck | Pack
+    ),
+    card_back: Deck = Deck.RED,
+    width: int | None = None,
+) -> Image.Image:
+    """
+    Gets a sprite, only rendering it the first time its visual state is seen
+
+    The returned image is shared, copy it before drawing on it.
+
+    Args:
+        item (BalatroJoker | Consumable | Card | Voucher | Stake | Tag | Blind | Deck | Pack): The item to get the sprite of
+        card_back (Deck): The deck whose back is shown for face down cards and flipped jokers
+        width (int, optional): The width to scale the sprite to, keeping its aspect ratio
+    """
+
+    key = _get_sprite_key(item, card_back) + (width,)
+
+    sprite = _cached_sprites.get(key)
+    if sprite is None:
+        if width is None:
+            sprite = get_sprite(item, card_back=card_back)
+        else:
+            sprite = get_cached_sprite(item, card_back=card_back)
+            sprite = sprite.resize(
+                (width, round(sprite.height * width / sprite.width)),
+                Image.Resampling.LANCZOS,
+            )
+        _cached_sprites[key] = sprite
+
+    return sprite
+
+
+def _get_sprite_key(
+    item: (
+        BalatroJoker | Consumable | Card | Voucher | Stake | Tag | Blind | Deck | Pack
+    ),
+    card_back: Deck = Deck.RED,
+) -> tuple:
+    match item:
+        case BalatroJoker():
+            return (
+                type(item),
+                item.edition,
+                item.is_eternal,
+                item.is_perishable,
+                item.is_rental,
+                item.is_debuffed,
+                card_back if item.is_flipped else None,
+            )
+        case Consumable():
+            return (item.card, item.is_negative)
+        case Card():
+            return (
+                (card_back,)
+                if item.is_face_down
+                else (
+                    item.rank,
+                    item.suit,
+                    item.enhancement,
+                    item.seal,
+                    item.edition,
+                    item.is_debuffed,
+                )
+            )
+        case _:
+            return (item,)
@@ -0,0 +1,310 @@
+from __future__ import annotations
+from functools import cache, lru_cache
+import re
+
+from . import Run, format_number
+from .classes import *
+from .constants import *
+from .enums import *
+
+# SGR parameters of the ANSI colors, loosely after the colors of the game
+SUIT_COLORS = {
+    Suit.SPADES: "35",
+    Suit.HEARTS: "31",
+    Suit.CLUBS: "36",
+    Suit.DIAMONDS: "33",
+}
+SUIT_SYMBOLS = {
+    Suit.SPADES: "♠",
+    Suit.HEARTS: "♥",
+    Suit.CLUBS: "♣",
+    Suit.DIAMONDS: "♦",
+}
+EDITION_COLORS = {
+    Edition.FOIL: "96",
+    Edition.HOLOGRAPHIC: "91",
+    Edition.POLYCHROME: "95",
+    Edition.NEGATIVE: "7",
+}
+SEAL_COLORS = {
+    Seal.GOLD: "33",
+    Seal.RED: "31",
+    Seal.BLUE: "34",
+    Seal.PURPLE: "35",
+}
+RARITY_COLORS = {
+    Rarity.COMMON: "94",
+    Rarity.UNCOMMON: "92",
+    Rarity.RARE: "91",
+    Rarity.LEGENDARY: "95",
+}
+CHIPS_COLOR = "34"
+MULT_COLOR = "31"
+MONEY_COLOR = "33"
+DEBUFFED_COLOR = "2;9"
+
+
+def render_text(run: Run, color: bool = True) -> str:
+    """
+    Renders the current state of a run as a compact text summary of a few lines, for logs
+
+    Shows the ante, money, blind and score against the goal, the Jokers, consumables and
+    hand with their enhancements, seals and editions, and the shop or opened pack. Nothing is
+    drawn or encoded and the text of every card and Joker is cached, so it is cheap enough
+    to log every step.
+
+    Args:
+        run (Run): The run to render
+        color (bool): Whether to color the text with ANSI escape codes
+    """
+
+    lines = [_render_status(run, color)]
+
+    match run._state:
+        case State.SELECTING_BLIND:
+            lines.append(_render_selecting_blind(run, color))
+        case State.PLAYING_BLIND:
+            lines.append(_render_playing_blind(run, color))
+        case State.CASHING_OUT:
+            lines.append(
+                f"Cash out {_style(f'${run.cash_out_total}', MONEY_COLOR, color)}"
+            )
+        case State.IN_SHOP:
+            lines.extend(_render_in_shop(run, color))
+        case State.OPENING_PACK:
+            lines.append(
+                f"{run._opened_pack.value}  Choose {run._pack_choices_left}  "
+                + _join(_format_item(item, color) for item in run._pack_items)
+            )
+        case State.GAME_OVER:
+            lines.append("Game over")
+
+    lines.append(
+        f"Jokers {len(run._jokers)}/{run.joker_slots}  "
+        + _join(_format_joker(joker, color) for joker in run._jokers)
+    )
+    if run._consumables:
+        lines.append(
+            f"Consumables {len(run._consumables)}/{run.consumable_slots}  "
+            + _join(
+                _format_consumable(consumable, color) for consumable in run._consumables
+            )
+        )
+    # the hand is left over while cashing out and after losing
+    if run._hand is not None and run._state in [
+        State.PLAYING_BLIND,
+        State.OPENING_PACK,
+    ]:
+        lines.append(_render_hand(run, color))
+
+    return "\n".join(lines)
+
+
+def _render_status(run: Run, color: bool) -> str:
+    line = (
+        f"Ante {run.ante}/8  Round {run._round}  "
+        f"{_style(f'${run._money}', MONEY_COLOR, color)}  "
+        f"Deck {len(run.deck_cards_left)}/{len(run._deck_cards)}"
+    )
+    if run._tags:
+        line += "  Tags " + ", ".join(tag.value for tag in run._tags)
+    return line
+
+
+def _render_selecting_blind(run: Run, color: bool) -> str:
+    blind = run._blind
+    line = (
+        f"Next {blind.value}  Goal "
+        f"{_style(format_number(run._get_round_goal(blind)), MULT_COLOR, color)}  "
+        f"Reward {_style('$' * run._get_blind_reward(blind), MONEY_COLOR, color)}"
+    )
+    if blind is not run._boss_blind:
+        tag, _ = run._ante_tags[blind is Blind.BIG_BLIND]
+        line += f"  Skip for {tag.value}  Boss {run._boss_blind.value}"
+    return line
+
+
+def _render_playing_blind(run: Run, color: bool) -> str:
+    return (
+        f"{run._blind.value}  Score {format_number(run.round_score)}/"
+        f"{_style(format_number(run._round_goal), MULT_COLOR, color)}  "
+        f"Hands {_style(str(run._hands), CHIPS_COLOR, color)}  "
+        f"Discards {_style(str(run._discards), MULT_COLOR, color)}"
+    )
+
+
+def _render_in_shop(run: Run, color: bool) -> list[str]:
+    return [
+        f"Shop  Reroll {_style(f'${run.reroll_cost}', MONEY_COLOR, color)}  "
+        + _join(
+            f"{_format_item(item, color)} {_style(f'${cost}', MONEY_COLOR, color)}"
+            for item, cost in run._shop_cards
+        ),
+        "Vouchers  "
+        + _join(
+            f"{voucher.value} {_style(f'${cost}', MONEY_COLOR, color)}"
+            for voucher, cost in run._shop_vouchers
+        )
+        + "  Packs  "
+        + _join(
+            f"{pack.value} {_style(f'${cost}', MONEY_COLOR, color)}"
+            for pack, cost in run._shop_packs
+        ),
+    ]
+
+
+def _render_hand(run: Run, color: bool) -> str:
+    cards = [_format_card(card, color) for card in run._hand]
+    if run._forced_selected_card_index is not None:
+        cards[run._forced_selected_card_index] += "*"
+    return f"Hand {len(run._hand)}/{run.hand_size}  " + " ".join(cards)
+
+
+def _join(texts) -> str:
+    return " | ".join(texts) or "-"
+
+
+def _style(text: str, sgr: str | None, color: bool) -> str:
+    if not color or sgr is None:
+        return text
+    return f"\x1b[{sgr}m{text}\x1b[0m"
+
+
+def _format_item(item: BalatroJoker | Consumable | Card, color: bool) -> str:
+    match item:
+        case BalatroJoker():
+            return _format_joker(item, color)
+        case Consumable():
+            return _format_consumable(item, color)
+        case Card():
+            return _format_card(item, color)
+
+
+def _format_card(card: Card, color: bool) -> str:
+    # cards change between steps, so the text is cached by what it shows
+    return _get_card_text(
+        card.rank,
+        card.suit,
+        card.enhancement,
+        card.seal,
+        card.edition,
+        card.is_debuffed,
+        card.is_face_down,
+        color,
+    )
+
+
+def _format_consumable(consumable: Consumable, color: bool) -> str:
+    return _get_consumable_text(consumable.card, consumable.is_negative, color)
+
+
+def _format_joker(joker: BalatroJoker, color: bool) -> str:
+    return _get_joker_text(
+        type(joker),
+        joker.edition,
+        joker.is_eternal,
+        joker.is_perishable,
+        joker.is_rental,
+        joker.is_debuffed,
+        joker.is_flipped,
+        color,
+    )
+
+
+def _annotate(text: str, notes: list[tuple[str, str | None]], color: bool) -> str:
+    if not notes:
+        return text
+    return f"{text}[{','.join(_style(note, sgr, color) for note, sgr in notes)}]"
+
+
+@lru_cache(maxsize=4096)
+def _get_card_text(
+    rank: Rank,
+    suit: Suit,
+    enhancement: Enhancement | None,
+    seal: Seal | None,
+    edition: Edition,
+    is_debuffed: bool,
+    is_face_down: bool,
+    color: bool,
+) -> str:
+    if is_face_down:
+        return "??"
+
+    if enhancement is Enhancement.STONE:
+        text = "Stone"
+    else:
+        text = _style(
+            (rank.value if rank.value.isdigit() else rank.value[0])
+            + SUIT_SYMBOLS[suit],
+            SUIT_COLORS[suit],
+            color,
+        )
+
+    notes = []
+    if enhancement is not None and enhancement is not Enhancement.STONE:
+        notes.append((enhancement.value, None))
+    if seal is not None:
+        notes.append((f"{seal.value} Seal", SEAL_COLORS[seal]))
+    if edition is not Edition.BASE:
+        notes.append((edition.value, EDITION_COLORS[edition]))
+    if is_debuffed:
+        notes.append(("Debuffed", DEBUFFED_COLOR))
+    return _annotate(text, notes, color)
+
+
+@cache
+def _get_consumable_text(
+    card: Tarot | Planet | Spectral, is_negative: bool, color: bool
+) -> str:
+    notes = [(Edition.NEGATIVE.value, EDITION_COLORS[Edition.NEGATIVE])]
+    return _annotate(card.value, notes if is_negative else [], color)
+
+
+@lru_cache(maxsize=4096)
+def _get_joker_text(
+    joker_type: type[BalatroJoker],
+    edition: Edition,
+    is_eternal: bool,
+    is_perishable: bool,
+    is_rental: bool,
+    is_debuffed: bool,
+    is_flipped: bool,
+    color: bool,
+) -> str:
+    if is_flipped:
+        return "??"
+
+    text = _style(
+        _get_joker_name(joker_type),
+        RARITY_COLORS[_get_joker_rarities()[joker_type]],
+        color,
+    )
+
+    notes = []
+    if edition is not Edition.BASE:
+        notes.append((edition.value, EDITION_COLORS[edition]))
+    if is_eternal:
+        notes.append(("Eternal", None))
+    if is_perishable:
+        notes.append(("Perishable", None))
+    if is_rental:
+        notes.append(("Rental", MONEY_COLOR))
+    if is_debuffed:
+        notes.append(("Debuffed", DEBUFFED_COLOR))
+    return _annotate(text, notes, color)
+
+
+@cache
+def _get_joker_name(joker_type: type[BalatroJoker]) -> str:
+    # Jokers have no display names, so they're made from their class names
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])", " ", joker_type.__name__)
+
+
+@cache
+def _get_joker_rarities() -> dict[type[BalatroJoker], Rarity]:
+    return {
+        joker_type: rarity
+        for rarity, joker_types in JOKER_RARITIES.items()
+        for joker_type in joker_types
+    }
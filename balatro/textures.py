@@ -0,0 +1,107 @@
+from __future__ import annotations
+import base64
+import io
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+TEXTURES_DIRECTORY = "resources/textures"
+ATLAS_PATH = "resources/textures/atlas.rgba"
+ATLAS_INDEX_PATH = "resources/textures/atlas.json"
+
+_atlas: np.memmap | None = None
+_atlas_index: dict[str, dict[str, int]] | None = None
+_sheets: dict[str, Image.Image] = {}
+
+
+def build_atlas(
+    textures_directory: str = TEXTURES_DIRECTORY,
+    atlas_path: str = ATLAS_PATH,
+    atlas_index_path: str = ATLAS_INDEX_PATH,
+) -> None:
+    """
+    Decodes every base64 texture sheet once and packs the raw RGBA pixels into a single atlas file
+
+    Args:
+        textures_directory (str): The directory containing the base64 .txt texture sheets
+        atlas_path (str): Where to write the packed raw RGBA atlas
+        atlas_index_path (str): Where to write the JSON index of sheet offsets and dimensions
+    """
+
+    atlas_index = {}
+    offset = 0
+
+    with open(atlas_path, "wb") as atlas:
+        for file_name in sorted(os.listdir(textures_directory)):
+            sheet_name, extension = os.path.splitext(file_name)
+            if extension != ".txt":
+                continue
+
+            sheet = _decode_sheet(os.path.join(textures_directory, file_name))
+            sheet_bytes = sheet.tobytes()
+            atlas.write(sheet_bytes)
+
+            atlas_index[sheet_name] = {
+                "offset": offset,
+                "width": sheet.width,
+                "height": sheet.height,
+            }
+            offset += len(sheet_bytes)
+
+    with open(atlas_index_path, "w") as file:
+        json.dump(atlas_index, file, indent=4)
+
+
+def get_sheet(sheet_name: str) -> Image.Image:
+    """
+    Gets a texture sheet, sliced straight out of the memory-mapped atlas if it has been built
+
+    The returned image is shared and read-only, crop it before drawing on it.
+
+    Args:
+        sheet_name (str): The name of the sheet (its .txt file name without the extension)
+    """
+
+    sheet = _sheets.get(sheet_name)
+    if sheet is not None:
+        return sheet
+
+    global _atlas, _atlas_index
+    if _atlas_index is None and os.path.exists(ATLAS_INDEX_PATH):
+        with open(ATLAS_INDEX_PATH) as file:
+            atlas_index = json.load(file)
+        # the atlas is set before its index, which other threads check first
+        _atlas = np.memmap(ATLAS_PATH, dtype=np.uint8, mode="r")
+        _atlas_index = atlas_index
+
+    if _atlas_index is not None and sheet_name in _atlas_index:
+        offset, width, height = (
+            _atlas_index[sheet_name]["offset"],
+            _atlas_index[sheet_name]["width"],
+            _atlas_index[sheet_name]["height"],
+        )
+        sheet = Image.frombuffer(
+            "RGBA",
+            (width, height),
+            _atlas[offset : offset + width * height * 4],
+            "raw",
+            "RGBA",
+            0,
+            1,
+        )
+    else:
+        sheet = _decode_sheet(os.path.join(TEXTURES_DIRECTORY, f"{sheet_name}.txt"))
+
+    _sheets[sheet_name] = sheet
+    return sheet
+
+
+def _decode_sheet(path: str) -> Image.Image:
+    with open(path) as file:
+        return Image.open(io.BytesIO(base64.b64decode(file.read()))).convert("RGBA")
+
+
+if __name__ == "__main__":
+    build_atlas()
@@ -0,0 +1,398 @@
+from __future__ import annotations
+from enum import Enum, IntEnum
+from functools import cache
+import operator
+from typing import TYPE_CHECKING, Any, Callable
+
+from .classes import *
+from .enums import *
+from .enums import _get_index
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from . import Run
+
+
+class TraceSource(IntEnum):
+    """
+    What a trace record came from, deciding what its index refers to
+    """
+
+    HAND = 0
+    """
+    The poker hand played, the index being its index in PokerHand
+    """
+    BLIND = 1
+    """
+    The boss blind, the index being its index in Blind
+    """
+    PLAYED_CARD = 2
+    """
+    A scored card, the index being its index in the played cards
+    """
+    HELD_CARD = 3
+    """
+    A card held in hand, the index being its index in the hand
+    """
+    JOKER = 4
+    """
+    A Joker, the index being its index in the Jokers and the type its index in JokerType
+    """
+    VOUCHER = 5
+    """
+    A voucher, the index being its index in Voucher
+    """
+    CHALLENGE = 6
+    """
+    The challenge of the run, the index being its index in Challenge
+    """
+
+
+class TraceEffect(IntEnum):
+    BASE = 0
+    BOSS_BLIND = 1
+    CARD = 2
+    ENHANCEMENT = 3
+    SEAL = 4
+    EDITION = 5
+    HAND_PLAYED = 6
+    CARD_SCORED = 7
+    CARD_HELD = 8
+    INDEPENDENT = 9
+    DEPENDENT = 10
+    BOSS_BLIND_TRIGGERED = 11
+    VOUCHER = 12
+    CHALLENGE = 13
+
+
+def __getattr__(name: str) -> np.dtype:
+    # numpy is only imported once a trace is needed, keeping it out of import balatro
+    if name == "TRACE_DTYPE":
+        return _get_trace_dtype()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@cache
+def _get_trace_dtype() -> np.dtype:
+    import numpy as np
+
+    # chips and mult are added to, mult is then multiplied by xmult
+    return np.dtype(
+        [
+            ("hand", np.uint32),
+            ("source", np.int8),
+            ("index", np.int8),
+            ("type", np.int16),
+            ("effect", np.int8),
+            ("retrigger", np.int8),
+            ("chips", np.float64),
+            ("mult", np.float64),
+            ("xmult", np.float64),
+            ("money", np.int32),
+        ]
+    )
+
+
+_JOKER_TYPE_INDICES = {name: i for i, name in enumerate(JokerType.__members__)}
+_CHIPS, _MULT = 0, 1
+_MULTIPLYING_OPERATORS = {operator.mul, operator.truediv}
+
+
+class ScoringTrace:
+    """
+    Records how every hand played by a run is scored, one record per change of chips, mult
+    or money, into a preallocated structured array of TRACE_DTYPE
+
+    While a hand is scored, the run's chips and mult are replaced by int and float subclasses
+    that record every addition and multiplication made to them under the current source, so
+    the effects of Jokers are recorded without them knowing. Money is compared whenever the
+    source changes. A run without a trace attached only checks for one.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Args:
+            capacity (int): The number of records to preallocate, doubled when full
+        """
+
+        import numpy as np
+
+        self._records: np.ndarray = np.zeros(capacity, dtype=_get_trace_dtype())
+        self._num_records: int = 0
+        self._num_hands: int = 0
+
+        self._run: Run | None = None
+        # the indices of the played cards, held cards and Jokers by id
+        self._indices: dict[TraceSource, dict[int, int]] = {}
+        self._chips: int | float = 0
+        self._mult: int | float = 0
+        self._money: int = 0
+        self._traced_chips: _TracedInt | _TracedFloat | None = None
+        self._traced_mult: _TracedInt | _TracedFloat | None = None
+        # the source, its item, the effect and the retrigger index
+        self._context: tuple[TraceSource, Any, TraceEffect, int] = (
+            TraceSource.HAND,
+            None,
+            TraceEffect.BASE,
+            0,
+        )
+
+    def __len__(self) -> int:
+        return self._num_records
+
+    def attach(self, run: Run) -> None:
+        """
+        Starts recording the hands played by a run
+
+        Args:
+            run (Run): The run
+        """
+
+        run._trace = self
+
+    def clear(self) -> None:
+        """
+        Removes every record, keeping the buffer
+        """
+
+        self._num_records = 0
+        self._num_hands = 0
+
+    def detach(self, run: Run) -> None:
+        """
+        Stops recording the hands played by a run
+
+        Args:
+            run (Run): The run
+        """
+
+        if run._trace is self:
+            run._trace = None
+
+    def format(self) -> str:
+        """
+        Formats the records as one line each, for reading a trace
+        """
+
+        joker_types = list(JokerType)
+        lines = []
+        for record in self.records:
+            source = TraceSource(record["source"])
+            name = source.name
+            if source is TraceSource.JOKER:
+                name = f"{name} {record['index']} {joker_types[record['type']].value}"
+            elif record["index"] >= 0:
+                name = f"{name} {record['index']}"
+
+            effects = [
+                f"{sign}{abs(record[field]):g} {field}"
+                for field, sign in [
+                    ("chips", "+" if record["chips"] >= 0 else "-"),
+                    ("mult", "+" if record["mult"] >= 0 else "-"),
+                ]
+                if record[field]
+            ]
+            if record["xmult"] != 1:
+                effects.append(f"x{record['xmult']:g} mult")
+            if record["money"]:
+                effects.append(f"{record['money']:+d} money")
+
+            retrigger = (
+                f" (retrigger {record['retrigger']})" if record["retrigger"] else ""
+            )
+            lines.append(
+                f"hand {record['hand']}: {name} {TraceEffect(record['effect']).name}"
+                f"{retrigger}: {', '.join(effects)}"
+            )
+        return "\n".join(lines)
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records[: self._num_records]
+
+    def _apply(
+        self, field: int, op: Callable[[Any, Any], Any], value: Any, other: Any
+    ) -> _TracedInt | _TracedFloat:
+        result = op(value, other)
+        if field == _MULT and op in _MULTIPLYING_OPERATORS:
+            xmult = other if op is operator.mul else 1 / other
+            if xmult != 1:
+                self._record(0, 0, xmult, 0)
+        elif result != value:
+            if field == _CHIPS:
+                self._record(result - value, 0, 1, 0)
+            else:
+                self._record(0, result - value, 1, 0)
+
+        traced = _wrap(result, self, field)
+        if field == _CHIPS:
+            self._chips, self._traced_chips = result, traced
+        else:
+            self._mult, self._traced_mult = result, traced
+        return traced
+
+    def _record(
+        self, chips: int | float, mult: int | float, xmult: float, money: int
+    ) -> None:
+        if self._num_records == len(self._records):
+            import numpy as np
+
+            self._records = np.resize(self._records, 2 * len(self._records))
+
+        source, item, effect, retrigger = self._context
+        type_index = -1
+        indices = self._indices.get(source)
+        if indices is not None:
+            index = indices.get(id(item), -1)
+            if source is TraceSource.JOKER:
+                type_index = _JOKER_TYPE_INDICES[type(item).__name__]
+        else:
+            index = -1 if item is None else _get_index(item)
+
+        self._records[self._num_records] = (
+            self._num_hands,
+            source,
+            index,
+            type_index,
+            effect,
+            retrigger,
+            chips,
+            mult,
+            xmult,
+            money,
+        )
+        self._num_records += 1
+
+    def _refuse(self) -> None:
+        # a hand the boss blind doesn't allow scores nothing, so its chips and mult are
+        # taken back for the records to still add up to the score
+        self._set_source(
+            TraceSource.BLIND, self._run._blind, TraceEffect.BOSS_BLIND_TRIGGERED
+        )
+        self._sync()
+        self._record(-self._chips, -self._mult, 1, 0)
+
+    def _set_source(
+        self,
+        source: TraceSource,
+        item: Card | BalatroJoker | Enum | None,
+        effect: TraceEffect,
+        retrigger: int = 0,
+    ) -> None:
+        run = self._run
+        if (
+            run._chips is not self._traced_chips
+            or run._mult is not self._traced_mult
+            or run._money != self._money
+        ):
+            self._sync()
+
+        self._context = (source, item, effect, retrigger)
+
+    def _start(self, run: Run, poker_hand: PokerHand, played_cards: list[Card]) -> None:
+        self._num_hands += 1
+        self._run = run
+        self._indices = {
+            TraceSource.PLAYED_CARD: _get_indices(played_cards),
+            TraceSource.HELD_CARD: _get_indices(run._hand),
+            TraceSource.JOKER: _get_indices(run._jokers),
+        }
+        self._chips, self._mult, self._money = run._chips, run._mult, run._money
+
+        self._context = (TraceSource.HAND, poker_hand, TraceEffect.BASE, 0)
+        self._record(run._chips, run._mult, 1, 0)
+        self._traced_chips = run._chips = _wrap(run._chips, self, _CHIPS)
+        self._traced_mult = run._mult = _wrap(run._mult, self, _MULT)
+
+        self._set_source(TraceSource.BLIND, run._blind, TraceEffect.BOSS_BLIND)
+
+    def _stop(self) -> None:
+        if self._run is None:
+            return
+
+        self._sync()
+        run = self._run
+        run._chips = _unwrap(run._chips)
+        run._mult = _unwrap(run._mult)
+        self._run = None
+        self._indices = {}
+        self._traced_chips = self._traced_mult = None
+
+    def _sync(self) -> None:
+        # catches changes made without the traced operators, like setting the money
+        run = self._run
+        chips, mult, money = _unwrap(run._chips), _unwrap(run._mult), run._money
+        if chips != self._chips or mult != self._mult or money != self._money:
+            self._record(chips - self._chips, mult - self._mult, 1, money - self._money)
+            self._chips, self._mult, self._money = chips, mult, money
+        self._traced_chips = run._chips = _wrap(chips, self, _CHIPS)
+        self._traced_mult = run._mult = _wrap(mult, self, _MULT)
+
+
+class _TracedInt(int):
+    def __new__(cls, value: int, trace: ScoringTrace, field: int) -> _TracedInt:
+        traced = super().__new__(cls, value)
+        traced._trace = trace
+        traced._field = field
+        return traced
+
+    def __add__(self, other):
+        return self._trace._apply(self._field, operator.add, int(self), other)
+
+    def __floordiv__(self, other):
+        return self._trace._apply(self._field, operator.floordiv, int(self), other)
+
+    def __mul__(self, other):
+        return self._trace._apply(self._field, operator.mul, int(self), other)
+
+    def __sub__(self, other):
+        return self._trace._apply(self._field, operator.sub, int(self), other)
+
+    def __truediv__(self, other):
+        return self._trace._apply(self._field, operator.truediv, int(self), other)
+
+
+class _TracedFloat(float):
+    def __new__(cls, value: float, trace: ScoringTrace, field: int) -> _TracedFloat:
+        traced = super().__new__(cls, value)
+        traced._trace = trace
+        traced._field = field
+        return traced
+
+    def __add__(self, other):
+        return self._trace._apply(self._field, operator.add, float(self), other)
+
+    def __floordiv__(self, other):
+        return self._trace._apply(self._field, operator.floordiv, float(self), other)
+
+    def __mul__(self, other):
+        return self._trace._apply(self._field, operator.mul, float(self), other)
+
+    def __sub__(self, other):
+        return self._trace._apply(self._field, operator.sub, float(self), other)
+
+    def __truediv__(self, other):
+        return self._trace._apply(self._field, operator.truediv, float(self), other)
+
+
+def _get_indices(items: list) -> dict[int, int]:
+    return {id(item): i for i, item in enumerate(items)}
+
+
+def _unwrap(value: int | float) -> int | float:
+    match value:
+        case _TracedInt():
+            return int(value)
+        case _TracedFloat():
+            return float(value)
+    return value
+
+
+def _wrap(
+    value: int | float, trace: ScoringTrace, field: int
+) -> _TracedInt | _TracedFloat:
+    if isinstance(value, int):
+        return _TracedInt(value, trace, field)
+    return _TracedFloat(value, trace, field)
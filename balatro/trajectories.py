@@ -0,0 +1,338 @@
+from __future__ import annotations
+from collections.abc import Iterator
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from . import Run
+from .actions import ACTIONS, NUM_ACTIONS
+from .classes import *
+from .enums import *
+from .env import _ACTION_METHODS
+from .observation import OBSERVATION_DTYPE, new_observation
+
+PACKED_ACTION_MASK_SIZE = -(-NUM_ACTIONS // 8)
+
+# the columns of a shard, action masks being packed into bits
+COLUMNS = {
+    "observations": (OBSERVATION_DTYPE, ()),
+    "actions": (np.dtype(np.int32), ()),
+    "rewards": (np.dtype(np.float32), ()),
+    "action_masks": (np.dtype(np.uint8), (PACKED_ACTION_MASK_SIZE,)),
+    "terminated": (np.dtype(np.bool_), ()),
+    "truncated": (np.dtype(np.bool_), ()),
+}
+
+_SHARD_PREFIX = "shard-"
+_SHARD_SUFFIX = ".npz"
+# signature, version, flags, compression, time, date, crc, sizes, name and extra lengths
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5HI2I2H")
+
+
+class TrajectoryWriter:
+    """
+    Records steps into fixed-size column buffers, writing each full buffer as an .npz shard
+
+    The buffers are allocated once, so memory stays at one shard however many steps are
+    recorded. Shards are numbered after any already in the directory and written to a
+    temporary file first, so an interrupted recording never leaves a partial shard behind.
+    Compressed shards are smaller, uncompressed ones can be memory-mapped by
+    TrajectoryReader.
+    """
+
+    def __init__(
+        self, directory: str, shard_size: int = 65536, compress: bool = True
+    ) -> None:
+        """
+        Args:
+            directory (str): The directory to write shards into, created if missing
+            shard_size (int): The number of steps per shard
+            compress (bool): Whether to compress shards
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory: str = directory
+        self.shard_size: int = shard_size
+        self.compress: bool = compress
+
+        self._columns: dict[str, np.ndarray] = {
+            name: np.zeros((shard_size,) + shape, dtype=dtype)
+            for name, (dtype, shape) in COLUMNS.items()
+        }
+        self._num_steps: int = 0
+        self._shard_index: int = len(_get_shard_paths(directory))
+        self._observation: np.ndarray = new_observation()
+        self._action_mask: np.ndarray = np.zeros(NUM_ACTIONS, dtype=bool)
+
+    def __enter__(self) -> TrajectoryWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def append(
+        self,
+        observation: np.ndarray,
+        action: int,
+        reward: float,
+        action_mask: np.ndarray,
+        terminated: bool = False,
+        truncated: bool = False,
+    ) -> None:
+        """
+        Records a step
+
+        Args:
+            observation (np.ndarray): The observation the action was taken from
+            action (int): The flat action taken
+            reward (float): The reward of the action
+            action_mask (np.ndarray): The action mask of the observation
+            terminated (bool): Whether the action ended the run
+            truncated (bool): Whether the run was cut short after the action
+        """
+
+        i = self._num_steps
+        self._columns["observations"][i] = observation
+        self._columns["actions"][i] = action
+        self._columns["rewards"][i] = reward
+        self._columns["action_masks"][i] = np.packbits(action_mask)
+        self._columns["terminated"][i] = terminated
+        self._columns["truncated"][i] = truncated
+
+        self._num_steps += 1
+        if self._num_steps == self.shard_size:
+            self.flush()
+
+    def extend(
+        self,
+        observations: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        action_masks: np.ndarray,
+        terminated: np.ndarray,
+        truncated: np.ndarray,
+    ) -> None:
+        """
+        Records a batch of steps, such as one step of a BatchRun
+
+        Args:
+            observations (np.ndarray): The (N,) observations the actions were taken from
+            actions (np.ndarray): The (N,) flat actions taken
+            rewards (np.ndarray): The (N,) rewards of the actions
+            action_masks (np.ndarray): The (N, NUM_ACTIONS) action masks of the observations
+            terminated (np.ndarray): The (N,) flags of whether each action ended its run
+            truncated (np.ndarray): The (N,) flags of whether each run was cut short
+        """
+
+        action_masks = np.packbits(action_masks, axis=-1)
+        batch = {
+            "observations": observations,
+            "actions": actions,
+            "rewards": rewards,
+            "action_masks": action_masks,
+            "terminated": terminated,
+            "truncated": truncated,
+        }
+
+        start = 0
+        while start < len(actions):
+            count = min(len(actions) - start, self.shard_size - self._num_steps)
+            for name, column in self._columns.items():
+                column[self._num_steps : self._num_steps + count] = batch[name][
+                    start : start + count
+                ]
+
+            start += count
+            self._num_steps += count
+            if self._num_steps == self.shard_size:
+                self.flush()
+
+    def step(self, run: Run, action: int) -> float:
+        """
+        Records a step of a run, observing it, taking the action and returning the reward
+
+        Like BalatroEnv, the reward is 1 for a defeated blind. An action that raises a
+        BalatroError leaves the run unchanged and is recorded with a reward of 0.
+
+        Args:
+            run (Run): The run
+            action (int): The flat action to take
+        """
+
+        run.observe(self._observation)
+        run.legal_actions(out=self._action_mask)
+
+        previous_state = run._state
+        try:
+            _ACTION_METHODS[action](run, *ACTIONS[action][1])
+        except BalatroError:
+            pass
+        reward = float(
+            previous_state is State.PLAYING_BLIND and run._state is State.CASHING_OUT
+        )
+
+        self.append(
+            self._observation,
+            action,
+            reward,
+            self._action_mask,
+            terminated=run.is_game_over,
+        )
+        return reward
+
+    def flush(self) -> None:
+        """
+        Writes the recorded steps not yet written as a shard, which may be smaller than shard_size
+        """
+
+        if self._num_steps == 0:
+            return
+
+        path = os.path.join(
+            self.directory, f"{_SHARD_PREFIX}{self._shard_index:06}{_SHARD_SUFFIX}"
+        )
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            (np.savez_compressed if self.compress else np.savez)(
+                file,
+                **{
+                    name: column[: self._num_steps]
+                    for name, column in self._columns.items()
+                },
+            )
+        os.replace(temporary_path, path)
+
+        self._shard_index += 1
+        self._num_steps = 0
+
+    def close(self) -> None:
+        """
+        Writes the remaining steps as a last shard
+        """
+
+        self.flush()
+
+
+class TrajectoryReader:
+    """
+    Iterates the shards of a TrajectoryWriter directory one at a time
+
+    Uncompressed shards are memory-mapped and compressed ones are decompressed a shard at
+    a time, so memory stays bounded by the shard size whatever the size of the dataset.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory (str): The directory of the shards
+        """
+
+        self.directory: str = directory
+        self.shard_paths: list[str] = _get_shard_paths(directory)
+
+    def __len__(self) -> int:
+        return sum(_get_num_steps(shard_path) for shard_path in self.shard_paths)
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        for shard_path in self.shard_paths:
+            yield load_shard(shard_path)
+
+    def iter_batches(
+        self, batch_size: int, unpack_masks: bool = True
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Iterates consecutive steps in batches, the last batch of each shard possibly being smaller
+
+        Args:
+            batch_size (int): The number of steps per batch
+            unpack_masks (bool): Whether to unpack action masks into (N, NUM_ACTIONS) booleans
+        """
+
+        for shard in self:
+            for start in range(0, len(shard["actions"]), batch_size):
+                batch = {
+                    name: column[start : start + batch_size]
+                    for name, column in shard.items()
+                }
+                if unpack_masks:
+                    batch["action_masks"] = unpack_action_masks(batch["action_masks"])
+                yield batch
+
+
+def load_shard(path: str) -> dict[str, np.ndarray]:
+    """
+    Loads the columns of a shard, memory-mapping them if it's uncompressed
+
+    Args:
+        path (str): The path of the shard
+    """
+
+    with zipfile.ZipFile(path) as archive:
+        if all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()):
+            return {
+                info.filename.removesuffix(".npy"): _memory_map_member(path, info)
+                for info in archive.infolist()
+            }
+
+    with np.load(path) as shard:
+        return {name: shard[name] for name in shard.files}
+
+
+def unpack_action_masks(packed_action_masks: np.ndarray) -> np.ndarray:
+    """
+    Unpacks bit-packed action masks into booleans along the last axis
+
+    Args:
+        packed_action_masks (np.ndarray): The (..., PACKED_ACTION_MASK_SIZE) packed masks
+    """
+
+    return np.unpackbits(packed_action_masks, axis=-1, count=NUM_ACTIONS).view(bool)
+
+
+def _get_shard_paths(directory: str) -> list[str]:
+    if not os.path.isdir(directory):
+        return []
+
+    return [
+        os.path.join(directory, file_name)
+        for file_name in sorted(os.listdir(directory))
+        if file_name.startswith(_SHARD_PREFIX) and file_name.endswith(_SHARD_SUFFIX)
+    ]
+
+
+def _get_num_steps(path: str) -> int:
+    with zipfile.ZipFile(path) as archive, archive.open("actions.npy") as file:
+        shape, _, _ = _read_array_header(file)
+    return shape[0]
+
+
+def _read_array_header(file) -> tuple[tuple[int, ...], bool, np.dtype]:
+    if np.lib.format.read_magic(file) == (1, 0):
+        return np.lib.format.read_array_header_1_0(file)
+    return np.lib.format.read_array_header_2_0(file)
+
+
+def _memory_map_member(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    with open(path, "rb") as file:
+        file.seek(info.header_offset)
+        *_, name_length, extra_length = _ZIP_LOCAL_HEADER.unpack(
+            file.read(_ZIP_LOCAL_HEADER.size)
+        )
+        file.seek(name_length + extra_length, os.SEEK_CUR)
+
+        shape, fortran_order, dtype = _read_array_header(file)
+        offset = file.tell()
+
+    if shape[0] == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable
+
+
+def measure(
+    func: Callable[[], Any], number: int = 1, repeat: int = 5
+) -> dict[str, float]:
+    """
+    Times a function, returning per-call statistics in seconds
+
+    Args:
+        func (Callable): The function to time
+        number (int): The number of calls per sample
+        repeat (int): The number of samples
+    """
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return summarize(samples)
+
+
+def measure_each(
+    setup: Callable[[], Any], func: Callable[[Any], Any], repeat: int = 100
+) -> dict[str, float]:
+    """
+    Times a function on fresh state from a setup function, returning per-call statistics in seconds
+
+    Only the function is timed, for operations like playing a hand that consume their state.
+
+    Args:
+        setup (Callable): Creates the state passed to the function
+        func (Callable): The function to time
+        repeat (int): The number of samples, each with its own state
+    """
+
+    samples = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        func(state)
+        samples.append(time.perf_counter() - start)
+
+    return summarize(samples)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": len(samples),
+    }
+
+
+def write_results(
+    benchmark: str, results: dict[str, dict[str, Any]], output: str | None
+) -> None:
+    """
+    Prints benchmark results and optionally writes them as JSON for comparison across commits
+
+    Args:
+        benchmark (str): The name of the benchmark
+        results (dict): The results, keyed by case name
+        output (str, optional): The path of the JSON file to write, or none
+    """
+
+    width = max(map(len, results), default=0)
+    for case, stats in results.items():
+        if "median" in stats:
+            print(
+                f"{case:<{width}}  {_format_seconds(stats['median'])} "
+                f"(min {_format_seconds(stats['min'])}, ±{_format_seconds(stats['stdev'])})"
+            )
+        else:
+            print(f"{case:<{width}}  {stats}")
+
+    if output is None:
+        return
+
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "benchmark": benchmark,
+                "commit": _git_commit(),
+                "python": sys.version,
+                "platform": platform.platform(),
+                "results": results,
+            },
+            file,
+            indent=4,
+        )
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.3f} us"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from balatro.env import BalatroEnv, BatchRun
+from balatro.observation import new_observation
+from benchmarks._utils import write_results
+
+
+def sample_actions(action_masks: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # a uniformly random legal action along the last axis
+    return np.argmax(
+        np.where(action_masks, rng.random(action_masks.shape), -1.0), axis=-1
+    )
+
+
+def run_batch(num_runs: int, num_steps: int, seed: int = 0) -> float:
+    """
+    Steps a BatchRun under a random masked policy, returning the environment steps per second
+    """
+
+    batch = BatchRun(num_runs)
+    rng = np.random.default_rng(seed)
+    _, action_masks = batch.reset(seed=str(seed))
+
+    start = time.perf_counter()
+    for _ in range(num_steps // num_runs):
+        batch.step(sample_actions(action_masks, rng))
+
+    return num_steps // num_runs * num_runs / (time.perf_counter() - start)
+
+
+def run_loop(num_runs: int, num_steps: int, seed: int = 0) -> float:
+    """
+    Steps a list of BalatroEnvs in a Python loop under a random masked policy, observing
+    each run like BatchRun does, returning the environment steps per second
+    """
+
+    envs = [BalatroEnv() for _ in range(num_runs)]
+    rng = np.random.default_rng(seed)
+    action_masks = [
+        env.reset(seed=f"{seed}-{i}-0")[1]["action_mask"] for i, env in enumerate(envs)
+    ]
+    observations = [new_observation() for _ in range(num_runs)]
+
+    start = time.perf_counter()
+    for _ in range(num_steps // num_runs):
+        for i, env in enumerate(envs):
+            run, _, terminated, truncated, info = env.step(
+                sample_actions(action_masks[i], rng)
+            )
+            if terminated or truncated:
+                run, info = env.reset()
+            run.observe(observations[i])
+            action_masks[i] = info["action_mask"]
+
+    return num_steps // num_runs * num_runs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compares BatchRun against a Python loop over BalatroEnvs"
+    )
+    parser.add_argument("-b", "--batch", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("-s", "--steps", type=int, default=8192)
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for num_runs in args.batch:
+        batch = [run_batch(num_runs, args.steps, seed=i) for i in range(args.repeat)]
+        loop = [run_loop(num_runs, args.steps, seed=i) for i in range(args.repeat)]
+        results[f"{num_runs} runs"] = {
+            "BatchRun steps/s": round(statistics.median(batch)),
+            "loop steps/s": round(statistics.median(loop)),
+            "speedup": round(statistics.median(batch) / statistics.median(loop), 2),
+        }
+    write_results("batch_run", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
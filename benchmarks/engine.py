@@ -0,0 +1,298 @@
+from __future__ import annotations
+import argparse
+from collections.abc import Callable
+import random
+import time
+from typing import Any
+
+from balatro import Run
+from balatro.actions import ACTIONS
+from balatro.classes import *
+from balatro.enums import *
+from balatro.jokers import *
+from balatro.simulate import WINNING_ANTE, random_policy
+from benchmarks._utils import measure, measure_each, summarize, write_results
+
+SEED = "BENCH"
+
+# one hand of every poker hand, in the order of PokerHand
+CANONICAL_HANDS = {
+    PokerHand.FLUSH_FIVE: [Card(Rank.ACE, Suit.SPADES)] * 5,
+    PokerHand.FLUSH_HOUSE: [Card(Rank.KING, Suit.HEARTS)] * 3
+    + [Card(Rank.TWO, Suit.HEARTS)] * 2,
+    PokerHand.FIVE_OF_A_KIND: [Card(Rank.ACE, suit) for suit in Suit]
+    + [Card(Rank.ACE, Suit.SPADES)],
+    PokerHand.STRAIGHT_FLUSH: [
+        Card(rank, Suit.CLUBS)
+        for rank in [Rank.NINE, Rank.EIGHT, Rank.SEVEN, Rank.SIX, Rank.FIVE]
+    ],
+    PokerHand.FOUR_OF_A_KIND: [Card(Rank.SEVEN, suit) for suit in Suit]
+    + [Card(Rank.TWO, Suit.HEARTS)],
+    PokerHand.FULL_HOUSE: [Card(Rank.TEN, suit) for suit in list(Suit)[:3]]
+    + [Card(Rank.FOUR, suit) for suit in list(Suit)[:2]],
+    PokerHand.FLUSH: [
+        Card(rank, Suit.DIAMONDS)
+        for rank in [Rank.ACE, Rank.JACK, Rank.EIGHT, Rank.FIVE, Rank.TWO]
+    ],
+    PokerHand.STRAIGHT: [
+        Card(rank, suit)
+        for rank, suit in zip(
+            [Rank.KING, Rank.QUEEN, Rank.JACK, Rank.TEN, Rank.NINE],
+            [Suit.SPADES, Suit.HEARTS, Suit.CLUBS, Suit.DIAMONDS, Suit.SPADES],
+        )
+    ],
+    PokerHand.THREE_OF_A_KIND: [Card(Rank.QUEEN, suit) for suit in list(Suit)[:3]]
+    + [Card(Rank.FIVE, Suit.CLUBS), Card(Rank.THREE, Suit.HEARTS)],
+    PokerHand.TWO_PAIR: [Card(Rank.JACK, suit) for suit in list(Suit)[:2]]
+    + [Card(Rank.SIX, suit) for suit in list(Suit)[:2]]
+    + [Card(Rank.TWO, Suit.CLUBS)],
+    PokerHand.PAIR: [Card(Rank.EIGHT, suit) for suit in list(Suit)[:2]]
+    + [
+        Card(Rank.KING, Suit.CLUBS),
+        Card(Rank.FIVE, Suit.HEARTS),
+        Card(Rank.THREE, Suit.SPADES),
+    ],
+    PokerHand.HIGH_CARD: [
+        Card(rank, suit)
+        for rank, suit in zip(
+            [Rank.ACE, Rank.JACK, Rank.EIGHT, Rank.FIVE, Rank.TWO],
+            [Suit.SPADES, Suit.HEARTS, Suit.CLUBS, Suit.DIAMONDS, Suit.SPADES],
+        )
+    ],
+}
+
+# scoring jokers with copy jokers among them, the first n being held
+JOKER_LINEUP = [
+    Joker,
+    Blueprint,
+    GreedyJoker,
+    Brainstorm,
+    ScaryFace,
+    Hack,
+    Photograph,
+    SockAndBuskin,
+    Baron,
+    Mime,
+    Bloodstone,
+    Triboulet,
+    Blueprint,
+    Hologram,
+    Brainstorm,
+]
+
+SPRITE_ITEMS = {
+    "joker": Blueprint(),
+    "consumable": Consumable(Tarot.THE_FOOL),
+    "card": Card(Rank.ACE, Suit.SPADES, enhancement=Enhancement.GOLD, seal=Seal.RED),
+    "voucher": Voucher.OVERSTOCK,
+    "stake": Stake.GOLD,
+    "tag": Tag.CHARM,
+    "blind": Blind.THE_WALL,
+    "deck": Deck.RED,
+    "pack": Pack.ARCANA,
+}
+
+
+def new_shop_run(seed: str = SEED) -> Run:
+    # a run in its first shop, without playing the small blind
+    run = Run(Deck.RED, seed=seed)
+    run._round = 1
+    run._populate_shop()
+    run._state = State.IN_SHOP
+    run._money = 1000
+    return run
+
+
+def new_playing_run(num_jokers: int, seed: str = SEED) -> Run:
+    run = Run(Deck.RED, seed=seed)
+    for joker_type in JOKER_LINEUP[:num_jokers]:
+        run._add_joker(run._create_joker(joker_type))
+    run.select_blind()
+    return run
+
+
+def new_run_in_state(state: State) -> Run:
+    match state:
+        case State.SELECTING_BLIND:
+            return Run(Deck.RED, seed=SEED)
+        case State.PLAYING_BLIND:
+            return new_playing_run(5)
+        case State.IN_SHOP:
+            return new_shop_run()
+        case State.OPENING_PACK:
+            run = new_shop_run()
+            run.open_shop_pack(0)
+            return run
+
+
+def play_random_game(seed: str, max_steps: int = 10000) -> int:
+    run = Run(Deck.RED, seed=seed)
+    rng = random.Random(seed)
+
+    num_steps = 0
+    while (
+        run.state is not State.GAME_OVER
+        and run.ante < WINNING_ANTE
+        and num_steps < max_steps
+    ):
+        action = random_policy(run, run.legal_actions(), rng)
+        method_name, args = ACTIONS[action]
+        getattr(run, method_name)(*args)
+        num_steps += 1
+
+    return num_steps
+
+
+def benchmark_construction(repeat: int) -> dict[str, dict[str, float]]:
+    return {
+        f"Run() {deck.name}": measure(
+            lambda: Run(deck, seed=SEED), number=20, repeat=repeat
+        )
+        for deck in Deck
+        if deck is not Deck.CHALLENGE
+    }
+
+
+def benchmark_blinds(repeat: int) -> dict[str, dict[str, float]]:
+    return {
+        "select_blind": measure_each(
+            lambda: Run(Deck.RED, seed=SEED), Run.select_blind, repeat=repeat * 20
+        )
+    }
+
+
+def benchmark_poker_hands(repeat: int) -> dict[str, dict[str, float]]:
+    run = Run(Deck.RED, seed=SEED)
+    return {
+        f"_get_poker_hands {poker_hand.name}": measure(
+            lambda: run._get_poker_hands(cards), number=200, repeat=repeat
+        )
+        for poker_hand, cards in CANONICAL_HANDS.items()
+    }
+
+
+def benchmark_play_hand(repeat: int) -> dict[str, dict[str, float]]:
+    return {
+        f"play_hand {num_jokers} jokers": measure_each(
+            lambda: new_playing_run(num_jokers),
+            lambda run: run.play_hand([0, 1, 2, 3, 4]),
+            repeat=repeat * 20,
+        )
+        for num_jokers in [0, 5, len(JOKER_LINEUP)]
+    }
+
+
+def benchmark_shop(repeat: int) -> dict[str, dict[str, float]]:
+    def populate_shop(run: Run) -> None:
+        run._shop_cards = None
+        run._populate_shop()
+
+    return {
+        "_populate_shop": measure_each(new_shop_run, populate_shop, repeat * 20),
+        "reroll": measure_each(new_shop_run, Run.reroll, repeat * 20),
+    }
+
+
+def benchmark_packs(repeat: int) -> dict[str, dict[str, float]]:
+    return {
+        f"_open_pack {pack.name}": measure_each(
+            new_shop_run, lambda run: run._open_pack(pack), repeat * 10
+        )
+        for pack in Pack
+    }
+
+
+def benchmark_sprites(repeat: int) -> dict[str, dict[str, float]]:
+    from balatro.sprites import get_sprite
+
+    return {
+        f"get_sprite {kind}": measure(lambda: get_sprite(item), number=5, repeat=repeat)
+        for kind, item in SPRITE_ITEMS.items()
+    }
+
+
+def benchmark_html(repeat: int) -> dict[str, dict[str, float]]:
+    return {
+        f"_repr_html_ {state.name}": measure_each(
+            lambda: new_run_in_state(state), Run._repr_html_, repeat * 2
+        )
+        for state in [
+            State.SELECTING_BLIND,
+            State.PLAYING_BLIND,
+            State.IN_SHOP,
+            State.OPENING_PACK,
+        ]
+    }
+
+
+def benchmark_text(repeat: int) -> dict[str, dict[str, float]]:
+    from balatro.text import render_text
+
+    results = {}
+    for state in [
+        State.SELECTING_BLIND,
+        State.PLAYING_BLIND,
+        State.IN_SHOP,
+        State.OPENING_PACK,
+    ]:
+        run = new_run_in_state(state)
+        results[f"render_text {state.name}"] = measure(
+            lambda: render_text(run), number=100, repeat=repeat
+        )
+    return results
+
+
+def benchmark_games(repeat: int) -> dict[str, dict[str, float]]:
+    game_times, step_times = [], []
+    for i in range(repeat * 4):
+        start = time.perf_counter()
+        num_steps = play_random_game(f"{SEED}-{i}")
+        game_times.append(time.perf_counter() - start)
+        step_times.append(game_times[-1] / num_steps)
+
+    return {
+        "random game": summarize(game_times),
+        "random game step": summarize(step_times),
+    }
+
+
+BENCHMARKS: dict[str, Callable[[int], dict[str, dict[str, Any]]]] = {
+    "construction": benchmark_construction,
+    "blinds": benchmark_blinds,
+    "poker_hands": benchmark_poker_hands,
+    "play_hand": benchmark_play_hand,
+    "shop": benchmark_shop,
+    "packs": benchmark_packs,
+    "sprites": benchmark_sprites,
+    "html": benchmark_html,
+    "text": benchmark_text,
+    "games": benchmark_games,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures the engine's hot paths on fixed seeds and scenarios"
+    )
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        default=list(BENCHMARKS),
+        help=f"the benchmarks to run, of {', '.join(BENCHMARKS)}",
+    )
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark {name!r}")
+
+    results = {}
+    for name in args.benchmarks:
+        results.update(BENCHMARKS[name](args.repeat))
+    write_results("engine", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
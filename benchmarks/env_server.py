@@ -0,0 +1,125 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from balatro.server import EnvClient
+from benchmarks._utils import write_results
+
+
+async def run_client(
+    path: str, num_sessions: int, num_steps: int, pipelined: bool, seed: int
+) -> None:
+    rng = np.random.default_rng(seed)
+
+    async with await EnvClient.connect(path) as client:
+        session_ids = await asyncio.gather(
+            *(client.open(seed=f"{seed}-{i}") for i in range(num_sessions))
+        )
+        action_masks = await asyncio.gather(
+            *(client.legal_actions(session_id) for session_id in session_ids)
+        )
+
+        for _ in range(num_steps // num_sessions):
+            actions = [
+                int(rng.choice(np.flatnonzero(action_mask)))
+                for action_mask in action_masks
+            ]
+            if pipelined:
+                results = await asyncio.gather(
+                    *(client.step(*request) for request in zip(session_ids, actions))
+                )
+            else:
+                results = [
+                    await client.step(*request) for request in zip(session_ids, actions)
+                ]
+
+            for i, (_, _, terminated, truncated, action_mask) in enumerate(results):
+                action_masks[i] = action_mask
+                if terminated or truncated:
+                    _, action_masks[i] = await client.reset(session_ids[i])
+
+
+async def load_test(
+    path: str, num_clients: int, num_sessions: int, num_steps: int, pipelined: bool
+) -> float:
+    """
+    Steps sessions from concurrent clients under a random masked policy, returning the
+    environment steps per second over every client
+    """
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(path, num_sessions, num_steps, pipelined, seed=i)
+            for i in range(num_clients)
+        )
+    )
+
+    return (
+        num_steps
+        // num_sessions
+        * num_sessions
+        * num_clients
+        / (time.perf_counter() - start)
+    )
+
+
+async def wait_for_socket(path: str, timeout: float = 10.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not os.path.exists(path):
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"No server listening on {path}")
+        await asyncio.sleep(0.05)
+
+
+async def run(args: argparse.Namespace, path: str) -> dict[str, dict[str, float]]:
+    await wait_for_socket(path)
+
+    results = {}
+    for num_clients in args.clients:
+        for pipelined in (False, True):
+            steps_per_second = await load_test(
+                path, num_clients, args.sessions, args.steps, pipelined
+            )
+            results[
+                f"{num_clients} clients, {'pipelined' if pipelined else 'sequential'}"
+            ] = {"steps/s": round(steps_per_second)}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load tests an EnvServer, starting one unless a socket is given"
+    )
+    parser.add_argument("--unix", default=None, help="the socket of a running server")
+    parser.add_argument("-c", "--clients", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("-m", "--sessions", type=int, default=16)
+    parser.add_argument("-s", "--steps", type=int, default=4096)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    if args.unix is not None:
+        write_results("env_server", asyncio.run(run(args, args.unix)), args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "balatro.sock")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "balatro.server", "--unix", path]
+        )
+        try:
+            write_results("env_server", asyncio.run(run(args, path)), args.output)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
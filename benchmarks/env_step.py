@@ -0,0 +1,66 @@
+from __future__ import annotations
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from balatro.env import BalatroEnv
+from benchmarks._utils import summarize, write_results
+
+
+def run_episodes(num_steps: int, seed: int = 0) -> tuple[float, int, int]:
+    """
+    Steps a random masked policy through the environment
+
+    Returns the elapsed seconds, the number of episodes and the number of illegal actions.
+    """
+
+    env = BalatroEnv()
+    rng = np.random.default_rng(seed)
+
+    num_episodes, num_illegal = 1, 0
+    _, info = env.reset(seed=f"{seed}-0")
+
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        action = rng.choice(np.flatnonzero(info["action_mask"]))
+        _, _, terminated, truncated, info = env.step(action)
+        num_illegal += "error" in info
+
+        if terminated or truncated:
+            _, info = env.reset(seed=f"{seed}-{num_episodes}")
+            num_episodes += 1
+
+    return time.perf_counter() - start, num_episodes, num_illegal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures BalatroEnv steps per second under a random masked policy"
+    )
+    parser.add_argument("-s", "--steps", type=int, default=5000)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    step_times, steps_per_second = [], []
+    for i in range(args.repeat):
+        elapsed, num_episodes, num_illegal = run_episodes(args.steps, seed=i)
+        step_times.append(elapsed / args.steps)
+        steps_per_second.append(args.steps / elapsed)
+
+    results = {
+        "step": summarize(step_times),
+        "steps per second": {
+            "median steps/s": round(statistics.median(steps_per_second)),
+            "min steps/s": round(min(steps_per_second)),
+            "max steps/s": round(max(steps_per_second)),
+        },
+        "last repeat": {"episodes": num_episodes, "illegal actions": num_illegal},
+    }
+    write_results("env_step", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+
+from benchmarks._utils import summarize, write_results
+
+RENDERING_MODULES = ["PIL", "numpy"]
+
+# the most seconds the fastest import balatro can take, with headroom for slower machines
+IMPORT_BUDGET = 0.1
+
+
+def import_time(statement: str) -> tuple[float, dict[str, float], list[str]]:
+    """
+    Imports in a fresh interpreter under `-X importtime`
+
+    Returns the cumulative import time of the statement in seconds, the self time of
+    every balatro module and any rendering modules that got loaded.
+    """
+
+    check = (
+        f"import sys; print(*[m for m in {RENDERING_MODULES!r} if m in sys.modules])"
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{statement}; {check}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total, self_times = 0.0, {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.rstrip()
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+
+        if not name.startswith("balatro"):
+            continue
+
+        self_times[name] = int(self_us) / 1e6
+        if depth == 1:
+            total += int(cumulative_us) / 1e6
+
+    return total, self_times, process.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures the startup cost of importing balatro"
+    )
+    parser.add_argument("-n", "--repeat", type=int, default=10)
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument(
+        "-b",
+        "--budget",
+        type=float,
+        default=IMPORT_BUDGET,
+        help="the most seconds import balatro can take",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    failed = False
+
+    for case, statement in [
+        ("import balatro", "import balatro"),
+        ("import balatro.sprites", "import balatro.sprites"),
+    ]:
+        samples, module_samples = [], {}
+        for _ in range(args.repeat):
+            total, self_times, rendering_modules = import_time(statement)
+            samples.append(total)
+            for name, seconds in self_times.items():
+                module_samples.setdefault(name, []).append(seconds)
+
+        results[case] = summarize(samples)
+        for name, module_times in sorted(module_samples.items()):
+            results[f"{case} [{name}]"] = summarize(module_times)
+
+        if statement == "import balatro" and rendering_modules:
+            print(f"{statement} loaded rendering modules: {rendering_modules}")
+            failed = True
+        if statement == "import balatro" and min(samples) > args.budget:
+            print(f"{statement} took {min(samples):.3f}s, over {args.budget}s")
+            failed = True
+
+    write_results("import_time", results, args.output)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+from __future__ import annotations
+import argparse
+from collections.abc import Callable
+from enum import Enum
+import gc
+import json
+import random
+import statistics
+import sys
+import tracemalloc
+from types import BuiltinFunctionType, FunctionType, ModuleType
+from typing import Any
+
+from balatro import Run
+from balatro.actions import ACTIONS
+from balatro.enums import *
+from balatro.fuzz import explore_policy
+from balatro.simulate import WINNING_ANTE
+from balatro.sprites import _cached_sprites, get_cached_sprite
+from balatro.textures import _sheets
+from benchmarks._utils import write_results
+from benchmarks.engine import (
+    SPRITE_ITEMS,
+    new_playing_run,
+    new_run_in_state,
+    new_shop_run,
+)
+
+# the run attributes reported on their own, the rest being counted as other
+ATTRIBUTE_GROUPS = {
+    "deck cards": ["_deck_cards", "_deck_cards_left", "_hand"],
+    "jokers": ["_jokers"],
+    "shop": ["_shop_cards", "_shop_packs", "_shop_vouchers", "_pack_items"],
+    "cards played ante": ["_cards_played_ante"],
+    "poker hand info": ["_poker_hand_info"],
+    "action log": ["_action_log"],
+    "random streams": ["_random", "_ante_random", "_shop_random", "_pack_random"],
+}
+
+# the most KiB each case can take before it counts as a regression, with some headroom
+THRESHOLDS = {
+    "run new": {"traced KiB": 32},
+    "run playing, 5 jokers": {"traced KiB": 36},
+    "run in shop": {"traced KiB": 36},
+    "run played out": {"traced KiB": 40},
+    "html cache": {"traced KiB": 1024},
+    "sprite cache": {"traced KiB": 32},
+    "play_hand, 0 jokers": {"peak KiB": 8, "retained KiB": 4},
+    "play_hand, 5 jokers": {"peak KiB": 8, "retained KiB": 4},
+    "_deal": {"peak KiB": 2, "retained KiB": 1.5},
+    "_populate_shop": {"peak KiB": 3, "retained KiB": 1.5},
+}
+
+# objects shared by every run rather than retained by one
+_SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, Enum, Run)
+
+
+def get_deep_size(obj: Any, seen: set[int]) -> int:
+    """
+    Sums the sizes of an object and everything it references that isn't in seen, adding them
+    to it, so objects shared by several attributes are only counted once
+
+    Classes, modules, functions, enum members and runs are shared and never counted.
+
+    Args:
+        obj: The object
+        seen (set[int]): The ids of the objects already counted
+    """
+
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def play_out(seed: str, max_steps: int = 500) -> Run:
+    # a run played until it's lost or won, growing its action log and cards played
+    run = Run(Deck.RED, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(max_steps):
+        if run.state is State.GAME_OVER or run.ante >= WINNING_ANTE:
+            break
+        method_name, args = ACTIONS[explore_policy(run, run.legal_actions(), rng)]
+        getattr(run, method_name)(*args)
+    return run
+
+
+def measure_runs(
+    create_run: Callable[[int], Run], num_runs: int
+) -> dict[str, float | int]:
+    """
+    Measures the memory retained per run with tracemalloc, and breaks it down by attribute
+
+    Args:
+        create_run (Callable): Creates the run with the given index
+        num_runs (int): The number of runs to keep alive at once
+    """
+
+    # anything created on first use, like caches, isn't counted towards the runs
+    create_run(-1)
+    gc.collect()
+
+    before, _ = tracemalloc.get_traced_memory()
+    runs = [create_run(i) for i in range(num_runs)]
+    gc.collect()
+    traced = (tracemalloc.get_traced_memory()[0] - before) / num_runs
+
+    sizes = {group: 0 for group in ATTRIBUTE_GROUPS}
+    other = 0
+    for run in runs:
+        seen = {id(run)}
+        for group, names in ATTRIBUTE_GROUPS.items():
+            sizes[group] += sum(
+                get_deep_size(getattr(run, name), seen) for name in names
+            )
+        # everything not in a group, including the run itself
+        other += sys.getsizeof(run) + get_deep_size(vars(run), seen)
+
+    result = {"traced KiB": round(traced / 1024, 1)}
+    for group, size in sizes.items():
+        result[f"{group} KiB"] = round(size / num_runs / 1024, 2)
+    result["other KiB"] = round(other / num_runs / 1024, 2)
+    return result
+
+
+def measure_cache(fill: Callable[[], Any]) -> dict[str, float]:
+    """
+    Measures the memory a process-wide cache retains once filled, with tracemalloc
+
+    Args:
+        fill (Callable): Fills the cache, its result being discarded
+    """
+
+    gc.collect()
+    before, _ = tracemalloc.get_traced_memory()
+    fill()
+    gc.collect()
+    return {
+        "traced KiB": round((tracemalloc.get_traced_memory()[0] - before) / 1024, 1)
+    }
+
+
+def measure_allocations(
+    setup: Callable[[], Any], func: Callable[[Any], Any], repeat: int = 20
+) -> dict[str, float]:
+    """
+    Measures the peak memory allocated during a call and the memory it retains after, with
+    tracemalloc, on fresh state from a setup function
+
+    Args:
+        setup (Callable): Creates the state passed to the function
+        func (Callable): The function to measure
+        repeat (int): The number of samples, each with its own state
+    """
+
+    peaks, retained = [], []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        func(state)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained.append(current - before)
+
+    return {
+        "peak KiB": round(statistics.median(peaks) / 1024, 2),
+        "retained KiB": round(statistics.median(retained) / 1024, 2),
+    }
+
+
+def new_dealing_run() -> Run:
+    # a run that has just played five cards, so dealing draws five more
+    run = new_playing_run(0)
+    del run._hand[:5]
+    return run
+
+
+def new_cashing_out_run() -> Run:
+    run = new_shop_run()
+    run._state = State.CASHING_OUT
+    return run
+
+
+def fill_html_cache() -> None:
+    for state in [
+        State.SELECTING_BLIND,
+        State.PLAYING_BLIND,
+        State.IN_SHOP,
+        State.OPENING_PACK,
+    ]:
+        new_run_in_state(state)._repr_html_()
+
+
+def fill_sprite_cache() -> None:
+    for item in SPRITE_ITEMS.values():
+        get_cached_sprite(item)
+    for joker in new_playing_run(15).jokers:
+        get_cached_sprite(joker)
+
+
+def get_pixel_size(images: Any) -> int:
+    # Pillow allocates pixels outside of the Python allocator tracemalloc traces
+    return sum(image.width * image.height * len(image.getbands()) for image in images)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures the memory retained per run and by the rendering caches, and "
+        "the memory allocated per engine call, failing on any over its threshold"
+    )
+    parser.add_argument("-r", "--runs", type=int, default=20)
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument(
+        "-t",
+        "--thresholds",
+        default=None,
+        help="a JSON file of the most KiB per case and metric, replacing the defaults",
+    )
+    args = parser.parse_args()
+
+    thresholds = THRESHOLDS
+    if args.thresholds is not None:
+        with open(args.thresholds) as file:
+            thresholds = json.load(file)
+
+    tracemalloc.start()
+
+    results = {
+        "run new": measure_runs(lambda i: Run(Deck.RED, seed=f"MEMORY{i}"), args.runs),
+        "run playing, 5 jokers": measure_runs(
+            lambda i: new_playing_run(5, seed=f"MEMORY{i}"), args.runs
+        ),
+        "run in shop": measure_runs(
+            lambda i: new_shop_run(seed=f"MEMORY{i}"), args.runs
+        ),
+        "run played out": measure_runs(lambda i: play_out(f"MEMORY{i}"), args.runs),
+    }
+
+    num_sprites, num_sheets = len(_cached_sprites), len(_sheets)
+    results["html cache"] = measure_cache(fill_html_cache)
+    results["sprite cache"] = measure_cache(fill_sprite_cache)
+    results["sprite cache"]["pixel KiB"] = round(
+        get_pixel_size(list(_cached_sprites.values())[num_sprites:]) / 1024, 1
+    )
+    results["sprite cache"]["sheet pixel KiB"] = round(
+        get_pixel_size(list(_sheets.values())[num_sheets:]) / 1024, 1
+    )
+
+    results["play_hand, 0 jokers"] = measure_allocations(
+        lambda: new_playing_run(0),
+        lambda run: run.play_hand([0, 1, 2, 3, 4]),
+        args.repeat,
+    )
+    results["play_hand, 5 jokers"] = measure_allocations(
+        lambda: new_playing_run(5),
+        lambda run: run.play_hand([0, 1, 2, 3, 4]),
+        args.repeat,
+    )
+    results["_deal"] = measure_allocations(new_dealing_run, Run._deal, args.repeat)
+    results["_populate_shop"] = measure_allocations(
+        new_cashing_out_run, Run._populate_shop, args.repeat
+    )
+
+    tracemalloc.stop()
+    write_results("memory", results, args.output)
+
+    exceeded = [
+        f"{case} {metric}: {results[case][metric]} > {limit}"
+        for case, limits in thresholds.items()
+        if case in results
+        for metric, limit in limits.items()
+        if results[case].get(metric, 0) > limit
+    ]
+    if exceeded:
+        sys.exit("Over the thresholds:\n" + "\n".join(exceeded))
+
+
+if __name__ == "__main__":
+    main()
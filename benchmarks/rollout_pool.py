@@ -0,0 +1,63 @@
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+
+from balatro.rollout import RolloutPool
+from benchmarks._utils import write_results
+from benchmarks.batch_run import sample_actions
+
+
+def run_pool(
+    num_workers: int, runs_per_worker: int, num_steps: int, seed: int = 0
+) -> float:
+    """
+    Steps a RolloutPool under a random masked policy, returning the environment steps per second
+    """
+
+    with RolloutPool(num_workers, runs_per_worker, seed=str(seed)) as pool:
+        rng = np.random.default_rng(seed)
+        _, action_masks = pool.reset()
+
+        start = time.perf_counter()
+        for _ in range(num_steps // pool.num_runs):
+            *_, action_masks = pool.step(sample_actions(action_masks, rng))
+
+        return (
+            num_steps // pool.num_runs * pool.num_runs / (time.perf_counter() - start)
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures how RolloutPool throughput scales with its workers"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()]
+    )
+    parser.add_argument("-r", "--runs-per-worker", type=int, default=16)
+    parser.add_argument("-s", "--steps", type=int, default=8192)
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    baseline = None
+    for num_workers in sorted(set(args.workers)):
+        steps_per_second = statistics.median(
+            run_pool(num_workers, args.runs_per_worker, args.steps, seed=i)
+            for i in range(args.repeat)
+        )
+        baseline = baseline or steps_per_second
+        results[f"{num_workers} workers"] = {
+            "steps/s": round(steps_per_second),
+            "scaling": round(steps_per_second / baseline, 2),
+        }
+    write_results("rollout_pool", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import time
+
+from balatro import Run
+from balatro.classes import *
+from balatro.enums import *
+from balatro.seeds import SeedPreview, preview_seed, random_seeds, scan_seeds
+from benchmarks._utils import measure, write_results
+
+
+def has_the_soul(preview: SeedPreview) -> bool:
+    return any(
+        isinstance(item, Consumable) and item.card is Spectral.THE_SOUL
+        for items in preview.pack_items
+        for item in items
+    )
+
+
+def preview_seed_with_run(
+    seed: str,
+    deck: Deck = Deck.RED,
+    stake: Stake = Stake.WHITE,
+    num_antes: int = 1,
+) -> SeedPreview:
+    """
+    Previews a seed by creating a Run and calling the methods a run would, the way previews
+    were made before they only replayed the draws
+    """
+
+    run = Run(deck, stake=stake, seed=seed)
+    ante_tags, boss_blinds = [list(run._ante_tags)], [run._boss_blind]
+
+    # playing the small blind only draws from the run's gameplay stream
+    run._round = 1
+    run._populate_shop()
+
+    pack_items = []
+    for pack, _ in run._shop_packs:
+        run._open_pack(pack)
+        pack_items.append(run._pack_items)
+        run._close_pack()
+
+    shop_vouchers = run._shop_vouchers
+    for _ in range(num_antes - 1):
+        run._new_ante()
+        ante_tags.append(list(run._ante_tags))
+        boss_blinds.append(run._boss_blind)
+
+    return SeedPreview(
+        seed,
+        ante_tags,
+        boss_blinds,
+        run._shop_cards,
+        shop_vouchers,
+        run._shop_packs,
+        pack_items,
+    )
+
+
+def describe(preview: SeedPreview) -> tuple:
+    """
+    Turns a preview into plain values, as Jokers and consumables only compare by identity
+    """
+
+    def describe_item(item: BalatroJoker | Consumable | Card) -> tuple:
+        match item:
+            case BalatroJoker():
+                return (
+                    type(item).__name__,
+                    item.edition,
+                    item.is_eternal,
+                    item.is_perishable,
+                    item.is_rental,
+                )
+            case Consumable():
+                return item.card, item.is_negative
+            case Card():
+                return item.rank, item.suit, item.enhancement, item.seal, item.edition
+
+    return (
+        preview.ante_tags,
+        preview.boss_blinds,
+        [(describe_item(item), cost) for item, cost in preview.shop_cards],
+        preview.shop_vouchers,
+        preview.shop_packs,
+        [[describe_item(item) for item in items] for items in preview.pack_items],
+    )
+
+
+def check_previews(num_seeds: int, num_antes: int) -> int:
+    """
+    Checks that previews match the Run-based ones for every deck and stake, returning the
+    number of previews checked
+    """
+
+    setups = [
+        (deck, stake) for deck in Deck if deck is not Deck.CHALLENGE for stake in Stake
+    ]
+    for seed in random_seeds(num_seeds, seed="check"):
+        for deck, stake in setups:
+            if describe(preview_seed(seed, deck, stake, num_antes)) != describe(
+                preview_seed_with_run(seed, deck, stake, num_antes)
+            ):
+                raise AssertionError(
+                    f"The preview of {seed!r} with {deck} at {stake} differs from the "
+                    "Run-based one"
+                )
+    return num_seeds * len(setups)
+
+
+def run_scan(processes: int, num_seeds: int, seed: int = 0) -> float:
+    """
+    Scans random seeds for The Soul in a first shop pack, returning the seeds per second
+    """
+
+    start = time.perf_counter()
+    for _ in scan_seeds(
+        has_the_soul, random_seeds(num_seeds, seed=str(seed)), processes=processes
+    ):
+        pass
+
+    return num_seeds / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Checks seed previews against the Run-based ones, compares their "
+        "speed and measures how many seeds the seed scanner previews per second"
+    )
+    parser.add_argument(
+        "-p", "--processes", type=int, nargs="+", default=[1, os.cpu_count()]
+    )
+    parser.add_argument("-s", "--seeds", type=int, default=20000)
+    parser.add_argument("-a", "--antes", type=int, default=3)
+    parser.add_argument("-c", "--check-seeds", type=int, default=20)
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    num_checked = check_previews(args.check_seeds, args.antes)
+    print(f"{num_checked} previews matched the Run-based ones")
+
+    seeds = list(random_seeds(1000, seed="time"))
+    results = {}
+    for num_antes in sorted({1, args.antes}):
+        times = {
+            name: measure(
+                lambda: [preview(seed, num_antes=num_antes) for seed in seeds],
+                number=1,
+                repeat=args.repeat,
+            )["min"]
+            / len(seeds)
+            for name, preview in [
+                ("draws", preview_seed),
+                ("run", preview_seed_with_run),
+            ]
+        }
+        results[f"preview, {num_antes} antes"] = {
+            "draws us": round(times["draws"] * 1e6, 1),
+            "run us": round(times["run"] * 1e6, 1),
+            "speedup": round(times["run"] / times["draws"], 2),
+        }
+
+    for processes in sorted(set(args.processes)):
+        results[f"scan, {processes} processes"] = {
+            "seeds/s": round(
+                statistics.median(
+                    run_scan(processes, args.seeds, seed=i) for i in range(args.repeat)
+                )
+            )
+        }
+    write_results("seed_scan", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
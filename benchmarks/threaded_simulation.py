@@ -0,0 +1,63 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from balatro import Run
+from balatro.rollout import simulate
+from benchmarks._utils import write_results
+
+
+def random_policy(run: Run, action_mask: np.ndarray, rng: random.Random) -> int:
+    return rng.choice(np.flatnonzero(action_mask).tolist())
+
+
+def run_threads(num_threads: int, num_runs: int, seed: int = 0) -> float:
+    """
+    Plays runs under a random policy on a thread pool, returning the runs per second
+    """
+
+    seeds = [f"{seed}-{i}" for i in range(num_runs)]
+
+    start = time.perf_counter()
+    simulate(random_policy, seeds, max_workers=num_threads)
+
+    return num_runs / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures how the threaded simulation scales with its threads"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()]
+    )
+    parser.add_argument("-r", "--runs", type=int, default=256)
+    parser.add_argument("-n", "--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil_enabled else 'disabled'}")
+
+    results = {}
+    baseline = None
+    for num_threads in sorted(set(args.threads)):
+        runs_per_second = statistics.median(
+            run_threads(num_threads, args.runs, seed=i) for i in range(args.repeat)
+        )
+        baseline = baseline or runs_per_second
+        results[f"{num_threads} threads"] = {
+            "runs/s": round(runs_per_second, 1),
+            "scaling": round(runs_per_second / baseline, 2),
+        }
+    write_results("threaded_simulation", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
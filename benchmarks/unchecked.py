@@ -0,0 +1,138 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from balatro import ChallengeRun, Run
+from balatro.actions import ACTIONS
+from balatro.enums import *
+from balatro.fuzz import explore_policy
+from balatro.replay import get_state_digest
+from balatro.simulate import WINNING_ANTE
+from benchmarks._utils import summarize, write_results
+
+# every deck at every stake, and every challenge, as balatro.fuzz plays them
+SETUPS = [
+    (deck, stake, None)
+    for deck in Deck
+    if deck is not Deck.CHALLENGE
+    for stake in Stake
+] + [(Deck.CHALLENGE, Stake.WHITE, challenge) for challenge in Challenge]
+
+# (deck, stake, challenge, seed)
+RunKey = tuple[Deck, Stake, Challenge | None, str]
+
+
+def create_run(key: RunKey, unchecked: bool) -> Run:
+    deck, stake, challenge, seed = key
+    if challenge is not None:
+        return ChallengeRun(challenge, seed=seed, unchecked=unchecked)
+    return Run(deck, stake=stake, seed=seed, unchecked=unchecked)
+
+
+def fuzz_run(key: RunKey, max_steps: int) -> list[tuple[str, tuple]]:
+    """
+    Takes the same masked actions on a checked and an unchecked run, checking that no masked
+    action fails a check and that both runs end in the same state, and returns the actions
+    """
+
+    checked_run = create_run(key, unchecked=False)
+    unchecked_run = create_run(key, unchecked=True)
+    rng = random.Random(key[3])
+
+    for _ in range(max_steps):
+        if checked_run.is_game_over or checked_run.ante >= WINNING_ANTE:
+            break
+
+        method_name, args = ACTIONS[
+            explore_policy(checked_run, checked_run.legal_actions(), rng)
+        ]
+        # a masked action that raises would have been stopped by a skipped check
+        getattr(checked_run, method_name)(*args)
+        getattr(unchecked_run, method_name)(*args)
+
+    if get_state_digest(checked_run) != get_state_digest(unchecked_run):
+        raise AssertionError(f"Checked and unchecked runs of {key} diverged")
+
+    return checked_run.action_log
+
+
+def time_actions(
+    runs: dict[RunKey, list[tuple[str, tuple]]], unchecked: bool
+) -> dict[str, float]:
+    """
+    Replays the actions of runs, returning the total time spent in each action by method name
+    """
+
+    times = {}
+    for key, actions in runs.items():
+        run = create_run(key, unchecked)
+        for method_name, args in actions:
+            method = getattr(run, method_name)
+            start = time.perf_counter()
+            method(*args)
+            elapsed = time.perf_counter() - start
+            times[method_name] = times.get(method_name, 0.0) + elapsed
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fuzzes masked actions against the checks unchecked runs skip, and "
+        "measures the time the skipped checks save per action"
+    )
+    parser.add_argument(
+        "-r", "--runs", type=int, default=1, help="the number of runs of each setup"
+    )
+    parser.add_argument("-m", "--max-steps", type=int, default=2000)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    runs = {}
+    for i in range(args.runs):
+        for setup in SETUPS:
+            key = setup + (f"UNCHECKED-{i}",)
+            runs[key] = fuzz_run(key, args.max_steps)
+    print(
+        f"{len(runs)} runs of every deck, stake and challenge took only masked "
+        "actions without failing a check"
+    )
+
+    # the modes take turns so neither gets the warmer caches
+    samples = {False: [], True: []}
+    for _ in range(args.repeat):
+        for unchecked in [False, True]:
+            samples[unchecked].append(time_actions(runs, unchecked))
+
+    counts = {}
+    for actions in runs.values():
+        for method_name, _ in actions:
+            counts[method_name] = counts.get(method_name, 0) + 1
+
+    results = {}
+    for method_name, count in sorted(counts.items()):
+        checked, unchecked = [
+            summarize([times[method_name] / count for times in samples[mode]])
+            for mode in [False, True]
+        ]
+        results[method_name] = {
+            "actions": count,
+            "checked us": round(checked["min"] * 1e6, 2),
+            "unchecked us": round(unchecked["min"] * 1e6, 2),
+            "saving": f"{1 - unchecked['min'] / checked['min']:.1%}",
+        }
+    checked, unchecked = [
+        min(sum(times.values()) for times in samples[mode]) for mode in [False, True]
+    ]
+    results["all"] = {
+        "actions": sum(counts.values()),
+        "checked s": round(checked, 4),
+        "unchecked s": round(unchecked, 4),
+        "saving": f"{1 - unchecked / checked:.1%}",
+    }
+    write_results("unchecked", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+
+def test_import_skips_optional_dependencies():
+    # PIL and numpy are only needed for rendering and batched traces
+    code = (
+        "import sys, balatro; "
+        "print(','.join(sorted({'PIL', 'numpy'} & sys.modules.keys())))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""